@@ -14,23 +14,29 @@
 # - entity normalisation
 # - local course catalog import and search
 # - course recommendations
+import asyncio
 import re
+import time
 from pathlib import Path
 from typing import Any, List, Optional
-from contextlib import asynccontextmanager
+from contextlib import ExitStack, asynccontextmanager
 from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from sqlalchemy import text
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.CV_entity import CVEntity
 from app.models.JD_entity import JDEntity
 from app.models.confirmed_skill import ConfirmedSkill
 from app.models.course import Course
-from app.models.db import Base, engine, get_db, SessionLocal
+from app.models.db import Base, dispose_async_engine, engine, get_async_db, get_db, SessionLocal
 from app.models.gap_snapshot import GapSnapshot
+from app.models.job_posting import JobPosting
+from app.models.migrations import run_migrations
 from app.models.normalised_entity import NormalisedEntity
 from app.models.user import User
 from app.schemas.user_schema import (
@@ -40,12 +46,51 @@ from app.schemas.user_schema import (
     UserLogin,
 )
 from app.services.ESCO.esco_normaliser import normalise_entity
+from app.services.analysis_pool import (
+    ANALYSIS_WORKERS,
+    DocumentError,
+    PoolBusy,
+    WorkerLost,
+    get_analysis_pool_stats,
+    run_document_analysis,
+    run_entity_batch,
+    run_text_extraction,
+    shutdown_analysis_pool,
+    start_analysis_pool,
+)
 from app.services.catalog.catalog_ingest import ingest_catalog
-from app.services.entity_extraction import extract_entities
+from app.services.catalog.course_schema import refresh_course_schema
+from app.services.document_cache import get_document_cache_stats, purge_stale_documents
 from app.services.entity_storage import save_cv_entities, save_jd_entities
-from app.services.gap_analysis import compute_missing_entities
-from app.services.recommender.course_ranker import rank_courses_for_missing
-from app.services.text_extraction import extract_text_from_upload
+from app.services.executors import configure_threadpool, run_password_work, shutdown_executors
+from app.services.skills.taxonomy_registry import (
+    DEFAULT_TAXONOMY,
+    loaded_taxonomies,
+    reload_taxonomy,
+    start_taxonomy_watcher,
+)
+from app.services.gap_analysis import compute_missing_entities, get_user_job, job_has_entities
+from app.services.recommender.course_ranker import (
+    get_recommendation_cache_stats,
+    rank_courses_for_missing,
+    warm_ranker_indexes,
+)
+from app.services.readiness import (
+    mark_failed,
+    mark_ready,
+    mark_running,
+    readiness_snapshot,
+    update_progress,
+)
+from app.services.text_extraction import is_zip_upload, read_zip_documents
+from app.services.warmup import run_warmup
+from app.utils.upload_utils import (
+    MAX_BATCH_UPLOAD_BYTES,
+    SpooledUpload,
+    reject_oversized_request,
+    spool_upload,
+    upload_size,
+)
 from app.utils.security import (
     create_access_token,
     decode_access_token,
@@ -53,32 +98,71 @@ from app.utils.security import (
     verify_password,
 )
 
-# Lifespan function to run startup code before the app starts accepting requests.
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+# Startup work that used to block the app before it could serve traffic:
+# import the local catalogue if the courses table is empty, then run the warm-up
+# stage (taxonomy matcher, a synthetic extraction, ranker indexes, TF-IDF scoring),
+# then drop document cache entries written by an older extractor version.
+# Runs once, in a background thread, and records progress for the /ready endpoint.
+def _run_startup_tasks() -> None:
     db = SessionLocal()
     try:
-        course_count = db.query(Course).count()
-        if course_count == 0:
-            ingest_catalog(
-                db=db,
-                base_dir=CATALOG_DIR,
-                filename=CATALOG_FILE,
-                truncate_first=False,
-            )
-            print("Local course catalogue imported successfully.")
-        else:
-            print("Course catalogue already present. Skipping import.")
-    except Exception as exc:
-        print(f"Course catalogue startup import failed: {exc}")
+        mark_running("catalog")
+        try:
+            course_count = db.query(Course).count()
+            if course_count == 0:
+                stats = ingest_catalog(
+                    db=db,
+                    base_dir=CATALOG_DIR,
+                    filename=CATALOG_FILE,
+                    truncate_first=False,
+                    progress=lambda rows: update_progress("catalog", rows_read=rows),
+                )
+                mark_ready("catalog", imported=True, inserted=stats["inserted"], rejected=stats["skipped"])
+                print("Local course catalogue imported successfully.")
+            else:
+                mark_ready("catalog", imported=False, courses=course_count)
+                print("Course catalogue already present. Skipping import.")
+        except Exception as exc:
+            db.rollback()
+            mark_failed("catalog", str(exc))
+            print(f"Course catalogue startup import failed: {exc}")
+
+        report = run_warmup(db)
+        if report:
+            timings = ", ".join(f"{step} {entry['seconds']}s" for step, entry in report.items())
+            print(f"Warm-up finished: {timings}")
+
+        purged = purge_stale_documents()
+        if purged:
+            print(f"Removed {purged} stale document cache entries.")
     finally:
         db.close()
 
+# Lifespan function: start the startup work in the background so the app can
+# accept requests (and answer /ready) straight away.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bound the threadpool that runs sync endpoints and database calls.
+    configure_threadpool()
+    # Keep a reference so the task is not garbage collected while it runs.
+    app.state.startup_task = asyncio.create_task(asyncio.to_thread(_run_startup_tasks))
+    # Pick up rebuilt taxonomy files without a restart.
+    start_taxonomy_watcher()
+    # Spawn the document analysis workers so they load spaCy before the first upload.
+    start_analysis_pool()
     yield
+    shutdown_analysis_pool()
+    shutdown_executors()
+    await dispose_async_engine()
 
 # Create the FastAPI application instance.
 app = FastAPI(lifespan=lifespan)
 
+# Refuse uploads whose Content-Length is over the size cap before the body is read.
+# Registered before CORSMiddleware so it runs inside it: the 413 response then carries
+# the CORS headers and the dashboard can show the error instead of a network failure.
+app.middleware("http")(reject_oversized_request)
+
 # Allow the React frontend to call the FastAPI backend during development.
 app.add_middleware(
     CORSMiddleware,
@@ -94,6 +178,8 @@ app.add_middleware(
 # create tables if they do not already exist.
 # create_all() only creates missing tables. It does not alter existing ones.
 Base.metadata.create_all(bind=engine)
+# Apply versioned schema changes (indexes, new columns) that create_all() cannot make.
+run_migrations(engine)
 
 # OAuth2 bearer token scheme for JWT auth.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -103,26 +189,6 @@ security = HTTPBearer()
 CATALOG_DIR = Path(__file__).resolve().parent / "data"
 CATALOG_FILE = "course_catalogue.json"
 
-@app.on_event("startup")
-def ensure_local_catalog_loaded():
-    db = SessionLocal()
-    try:
-        course_count = db.query(Course).count()
-        if course_count == 0:
-            ingest_catalog(
-                db=db,
-                base_dir=CATALOG_DIR,
-                filename=CATALOG_FILE,
-                truncate_first=False,
-            )
-            print("Local course catalogue imported successfully.")
-        else:
-            print("Course catalogue already present. Skipping import.")
-    except Exception as exc:
-        print(f"Course catalogue startup import failed: {exc}")
-    finally:
-        db.close()
-
 # Request body for confirmed-skill actions.
 class ConfirmedSkillRequest(BaseModel):
     skill_name: str
@@ -151,9 +217,9 @@ def _validate_password_strength(password: str) -> str:
 
 # Resolve the currently authenticated user from the JWT token.
 # Resolve the signed-in user from the bearer token.
-def _get_current_user(
+async def _get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     token = credentials.credentials
     payload = decode_access_token(token)
@@ -171,7 +237,7 @@ def _get_current_user(
     except (TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token subject")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -281,12 +347,8 @@ def _canonicalize_missing_entities(values: List[str]) -> List[str]:
     return output
 
 # Return a user's confirmed skills as a canonicalised set.
-def _get_confirmed_skill_set(db, user_id: int) -> set[str]:
-    rows = (
-        db.query(ConfirmedSkill.skill_name)
-        .filter(ConfirmedSkill.user_id == user_id)
-        .all()
-    )
+async def _get_confirmed_skill_set(db: AsyncSession, user_id: int) -> set[str]:
+    rows = await db.execute(select(ConfirmedSkill.skill_name).where(ConfirmedSkill.user_id == user_id))
     # variable confirmed is a set of cleaned and canonicalised skill names that the user has manually confirmed they have, used to adjust the missing-entity list returned to the frontend
     confirmed = set()
     # for loop to iterate through the rows and add the cleaned and canonicalised skill names to the confirmed set
@@ -301,9 +363,9 @@ def _get_confirmed_skill_set(db, user_id: int) -> set[str]:
     return confirmed
 
 # Remove confirmed skills from a missing-entity list after canonicalisation.
-def _apply_confirmed_skill_adjustments(db, user_id: int, missing_values: List[str]) -> List[str]:
+async def _apply_confirmed_skill_adjustments(db: AsyncSession, user_id: int, missing_values: List[str]) -> List[str]:
     canonical_missing = _canonicalize_missing_entities(missing_values)
-    confirmed = _get_confirmed_skill_set(db, user_id)
+    confirmed = await _get_confirmed_skill_set(db, user_id)
 
     if not confirmed:
         return canonical_missing
@@ -329,14 +391,71 @@ def _clean_organization(value: Any) -> Optional[str]:
 
     return text_value or None
 
-# Run heavy file parsing in a worker thread.
-def _extract_text_sync(upload_file, contents: bytes) -> str:
-    return extract_text_from_upload(upload_file, contents)
+# Endpoints declared `async def` must not block the event loop: document analysis
+# goes to the analysis process pool, bcrypt to the password executor and database
+# access through the async session (get_async_db). Endpoints built on services that
+# still take a sync Session (catalogue import, ESCO normalisation) are plain `def`,
+# which FastAPI runs in its (bounded) threadpool. See services/executors.py.
+
+# Turn analysis pool errors into HTTP responses.
+def _pool_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, PoolBusy):
+        return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+    if isinstance(exc, DocumentError):
+        return HTTPException(status_code=exc.status_code, detail=exc.detail)
+    return HTTPException(status_code=404, detail=str(exc.args[0]))
+
+
+# Text + entity extraction for one uploaded document in the analysis process pool.
+# A document that was analysed before (same bytes, extractor and taxonomy version)
+# is answered from the document cache. Returns (extraction, per-stage timings).
+async def _analyse_upload(upload: SpooledUpload, taxonomy: str = DEFAULT_TAXONOMY):
+    try:
+        return await run_document_analysis(
+            upload.filename,
+            upload.content_type,
+            upload.source(),
+            taxonomy,
+            doc_hash=upload.sha256(),
+        )
+    except (PoolBusy, DocumentError, KeyError) as exc:
+        raise _pool_error(exc)
 
 
-# Run heavy NLP/entity extraction in a worker thread.
-def _extract_entities_sync(cleaned_text: str) -> dict:
-    return extract_entities(cleaned_text)
+# Shown when a job has no stored JD entities to compare against.
+JD_ENTITIES_PENDING = (
+    "No skills are saved for this job description yet: it was too long to read completely "
+    "(page or time limit) or no known skills were found in it. Try uploading it again."
+)
+
+# Most documents accepted by one batch extraction request (files plus zip members).
+BATCH_EXTRACTION_MAX_DOCUMENTS = 500
+
+# Extract text for every document of a batch in the analysis process pool, at most one
+# document per worker at a time so the batch does not fill the shared queue.
+# A document that cannot be read (or kills its worker) gets an error instead of
+# failing the whole batch; a full queue still fails the request with a 503.
+async def _extract_batch_texts(documents: List[tuple]) -> List[dict]:
+    slots = asyncio.Semaphore(max(1, ANALYSIS_WORKERS))
+
+    async def extract_one(filename: str, content_type: str, source) -> dict:
+        async with slots:
+            try:
+                text_content, _, _ = await run_text_extraction(filename, content_type, source)
+            except DocumentError as exc:
+                return {"filename": filename, "error": exc.detail}
+            except WorkerLost as exc:
+                return {"filename": filename, "error": str(exc)}
+        return {"filename": filename, "text": text_content}
+
+    # Let every job finish before raising, since the spooled files go away with the request.
+    results = await asyncio.gather(*(extract_one(*document) for document in documents), return_exceptions=True)
+    for result in results:
+        if isinstance(result, PoolBusy):
+            raise _pool_error(result)
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
 
 
 # Root endpoint used as a quick health check.
@@ -345,16 +464,31 @@ def home():
     return {"message": "Skillgap backend API is running"}
 
 
+# Readiness probe for the orchestrator: 200 once the catalogue, taxonomy matcher
+# and ranker caches are loaded, 503 (with per-component progress) until then.
+# Also reports the per-step warm-up timings.
+@app.get("/ready")
+def ready():
+    snapshot = readiness_snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+
 # Simple database test endpoint.
 @app.get("/db-test")
-def test_database(db=Depends(get_db)):
-    result = db.execute(text("SELECT 'Database connection OK' AS status;"))
+async def test_database(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(text("SELECT 'Database connection OK' AS status;"))
     return {"database": result.fetchone()[0]}
 
 
+# Look up a user by username or email.
+async def _find_user(db: AsyncSession, username: str, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where((User.username == username) | (User.email == email)).limit(1))
+    return result.scalars().first()
+
+
 # Register a new user.
 @app.post("/register")
-async def register_user(payload: UserCreate, db=Depends(get_db)):
+async def register_user(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
     username = payload.username.strip()
     email = payload.email.strip().lower()
     password = payload.password
@@ -365,11 +499,7 @@ async def register_user(payload: UserCreate, db=Depends(get_db)):
             detail="Password is too long. Please use a shorter password.",
         )
 
-    existing_user = (
-        db.query(User)
-        .filter((User.username == username) | (User.email == email))
-        .first()
-    )
+    existing_user = await _find_user(db, username, email)
 
     if existing_user:
         raise HTTPException(
@@ -380,27 +510,22 @@ async def register_user(payload: UserCreate, db=Depends(get_db)):
     new_user = User(
         username=username,
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=await run_password_work(hash_password, password),
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return {"message": "User registered successfully"}
 
 # Sign in using either username or email plus password.
 @app.post("/login", response_model=TokenResponse)
-async def login_user(payload: UserLogin, db=Depends(get_db)):
+async def login_user(payload: UserLogin, db: AsyncSession = Depends(get_async_db)):
     identifier = payload.identifier.strip()
 
-    user = (
-        db.query(User)
-        .filter((User.username == identifier) | (User.email == identifier))
-        .first()
-    )
+    user = await _find_user(db, identifier, identifier)
 
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user or not await run_password_work(verify_password, payload.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid username/email or password")
 
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -426,22 +551,31 @@ async def get_me(current_user: User = Depends(_get_current_user)):
 
 # Return the signed-in user's stored gap-analysis history.
 @app.get("/me/history")
-async def get_user_history(current_user: User = Depends(_get_current_user), db=Depends(get_db)):
+async def get_user_history(
+    current_user: User = Depends(_get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     snapshots = (
-        db.query(GapSnapshot)
-        .filter(GapSnapshot.user_id == current_user.id)
-        .order_by(GapSnapshot.created_at.desc())
-        .all()
-    )
+        await db.execute(
+            select(GapSnapshot)
+            .where(GapSnapshot.user_id == current_user.id)
+            .order_by(GapSnapshot.created_at.desc())
+        )
+    ).scalars().all()
+    # Confirmed skills are the same for every snapshot, so they are read once.
+    confirmed = await _get_confirmed_skill_set(db, current_user.id)
     # history variable is a list of dicts with snapshot_id, created_at, missing_entities, and missing_count
     history = []
     for snapshot in snapshots:
-        missing_entities = _apply_confirmed_skill_adjustments(
-            db, current_user.id, snapshot.missing_entities or []
-        )
+        missing_entities = [
+            value
+            for value in _canonicalize_missing_entities(snapshot.missing_entities or [])
+            if value not in confirmed
+        ]
         history.append(
             {
                 "snapshot_id": snapshot.id,
+                "job_id": snapshot.job_id,
                 "created_at": snapshot.created_at.isoformat() if snapshot.created_at else None,
                 "missing_entities": missing_entities,
                 "missing_count": len(missing_entities),
@@ -459,24 +593,24 @@ async def get_user_history(current_user: User = Depends(_get_current_user), db=D
 async def delete_history_snapshot(
     snapshot_id: int,
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Find the snapshot only if it belongs to the signed-in user.
     snapshot = (
-        db.query(GapSnapshot)
-        .filter(
-            GapSnapshot.id == snapshot_id,
-            GapSnapshot.user_id == current_user.id,
+        await db.execute(
+            select(GapSnapshot).where(
+                GapSnapshot.id == snapshot_id,
+                GapSnapshot.user_id == current_user.id,
+            )
         )
-        .first()
-    )
+    ).scalars().first()
     # Prevent deleting another user's data or deleting something that does not exist.
     if not snapshot:
         raise HTTPException(status_code=404, detail="History snapshot not found.")
 
     # Delete the snapshot and save the change.
-    db.delete(snapshot)
-    db.commit()
+    await db.delete(snapshot)
+    await db.commit()
 
     return {
         "message": "History snapshot deleted successfully.",
@@ -485,23 +619,37 @@ async def delete_history_snapshot(
 
 # Export the signed-in user's account-related data.
 @app.get("/me/export")
-async def export_user_data(current_user: User = Depends(_get_current_user), db=Depends(get_db)):
-    cv_entities = db.query(CVEntity).filter(CVEntity.user_id == current_user.id).all()
+async def export_user_data(
+    current_user: User = Depends(_get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    cv_entities = (
+        await db.execute(select(CVEntity).where(CVEntity.user_id == current_user.id))
+    ).scalars().all()
     normalised_entities = (
-        db.query(NormalisedEntity).filter(NormalisedEntity.user_id == current_user.id).all()
-    )
+        await db.execute(select(NormalisedEntity).where(NormalisedEntity.user_id == current_user.id))
+    ).scalars().all()
     gap_snapshots = (
-        db.query(GapSnapshot)
-        .filter(GapSnapshot.user_id == current_user.id)
-        .order_by(GapSnapshot.created_at.desc())
-        .all()
-    )
+        await db.execute(
+            select(GapSnapshot)
+            .where(GapSnapshot.user_id == current_user.id)
+            .order_by(GapSnapshot.created_at.desc())
+        )
+    ).scalars().all()
     confirmed_skills = (
-        db.query(ConfirmedSkill)
-        .filter(ConfirmedSkill.user_id == current_user.id)
-        .order_by(ConfirmedSkill.skill_name.asc())
-        .all()
-    )
+        await db.execute(
+            select(ConfirmedSkill)
+            .where(ConfirmedSkill.user_id == current_user.id)
+            .order_by(ConfirmedSkill.skill_name.asc())
+        )
+    ).scalars().all()
+    job_postings = (
+        await db.execute(
+            select(JobPosting)
+            .where(JobPosting.owner_id == current_user.id)
+            .order_by(JobPosting.uploaded_at.desc())
+        )
+    ).scalars().all()
 
     return {
         "account": {
@@ -513,6 +661,7 @@ async def export_user_data(current_user: User = Depends(_get_current_user), db=D
             {
                 "id": row.id,
                 "entity_name": row.entity_name,
+                "taxonomy_version": row.taxonomy_version,
             }
             for row in cv_entities
         ],
@@ -530,11 +679,22 @@ async def export_user_data(current_user: User = Depends(_get_current_user), db=D
         "gap_snapshots": [
             {
                 "id": row.id,
+                "job_id": row.job_id,
                 "missing_entities": row.missing_entities,
                 "created_at": row.created_at.isoformat() if row.created_at else None,
             }
             for row in gap_snapshots
         ],
+        "job_postings": [
+            {
+                "id": row.id,
+                "filename": row.filename,
+                "content_hash": row.content_hash,
+                "taxonomy_version": row.taxonomy_version,
+                "uploaded_at": row.uploaded_at.isoformat() if row.uploaded_at else None,
+            }
+            for row in job_postings
+        ],
         "confirmed_skills": [
             {
                 "id": row.id,
@@ -550,14 +710,15 @@ async def export_user_data(current_user: User = Depends(_get_current_user), db=D
 async def change_user_password(
     payload: PasswordChangeRequest,
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if not verify_password(payload.current_password, current_user.hashed_password):
+    if not await run_password_work(verify_password, payload.current_password, current_user.hashed_password):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
 
     new_password = _validate_password_strength(payload.new_password)
-    current_user.hashed_password = hash_password(new_password)
-    db.commit()
+    current_user.hashed_password = await run_password_work(hash_password, new_password)
+    # current_user was loaded through this request's session, so committing it saves the change.
+    await db.commit()
 
     return {"message": "Password updated successfully"}
 
@@ -566,47 +727,38 @@ async def change_user_password(
 @app.delete("/me")
 async def delete_my_account(
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         # Delete user-linked child rows first to satisfy foreign key constraints.
-        db.query(GapSnapshot).filter(
-            GapSnapshot.user_id == current_user.id
-        ).delete()
+        await db.execute(delete(GapSnapshot).where(GapSnapshot.user_id == current_user.id))
+
+        await db.execute(delete(ConfirmedSkill).where(ConfirmedSkill.user_id == current_user.id))
 
-        db.query(ConfirmedSkill).filter(
-            ConfirmedSkill.user_id == current_user.id
-        ).delete()
+        await db.execute(delete(NormalisedEntity).where(NormalisedEntity.user_id == current_user.id))
 
-        db.query(NormalisedEntity).filter(
-            NormalisedEntity.user_id == current_user.id
-        ).delete()
+        await db.execute(delete(CVEntity).where(CVEntity.user_id == current_user.id))
 
-        db.query(CVEntity).filter(
-            CVEntity.user_id == current_user.id
-        ).delete()
+        # JD entities are shared by content hash with other users' jobs, so only the jobs go.
+        await db.execute(delete(JobPosting).where(JobPosting.owner_id == current_user.id))
 
         # Finally delete the user row itself.
-        db.query(User).filter(
-            User.id == current_user.id
-        ).delete()
+        await db.execute(delete(User).where(User.id == current_user.id))
 
-        db.commit()
+        await db.commit()
 
         return {"message": "Account and related user data deleted successfully"}
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to delete account")
 
 # Lightweight upload test endpoint for CV files.
 @app.post("/upload-cv")
 async def upload_cv(file: UploadFile = File(...)):
-    contents = await file.read()
-
     return {
         "filename": file.filename,
-        "filesize": len(contents),
+        "filesize": upload_size(file),
         "content_type": file.content_type,
         "status": "CV uploaded successfully",
     }
@@ -614,11 +766,9 @@ async def upload_cv(file: UploadFile = File(...)):
 # Lightweight upload test endpoint for job-description files.
 @app.post("/upload-jd")
 async def upload_jd(file: UploadFile = File(...)):
-    contents = await file.read()
-
     return {
         "filename": file.filename,
-        "filesize": len(contents),
+        "filesize": upload_size(file),
         "content_type": file.content_type,
         "status": "Job Description uploaded successfully",
     }
@@ -626,93 +776,220 @@ async def upload_jd(file: UploadFile = File(...)):
 # Extract raw text from an uploaded file.
 @app.post("/extract-text")
 async def extract_text(file: UploadFile = File(...)):
-    contents = await file.read()
-    cleaned_text = extract_text_from_upload(file, contents)
+    with await spool_upload(file) as upload:
+        try:
+            cleaned_text, details, _ = await run_text_extraction(upload.filename, upload.content_type, upload.source())
+        except (PoolBusy, DocumentError) as exc:
+            raise _pool_error(exc)
 
     return {
         "filename": file.filename,
         "text": cleaned_text,
+        "truncated": details["truncated"],
+        "document": details,
     }
 
 # Extract entities from an uploaded file.
+# taxonomy picks a loaded taxonomy other than the active one (e.g. "unfiltered").
 @app.post("/extract-entities")
-async def extract_entities_endpoint(file: UploadFile = File(...)):
-    contents = await file.read()
-    cleaned_text = extract_text_from_upload(file, contents)
-    extraction_result = extract_entities(cleaned_text)
+async def extract_entities_endpoint(file: UploadFile = File(...), taxonomy: str = DEFAULT_TAXONOMY):
+    with await spool_upload(file) as upload:
+        extraction_result, _ = await _analyse_upload(upload, taxonomy)
 
     return {
         "filename": file.filename,
         "entities": extraction_result,
     }
 
+# Extract entities from many CVs in one request (e.g. every applicant for a job).
+# Accepts several PDF/DOCX files and/or zip archives of them. Text is extracted per
+# document, then the documents are split across the analysis pool workers, each of
+# which runs its share through spaCy's nlp.pipe.
+# batch_size tunes nlp.pipe; n_process caps how many pool workers share the batch.
+@app.post("/extract-entities/batch")
+async def extract_entities_batch_endpoint(
+    files: List[UploadFile] = File(...),
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+    taxonomy: str = DEFAULT_TAXONOMY,
+):
+    # Spool files stay on disk until text extraction has finished with them.
+    with ExitStack() as spools:
+        documents = []
+        for file in files:
+            if is_zip_upload(file.filename, file.content_type):
+                archive = spools.enter_context(await spool_upload(file, max_bytes=MAX_BATCH_UPLOAD_BYTES))
+                members = await run_in_threadpool(read_zip_documents, archive.source())
+                documents.extend((f"{file.filename}/{name}", "", data) for name, data in members)
+            else:
+                upload = spools.enter_context(await spool_upload(file))
+                documents.append((upload.filename, upload.content_type, upload.source()))
+
+        if not documents:
+            raise HTTPException(status_code=400, detail="No PDF or DOCX documents were uploaded.")
+        if len(documents) > BATCH_EXTRACTION_MAX_DOCUMENTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many documents in one batch (limit {BATCH_EXTRACTION_MAX_DOCUMENTS}).",
+            )
+
+        started = time.perf_counter()
+        extracted = await _extract_batch_texts(documents)
+        text_seconds = time.perf_counter() - started
+
+    readable = [doc for doc in extracted if "text" in doc]
+    try:
+        batch = await run_entity_batch([doc["text"] for doc in readable], batch_size, n_process, taxonomy)
+    except (KeyError, PoolBusy) as exc:
+        raise _pool_error(exc)
+    for doc, entities in zip(readable, batch["results"]):
+        doc["entities"] = entities
+        del doc["text"]
+
+    return {
+        "documents": extracted,
+        "count": len(extracted),
+        "failed": len(extracted) - len(readable),
+        "stats": {**batch["stats"], "text_extraction_seconds": round(text_seconds, 3)},
+    }
+
 # Extract and save CV entities for the signed-in user.
 @app.post("/analysis/save-cv-entities")
 async def save_cv_entities_endpoint(
     file: UploadFile = File(...),
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    contents = await file.read()
-
-    cleaned_text = await run_in_threadpool(_extract_text_sync, file, contents)
-    extraction = await run_in_threadpool(_extract_entities_sync, cleaned_text)
+    with await spool_upload(file) as upload:
+        extraction, timings = await _analyse_upload(upload)
 
     entity_list = extraction.get("unique_entities", [])
-    result = save_cv_entities(db, current_user.id, entity_list)
+    result = await save_cv_entities(db, current_user.id, entity_list, extraction["meta"]["taxonomy_version"])
 
     return {
         "saved": result,
         "entities": entity_list,
+        "document": extraction["meta"].get("document"),
+        "timings": timings,
     }
 
-# Extract and save the current job-description entities.
+# Extract and save job-description entities as a job of the signed-in user.
+# The returned saved.job_id selects the job in /analysis/compute-gap.
 @app.post("/analysis/save-jd-entities")
 async def save_jd_entities_endpoint(
     file: UploadFile = File(...),
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    contents = await file.read()
-
-    cleaned_text = await run_in_threadpool(_extract_text_sync, file, contents)
-    extraction = await run_in_threadpool(_extract_entities_sync, cleaned_text)
+    with await spool_upload(file) as upload:
+        extraction, timings = await _analyse_upload(upload)
+        content_hash = upload.sha256()
 
     entity_list = extraction.get("unique_entities", [])
-    result = save_jd_entities(db, entity_list)
+    result = await save_jd_entities(
+        db,
+        current_user.id,
+        content_hash,
+        entity_list,
+        extraction["meta"]["taxonomy_version"],
+        filename=file.filename,
+        truncated=extraction["meta"]["document"]["truncated"],
+    )
 
     return {
         "saved": result,
+        "warning": JD_ENTITIES_PENDING if result["entities_pending"] else None,
         "entities": entity_list,
+        "document": extraction["meta"].get("document"),
+        "timings": timings,
     }
 
-# Compute the current gap for the signed-in user.
-@app.post("/analysis/compute-gap")
-async def compute_gap(current_user: User = Depends(_get_current_user), db=Depends(get_db)):
-    missing = compute_missing_entities(db, current_user.id)
-    missing = _apply_confirmed_skill_adjustments(db, current_user.id, missing)
+# Analysis process pool queue depth, job counters and per-stage timings.
+@app.get("/analysis/pool-stats")
+def analysis_pool_stats():
+    return get_analysis_pool_stats()
+
+# Document cache size and hit/miss counters.
+@app.get("/analysis/document-cache-stats")
+def document_cache_stats():
+    return get_document_cache_stats()
+
+# The signed-in user's jobs (uploaded job descriptions), most recent first.
+@app.get("/analysis/jobs")
+async def list_jobs(
+    current_user: User = Depends(_get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = (
+        await db.execute(
+            select(JobPosting)
+            .where(JobPosting.owner_id == current_user.id)
+            .order_by(JobPosting.uploaded_at.desc(), JobPosting.id.desc())
+        )
+    ).scalars().all()
+
+    return {
+        "user_id": current_user.id,
+        "jobs": [
+            {
+                "job_id": row.id,
+                "filename": row.filename,
+                "uploaded_at": row.uploaded_at,
+            }
+            for row in rows
+        ],
+        "count": len(rows),
+    }
 
-    snapshot = GapSnapshot(user_id=current_user.id, missing_entities=missing)
+# Compute the gap for the signed-in user against one of their jobs.
+# job_id defaults to the job description the user uploaded most recently.
+@app.post("/analysis/compute-gap")
+async def compute_gap(
+    job_id: Optional[int] = None,
+    current_user: User = Depends(_get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    job = await get_user_job(db, current_user.id, job_id)
+    if job is None:
+        detail = "Job not found" if job_id is not None else "Upload a job description before computing a gap"
+        raise HTTPException(status_code=404, detail=detail)
+    # An empty gap would read as a perfect match, so say why there is nothing to compare.
+    if not await job_has_entities(db, job):
+        raise HTTPException(status_code=409, detail=JD_ENTITIES_PENDING)
+
+    missing = await compute_missing_entities(db, current_user.id, job.id)
+    missing = await _apply_confirmed_skill_adjustments(db, current_user.id, missing)
+
+    snapshot = GapSnapshot(user_id=current_user.id, job_id=job.id, missing_entities=missing)
     db.add(snapshot)
-    db.commit()
-    db.refresh(snapshot)
+    await db.commit()
+    await db.refresh(snapshot)
 
     return {
         "user_id": current_user.id,
+        "job_id": job.id,
         "missing_entities": missing,
         "count": len(missing),
         "snapshot_id": snapshot.id,
     }
 
-# Return the latest missing-entity snapshot for the signed-in user.
-@app.get("/analysis/missing-entities")
-async def get_missing_entities(current_user: User = Depends(_get_current_user), db=Depends(get_db)):
-    snapshot = (
-        db.query(GapSnapshot)
-        .filter(GapSnapshot.user_id == current_user.id)
+# Most recent gap snapshot of a user, or None.
+async def _latest_snapshot(db: AsyncSession, user_id: int) -> Optional[GapSnapshot]:
+    result = await db.execute(
+        select(GapSnapshot)
+        .where(GapSnapshot.user_id == user_id)
         .order_by(GapSnapshot.created_at.desc())
-        .first()
+        .limit(1)
     )
+    return result.scalars().first()
+
+# Return the latest missing-entity snapshot for the signed-in user.
+@app.get("/analysis/missing-entities")
+async def get_missing_entities(
+    current_user: User = Depends(_get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    snapshot = await _latest_snapshot(db, current_user.id)
 
     if not snapshot:
         return {
@@ -721,7 +998,7 @@ async def get_missing_entities(current_user: User = Depends(_get_current_user),
             "count": 0,
         }
 
-    missing = _apply_confirmed_skill_adjustments(
+    missing = await _apply_confirmed_skill_adjustments(
         db, current_user.id, snapshot.missing_entities or []
     )
 
@@ -730,6 +1007,7 @@ async def get_missing_entities(current_user: User = Depends(_get_current_user),
         "missing_entities": missing,
         "count": len(missing),
         "snapshot_id": snapshot.id,
+        "job_id": snapshot.job_id,
         "created_at": snapshot.created_at,
     }
 
@@ -737,14 +1015,15 @@ async def get_missing_entities(current_user: User = Depends(_get_current_user),
 @app.get("/me/confirmed-skills")
 async def get_confirmed_skills(
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     rows = (
-        db.query(ConfirmedSkill)
-        .filter(ConfirmedSkill.user_id == current_user.id)
-        .order_by(ConfirmedSkill.skill_name.asc())
-        .all()
-    )
+        await db.execute(
+            select(ConfirmedSkill)
+            .where(ConfirmedSkill.user_id == current_user.id)
+            .order_by(ConfirmedSkill.skill_name.asc())
+        )
+    ).scalars().all()
 
     skills = []
     for row in rows:
@@ -771,7 +1050,7 @@ async def get_confirmed_skills(
 async def add_confirmed_skill(
     payload: ConfirmedSkillRequest,
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     skill_name = _norm(payload.skill_name)
     skill_name = SYNONYMS.get(skill_name, skill_name)
@@ -780,13 +1059,13 @@ async def add_confirmed_skill(
         raise HTTPException(status_code=400, detail="Skill name is required")
 
     existing = (
-        db.query(ConfirmedSkill)
-        .filter(
-            ConfirmedSkill.user_id == current_user.id,
-            ConfirmedSkill.skill_name == skill_name,
+        await db.execute(
+            select(ConfirmedSkill).where(
+                ConfirmedSkill.user_id == current_user.id,
+                ConfirmedSkill.skill_name == skill_name,
+            )
         )
-        .first()
-    )
+    ).scalars().first()
 
     if existing:
         return {
@@ -800,8 +1079,8 @@ async def add_confirmed_skill(
         skill_name=skill_name,
     )
     db.add(row)
-    db.commit()
-    db.refresh(row)
+    await db.commit()
+    await db.refresh(row)
 
     return {
         "message": "Skill confirmed successfully",
@@ -815,25 +1094,25 @@ async def add_confirmed_skill(
 async def remove_confirmed_skill(
     skill_name: str,
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     cleaned_skill = _norm(skill_name)
     cleaned_skill = SYNONYMS.get(cleaned_skill, cleaned_skill)
 
     row = (
-        db.query(ConfirmedSkill)
-        .filter(
-            ConfirmedSkill.user_id == current_user.id,
-            ConfirmedSkill.skill_name == cleaned_skill,
+        await db.execute(
+            select(ConfirmedSkill).where(
+                ConfirmedSkill.user_id == current_user.id,
+                ConfirmedSkill.skill_name == cleaned_skill,
+            )
         )
-        .first()
-    )
+    ).scalars().first()
 
     if not row:
         raise HTTPException(status_code=404, detail="Confirmed skill not found")
 
-    db.delete(row)
-    db.commit()
+    await db.delete(row)
+    await db.commit()
 
     return {
         "message": "Confirmed skill removed",
@@ -842,11 +1121,21 @@ async def remove_confirmed_skill(
     }
 
 # Normalise CV and JD entities for a given user.
+# job_id selects the job whose JD entities are included (default: the latest one).
 @app.post("/normalise-entities")
-async def normalise_entities(
+def normalise_entities(
+    job_id: Optional[int] = None,
     current_user: User = Depends(_get_current_user),
     db=Depends(get_db),
 ):
+    # The job whose JD entities are included, if the user has one.
+    job_query = db.query(JobPosting).filter(JobPosting.owner_id == current_user.id)
+    if job_id is not None:
+        job_query = job_query.filter(JobPosting.id == job_id)
+    job = job_query.order_by(JobPosting.uploaded_at.desc(), JobPosting.id.desc()).first()
+    if job is None and job_id is not None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
     # Remove any previous normalised records for this signed-in user
     # so each run reflects the latest CV + JD state.
     db.query(NormalisedEntity).filter(
@@ -861,8 +1150,17 @@ async def normalise_entities(
         .all()
     )
 
-    # JD entities are still treated as the current shared target JD set.
-    jd_entities = db.query(JDEntity.entity_name).all()
+    # JD entities of that job.
+    jd_entities = (
+        db.query(JDEntity.entity_name)
+        .filter(
+            JDEntity.content_hash == job.content_hash,
+            JDEntity.taxonomy_version.is_not_distinct_from(job.taxonomy_version),
+        )
+        .all()
+        if job is not None
+        else []
+    )
 
     # Combine CV and JD entities into one list while also preparing a lowered form
     # for duplicate removal.
@@ -920,33 +1218,85 @@ async def normalise_entities(
 
 # Import the local course catalog JSON file into the database.
 @app.post("/catalog/import-local")
-def import_catalog_local(db=Depends(get_db)):
+def import_catalog_local(full: bool = False, allow_mass_delete: bool = False, db=Depends(get_db)):
+    # Default is incremental: only new, changed and removed courses are written.
+    # An incremental import that would delete more than CATALOG_MAX_DELETE_FRACTION of
+    # the courses (e.g. an empty or truncated export) skips its deletes unless
+    # allow_mass_delete=true.
+    # full=true rebuilds the whole catalogue in a shadow table and swaps it in,
+    # so searches and recommendations keep using the old catalogue until it is ready.
     stats = ingest_catalog(
         db=db,
         base_dir=CATALOG_DIR,
         filename=CATALOG_FILE,
-        truncate_first=True,
+        truncate_first=full,
+        mode="bulk" if full else "incremental",
+        allow_mass_delete=allow_mass_delete,
     )
+    # Rebuild the ranker indexes for the new catalogue version straight away
+    # (a no-op when nothing changed or the swap already prebuilt them).
+    warm_ranker_indexes(db)
     return {
         "message": "Catalog import complete",
+        "changes": {
+            "inserted": stats["inserted"],
+            "updated": stats["updated"],
+            "deleted": stats.get("deleted"),
+            "deletes_skipped": stats.get("deletes_skipped"),
+            "unchanged": stats.get("unchanged"),
+            "rejected": stats["skipped"],
+        },
         "stats": {CATALOG_FILE: stats},
     }
 
+# Admin signal: re-read the courses table schema (e.g. after a manual ALTER TABLE)
+# and rebuild the ranker indexes against the new column set.
+@app.post("/catalog/refresh-schema")
+def refresh_catalog_schema(db=Depends(get_db)):
+    schema = refresh_course_schema(db)
+    warm_ranker_indexes(db)
+    return {
+        "message": "Course schema refreshed",
+        "generation": schema.generation,
+        "columns": sorted(schema.columns),
+        "select_fields": schema.select_fields,
+    }
+
+# Loaded skill taxonomies and their version ids.
+@app.get("/taxonomy")
+def list_taxonomies():
+    return {"taxonomies": loaded_taxonomies()}
+
+# Admin signal: re-read a taxonomy file (or every loaded taxonomy) after it was rebuilt.
+# The new matcher is built while requests keep using the old one, then swapped in;
+# entities saved from then on carry the new taxonomy version.
+@app.post("/taxonomy/reload")
+def reload_taxonomy_endpoint(name: Optional[str] = None):
+    try:
+        report = reload_taxonomy(name)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc.args[0]))
+    return {
+        "message": "Taxonomy reload complete",
+        "taxonomies": report,
+    }
+
 # Search the local course catalog by query string.
 @app.get("/catalog/search")
-def search_catalog(query: str, limit: int = 10, db=Depends(get_db)):
+async def search_catalog(query: str, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
     q = f"%{query.lower()}%"
 
     rows = (
-        db.query(Course)
-        .filter(
-            (Course.course_name.ilike(q)) |
-            (Course.description.ilike(q)) |
-            (Course.provider.ilike(q))
+        await db.execute(
+            select(Course)
+            .where(
+                (Course.course_name.ilike(q)) |
+                (Course.description.ilike(q)) |
+                (Course.provider.ilike(q))
+            )
+            .limit(limit)
         )
-        .limit(limit)
-        .all()
-    )
+    ).scalars().all()
     # Only return the fields that are relevant for course recommendation
     results = []
     for row in rows:
@@ -984,25 +1334,26 @@ async def recommend_courses(
     experience_level: Optional[str] = None,
     has_taken_course: Optional[bool] = None,
     current_user: User = Depends(_get_current_user),
-    db=Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    sync_db=Depends(get_db),
 ):
-    snapshot = (
-        db.query(GapSnapshot)
-        .filter(GapSnapshot.user_id == current_user.id)
-        .order_by(GapSnapshot.created_at.desc())
-        .first()
-    )
+    snapshot = await _latest_snapshot(db, current_user.id)
     # If no snapshot is found, return an error message instead of recommendations.
     if not snapshot:
         return {"error": "No gap analysis found. Complete a skill gap test first."}
     # Apply confirmed skill adjustments to the missing entities before ranking courses 
     # to refresh the missing entity list and ensure recommendations reflect the user's confirmed skills.
-    missing = _apply_confirmed_skill_adjustments(
+    missing = await _apply_confirmed_skill_adjustments(
         db, current_user.id, snapshot.missing_entities or []
     )
+    # Hand the async connection back before the ranker takes a sync one, so a request
+    # never holds a connection from both pools.
+    await db.close()
     # variable ranked is a list of dicts with course information
-    ranked = rank_courses_for_missing(
-        db=db,
+    # The ranker still works on a sync Session and does CPU work, so it runs in the threadpool.
+    ranked = await run_in_threadpool(
+        rank_courses_for_missing,
+        db=sync_db,
         missing_entities=missing,
         top_n=top_n,
         use_cosine=use_cosine,
@@ -1019,4 +1370,9 @@ async def recommend_courses(
         "experience_level": experience_level,
         "has_taken_course": has_taken_course,
         "recommendations": ranked,
-    }
\ No newline at end of file
+    }
+
+# Report recommendation cache counters so the cache can be sized.
+@app.get("/analysis/recommend-courses/cache-stats")
+def recommendation_cache_stats():
+    return get_recommendation_cache_stats()
@@ -15,5 +15,7 @@ class CVEntity(Base):
 
     entity_name = Column(String, nullable=False)
     entity_type = Column(String, nullable=True)
+    # Version of the skill taxonomy the entities were extracted with (see taxonomy_registry.py).
+    taxonomy_version = Column(String, nullable=True)
 
     user = relationship("User")
@@ -1,12 +1,20 @@
 # JD_entity.py
 # Stores entities taken from a Job Description.
+# Rows are keyed by the document's content hash and the taxonomy version they were
+# extracted with, and shared by every job (see job_posting.py) pinned to that pair.
+# A set is written once and never changed afterwards.
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from app.models.db import Base
 
 class JDEntity(Base):
     __tablename__ = "jd_entities"
+    __table_args__ = (Index("ix_jd_entities_hash_version", "content_hash", "taxonomy_version"),)
 
     id = Column(Integer, primary_key=True, index=True)
+    # SHA-256 of the JD document the entities were extracted from.
+    content_hash = Column(String, nullable=True)
     entity_name = Column(String, nullable=False)
     entity_type = Column(String, nullable=True)
+    # Version of the skill taxonomy the entities were extracted with (see taxonomy_registry.py).
+    taxonomy_version = Column(String, nullable=True)
@@ -34,3 +34,6 @@ class Course(Base):
     has_rating = Column(Integer, nullable=True)
     has_subject = Column(Integer, nullable=True)
     has_no_enrol = Column(Integer, nullable=True)
+
+    # sha256 of the imported fields, used by incremental imports to skip unchanged rows
+    content_hash = Column(String, nullable=True)
@@ -1,24 +1,84 @@
 # db.py
 # Database connection and session setup for Skillgap.
+# Two engines share one configuration:
+#   - an async engine (asyncpg) behind get_async_db, used by the API endpoints
+#   - the synchronous engine behind get_db / SessionLocal, used by the services that
+#     still take a Session (catalogue import, course ranker, ESCO normalisation),
+#     the startup task and the data preprocessing scripts
+#
+# Each process therefore has two connection pools, and can hold up to
+# 2 * (POOL_SIZE + MAX_OVERFLOW) connections; multiply by the uvicorn worker count
+# when checking against the server's max_connections.
+#
+# Configuration (environment, or the backend .env file):
+#   SKILLGAP_DATABASE_URL                  full postgresql:// URL (overrides DATABASE_URL)
+#   DATABASE_URL                           full postgresql:// URL (overrides the DB_* parts below)
+#   SKILLGAP_DB_USER / _PASSWORD / _HOST / _PORT / _NAME
+#   SKILLGAP_DB_ECHO=0                     log every SQL statement
+#   SKILLGAP_DB_POOL_SIZE=5                connections kept open per engine
+#   SKILLGAP_DB_MAX_OVERFLOW=5             extra connections per engine allowed under load
+#   SKILLGAP_DB_POOL_TIMEOUT=30            seconds to wait for a free connection
+#   SKILLGAP_DB_POOL_RECYCLE=1800          seconds before a connection is replaced
+#   SKILLGAP_DB_PRE_PING=1                 check connections before handing them out
+#   SKILLGAP_DB_STATEMENT_TIMEOUT_MS=30000 server-side statement timeout (0 disables)
 
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-# Environment variables will be moved to .env later.
-DB_USER = "admin"
-DB_PASSWORD = "password"
-DB_HOST = "localhost"
-DB_PORT = "5432"
-DB_NAME = "skillgap"
+# load environment variables from backend .env file
+load_dotenv()
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() not in {"0", "false", "no", "off"}
+
+
+DB_USER = os.getenv("SKILLGAP_DB_USER", "admin")
+DB_PASSWORD = os.getenv("SKILLGAP_DB_PASSWORD", "password")
+DB_HOST = os.getenv("SKILLGAP_DB_HOST", "localhost")
+DB_PORT = os.getenv("SKILLGAP_DB_PORT", "5432")
+DB_NAME = os.getenv("SKILLGAP_DB_NAME", "skillgap")
 
 DATABASE_URL = (
-    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    os.getenv("SKILLGAP_DATABASE_URL")
+    or os.getenv("DATABASE_URL")
+    or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
+# Same database through the asyncpg driver (whatever driver, if any, the URL names).
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+DB_ECHO = _flag("SKILLGAP_DB_ECHO", "0")
+DB_POOL_SIZE = int(os.getenv("SKILLGAP_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("SKILLGAP_DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("SKILLGAP_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("SKILLGAP_DB_POOL_RECYCLE", "1800"))
+DB_PRE_PING = _flag("SKILLGAP_DB_PRE_PING", "1")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("SKILLGAP_DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_PRE_PING,
+    }
+
 
 # SQLAlchemy engine.
 engine = create_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production.
+    connect_args=(
+        {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"} if DB_STATEMENT_TIMEOUT_MS > 0 else {}
+    ),
+    **_pool_options(),
 )
 
 # Session factory.
@@ -40,6 +100,43 @@ def get_db():
     finally:
         db.close()
 
+
+_ASYNC: Dict[str, Optional[Any]] = {"engine": None, "sessionmaker": None}
+
+# The async engine is created on first use, so scripts and worker processes that only
+# use the sync engine never import asyncpg.
+def get_async_engine():
+    if _ASYNC["engine"] is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        connect_args: Dict[str, Any] = {}
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+        _ASYNC["engine"] = create_async_engine(ASYNC_DATABASE_URL, connect_args=connect_args, **_pool_options())
+        # expire_on_commit=False: rows stay readable after commit without another
+        # (implicit, and in async code impossible) round trip.
+        _ASYNC["sessionmaker"] = async_sessionmaker(
+            _ASYNC["engine"],
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _ASYNC["engine"]
+
+
+# FastAPI dependency for async DB sessions.
+async def get_async_db() -> AsyncIterator[Any]:
+    get_async_engine()
+    async with _ASYNC["sessionmaker"]() as db:
+        yield db
+
+# Close every pooled async connection (app shutdown).
+async def dispose_async_engine() -> None:
+    if _ASYNC["engine"] is not None:
+        await _ASYNC["engine"].dispose()
+        _ASYNC["engine"] = None
+        _ASYNC["sessionmaker"] = None
+
 # Import model modules after Base is defined so their tables register with Base.metadata.
 # Do not call Base.metadata.create_all() in this file.
 from app.models import user
@@ -48,4 +145,5 @@ from app.models import JD_entity
 from app.models import gap_snapshot
 from app.models import normalised_entity
 from app.models import course
-from app.models import confirmed_skill
\ No newline at end of file
+from app.models import confirmed_skill
+from app.models import job_posting
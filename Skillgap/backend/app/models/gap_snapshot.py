@@ -8,6 +8,8 @@ class GapSnapshot(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # Job the CV was compared against.
+    job_id = Column(Integer, ForeignKey("job_postings.id", ondelete="SET NULL"), nullable=True)
     missing_entities = Column(JSON, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -0,0 +1,28 @@
+# job_posting.py
+# A job description a user has uploaded (a "job").
+# The extracted entities are not stored per job: they live in jd_entities under the
+# document's content hash and taxonomy version, so every user who uploads the same JD
+# shares one set of rows. Each job pins the taxonomy version it uses, so a later
+# upload with another taxonomy build never changes another user's gap target.
+# Linked to a User through owner_id.
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+from app.models.db import Base
+
+class JobPosting(Base):
+    __tablename__ = "job_postings"
+    # Uploading the same document again reuses the user's existing job.
+    __table_args__ = (UniqueConstraint("owner_id", "content_hash", name="uq_job_postings_owner_content"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 of the uploaded document; keys its entities in jd_entities.
+    content_hash = Column(String, nullable=False, index=True)
+    filename = Column(String, nullable=True)
+    # Taxonomy version of the jd_entities set this job compares against.
+    taxonomy_version = Column(String, nullable=True)
+    # Set on every upload of the document, so the latest job is the one uploaded last.
+    uploaded_at = Column(DateTime, server_default=func.now())
+
+    owner = relationship("User")
@@ -0,0 +1,166 @@
+# migrations.py
+# Small versioned migration runner for schema changes that create_all() cannot make.
+# Base.metadata.create_all() only creates missing tables, so indexes, new columns and
+# other changes to existing tables are applied here instead.
+# Applied versions are recorded in the schema_migrations table, each migration runs
+# in its own transaction, and a Postgres advisory lock stops two backend workers
+# from migrating at the same time.
+
+from __future__ import annotations
+
+from typing import Iterable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Arbitrary constant used as the advisory lock key for migrations.
+_MIGRATION_LOCK_KEY = 7_310_552
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    statements: List[str]
+    # Tables whose planner statistics should be refreshed once the migration has run.
+    analyze: List[str]
+
+
+# Migrations are applied in version order. Never edit an applied migration;
+# add a new one instead.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Performance indexes for gap snapshots and CV entities",
+        statements=[
+            # Courses need none: the ranker filters skills and levels in its in-memory
+            # skill index (recommender/skill_index.py), not in SQL.
+            # Latest snapshot per user (history, missing-entities and recommend-courses endpoints).
+            "CREATE INDEX IF NOT EXISTS ix_gap_snapshots_user_created ON gap_snapshots (user_id, created_at DESC)",
+            # CV entities are always read per user.
+            "CREATE INDEX IF NOT EXISTS ix_cv_entities_user_id ON cv_entities (user_id)",
+        ],
+        analyze=["gap_snapshots", "cv_entities"],
+    ),
+    Migration(
+        version=2,
+        description="Per-course content hash for incremental catalogue imports",
+        statements=[
+            "ALTER TABLE courses ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+        ],
+        analyze=[],
+    ),
+    Migration(
+        version=3,
+        description="Taxonomy version on stored CV and JD entities",
+        statements=[
+            "ALTER TABLE cv_entities ADD COLUMN IF NOT EXISTS taxonomy_version VARCHAR",
+            "ALTER TABLE jd_entities ADD COLUMN IF NOT EXISTS taxonomy_version VARCHAR",
+        ],
+        analyze=[],
+    ),
+    Migration(
+        version=4,
+        description="Per-job JD entities keyed by document content hash",
+        statements=[
+            "ALTER TABLE jd_entities ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+            # Rows from the old single global JD belong to no job and cannot be attributed
+            # to a user, so they are dropped; the runner logs how many.
+            "DELETE FROM jd_entities WHERE content_hash IS NULL",
+            "CREATE INDEX IF NOT EXISTS ix_jd_entities_content_hash ON jd_entities (content_hash)",
+            # job_postings itself is created by create_all().
+            "ALTER TABLE gap_snapshots ADD COLUMN IF NOT EXISTS job_id INTEGER "
+            "REFERENCES job_postings (id) ON DELETE SET NULL",
+        ],
+        analyze=["jd_entities"],
+    ),
+    Migration(
+        version=5,
+        description="Stored catalogue version, written by catalogue imports",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS catalog_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version VARCHAR NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """,
+        ],
+        analyze=[],
+    ),
+    # Version 6 (dropping course indexes that migration 1 no longer creates) was withdrawn.
+    Migration(
+        version=7,
+        description="Pin each job to the taxonomy version of its shared JD entity set",
+        statements=[
+            "ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS taxonomy_version VARCHAR",
+            # Until now every document had one set, re-tagged to the latest upload's version.
+            """
+            UPDATE job_postings j
+            SET taxonomy_version = (
+                SELECT max(e.taxonomy_version) FROM jd_entities e WHERE e.content_hash = j.content_hash
+            )
+            WHERE j.taxonomy_version IS NULL
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_jd_entities_hash_version ON jd_entities (content_hash, taxonomy_version)",
+            # Covered by the leading column of ix_jd_entities_hash_version.
+            "DROP INDEX IF EXISTS ix_jd_entities_content_hash",
+        ],
+        analyze=["jd_entities", "job_postings"],
+    ),
+]
+
+
+def _ensure_migrations_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+    )
+
+# Refresh planner statistics for the given tables.
+# Used after migrations and after bulk catalogue imports.
+def analyze_tables(conn: Connection, tables: Iterable[str]) -> None:
+    for table in tables:
+        conn.execute(text(f"ANALYZE {table}"))
+
+# Return the versions already recorded in schema_migrations.
+def applied_versions(conn: Connection) -> List[int]:
+    _ensure_migrations_table(conn)
+    rows = conn.execute(text("SELECT version FROM schema_migrations ORDER BY version")).fetchall()
+    return [int(row[0]) for row in rows]
+
+# Apply every pending migration in order and return the versions that were applied.
+def run_migrations(engine: Engine) -> List[int]:
+    applied_now: List[int] = []
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        with engine.begin() as conn:
+            # Held until this transaction ends, so concurrent workers wait here.
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+
+            if migration.version in applied_versions(conn):
+                continue
+
+            for statement in migration.statements:
+                result = conn.execute(text(statement))
+                # Report how many rows data changes touched, so nothing is removed silently.
+                summary = " ".join(statement.split())
+                if summary.split(" ", 1)[0].upper() in ("DELETE", "UPDATE", "INSERT") and result.rowcount > 0:
+                    print(f"Migration {migration.version}: {result.rowcount} rows affected by {summary[:80]}")
+
+            analyze_tables(conn, migration.analyze)
+
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": migration.version, "description": migration.description},
+            )
+            applied_now.append(migration.version)
+            print(f"Applied migration {migration.version}: {migration.description}")
+
+    return applied_now
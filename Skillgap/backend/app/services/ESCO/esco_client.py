@@ -3,8 +3,10 @@ from __future__ import annotations
 import json
 from pathlib import Path
 from threading import Lock
-from typing import Optional, Dict, Any
-import requests
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+if TYPE_CHECKING:
+    import requests
 
 # ESCO API client for skill search
 # Connects to the official ESCO API and retrieves ICT-only skills.
@@ -40,8 +42,19 @@ ICT_GROUPS = ",".join([
 _CACHE_PATH = Path(__file__).resolve().parents[2] / "data" / "esco_cache.json"
 _CACHE_LOCK = Lock()
 
-# Reuse connections
-_SESSION = requests.Session()
+# Reuse connections. The session (and requests itself) is created on the first ESCO call.
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = Lock()
+
+
+def _get_session() -> "requests.Session":
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests
+
+            _SESSION = requests.Session()
+        return _SESSION
 
 # loads a cache dict from disk
 def _load_cache() -> Dict[str, Any]:
@@ -85,7 +98,7 @@ def esco_search_skill(query: str) -> Optional[Dict[str, str]]:
     }
     # try-except to handle network issues, timeouts, or unexpected responses gracefully.
     try:
-        response = _SESSION.get(url, params=params, timeout=10)
+        response = _get_session().get(url, params=params, timeout=10)
     except Exception:
         result = None
     else:
@@ -0,0 +1,489 @@
+# analysis_pool.py
+# Process pool for the CPU-bound part of a CV/JD analysis: text extraction
+# (pdfplumber / python-docx) followed by entity extraction (spaCy + taxonomy matcher).
+# Both stages are pure Python, so in a thread pool concurrent uploads contend on the
+# GIL; in worker processes they run in parallel.
+# Each worker loads the spaCy model and the taxonomy matcher once when it starts, and
+# counts itself ready afterwards; /ready waits for every worker (see readiness.py).
+# Jobs send the document in (its bytes, or the path of the spooled upload for large
+# files) and get entities (not the document text) back.
+# The number of jobs waiting or running is bounded: once the queue is full new
+# jobs are refused with PoolBusy instead of piling up behind the workers.
+# If a worker dies (out of memory, a crash in a native parser) the pool is broken for
+# good, so it is dropped and a fresh one is started straight away; the jobs that were
+# in it fail with WorkerLost.
+# Workers are started with "spawn", never "fork": the pool is created (and re-created)
+# while the server's threads are running, and a forked child could inherit a lock one
+# of them holds (the taxonomy build lock, logging, imports) and hang in _init_worker.
+# Results are kept in the content-addressed document cache (document_cache.py): a
+# re-upload of the same file is answered from the cache without queuing a job.
+#
+# Configuration (environment):
+#   SKILLGAP_ANALYSIS_WORKERS=2       worker processes (0 runs the stages in the default thread pool)
+#   SKILLGAP_ANALYSIS_MAX_QUEUE=16    jobs accepted (waiting + running) before PoolBusy
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.services.document_cache import (
+    CACHE_ENABLED,
+    document_hash,
+    get_cached_document,
+    put_cached_document,
+    record_cache_activity,
+)
+from app.services.readiness import register_check
+from app.services.skills.taxonomy_registry import DEFAULT_TAXONOMY
+
+ANALYSIS_WORKERS = int(os.getenv("SKILLGAP_ANALYSIS_WORKERS", "2"))
+ANALYSIS_MAX_QUEUE = int(os.getenv("SKILLGAP_ANALYSIS_MAX_QUEUE", "16"))
+
+STAGES = ["cache_lookup", "queue_wait", "text_extraction", "entity_extraction"]
+
+_LOCK = Lock()
+# ready_workers: shared counter the current pool's workers increment once _init_worker is done.
+_POOL: Dict[str, Any] = {"executor": None, "ready_workers": None}
+_STATS: Dict[str, Any] = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "in_flight": 0,
+    "cache_hits": 0,
+    "pool_restarts": 0,
+}
+_STAGE_TIMINGS: Dict[str, Dict[str, float]] = {
+    stage: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0} for stage in STAGES
+}
+
+
+class PoolBusy(Exception):
+    # Raised when the analysis queue is full; the endpoint turns it into a 503.
+    pass
+
+
+class WorkerLost(PoolBusy):
+    # A worker process died while the job was queued or running. The pool has been
+    # replaced, so the request can simply be retried (also a 503).
+    pass
+
+
+class DocumentError(Exception):
+    # A document that could not be read (unsupported type, corrupt file).
+    # Carries the status code and message of the HTTPException raised in the worker.
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+# Returned when a PDF page worker (pdf_utils.py) died; that pool restarts on the next document.
+_PAGE_WORKER_LOST = (503, "A document worker stopped unexpectedly. Please try again.")
+
+# Worker initialiser: build the spaCy pipeline and the taxonomy matcher up front,
+# so the first job a worker picks up does not pay for loading them.
+def _init_worker(ready_workers=None) -> None:
+    from app.services.entity_extraction import extract_entities, load_skill_matcher
+
+    load_skill_matcher()
+    extract_entities("python developer with 3 years experience")
+    if ready_workers is not None:
+        with ready_workers.get_lock():
+            ready_workers.value += 1
+
+# Warm-up job: run a synthetic text through the full extraction in a worker.
+# Returns the number of unique entities found.
+def _warm_worker(text: str) -> int:
+    from app.services.entity_extraction import extract_entities
+
+    return len(extract_entities(text)["unique_entities"])
+
+# Text extraction then entity extraction for one document. Module-level so it can
+# run in a worker process. Returns (status, payload):
+#   ("ok", {"extraction": ..., "timings": ...}) or ("error", (status_code, detail)).
+# taxonomy_version is the version the parent process is serving; a worker still on
+# an older build (the taxonomy was reloaded after it started) reloads it first.
+# With doc_hash the result is also written to the document cache; the cache counts
+# come back in the payload so the parent process can record them.
+def analyse_document(
+    filename: str,
+    content_type: str,
+    source: Union[bytes, str],
+    taxonomy: str = DEFAULT_TAXONOMY,
+    taxonomy_version: Optional[str] = None,
+    doc_hash: Optional[str] = None,
+) -> Tuple[str, Any]:
+    # HTTPException does not survive pickling, so document errors are returned as values.
+    from fastapi import HTTPException
+
+    from app.services.entity_extraction import extract_entities
+    from app.services.skills.taxonomy_registry import get_taxonomy, reload_taxonomy
+    from app.services.text_extraction import extract_text_details
+
+    if taxonomy_version is not None and get_taxonomy(taxonomy).version != taxonomy_version:
+        reload_taxonomy(taxonomy)
+
+    started = time.perf_counter()
+    try:
+        text, document = extract_text_details(filename, content_type, source)
+    except HTTPException as exc:
+        return "error", (exc.status_code, str(exc.detail))
+    except BrokenProcessPool:
+        return "error", _PAGE_WORKER_LOST
+    except Exception as exc:
+        return "error", (400, f"Could not read document: {exc}")
+    text_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    extraction = extract_entities(text, taxonomy=taxonomy)
+    extraction["meta"]["document"] = document
+    entity_seconds = time.perf_counter() - started
+
+    # A truncated text depends on the budgets (and for the time budget on load), so it is not cached.
+    cache_counts: Dict[str, int] = {}
+    if doc_hash is not None and not document["truncated"]:
+        cache_counts = put_cached_document(doc_hash, extraction["meta"]["taxonomy_version"], extraction)
+
+    return "ok", {
+        "extraction": extraction,
+        "cache": cache_counts,
+        "timings": {
+            "text_extraction": round(text_seconds, 4),
+            "entity_extraction": round(entity_seconds, 4),
+        },
+    }
+
+# Entity extraction for one slice of a batch (nlp.pipe over the slice), in a worker.
+# Returns ("ok", {"results": [...]}) with one extract_entities result per text, in order.
+# nlp.pipe runs single-process here: the batch is already spread across the pool.
+def extract_entities_slice(
+    texts: List[str],
+    batch_size: Optional[int],
+    taxonomy: str = DEFAULT_TAXONOMY,
+    taxonomy_version: Optional[str] = None,
+) -> Tuple[str, Any]:
+    from app.services.entity_extraction import iter_extract_entities
+    from app.services.skills.taxonomy_registry import get_taxonomy, reload_taxonomy
+
+    if taxonomy_version is not None and get_taxonomy(taxonomy).version != taxonomy_version:
+        reload_taxonomy(taxonomy)
+
+    results = list(iter_extract_entities(texts, batch_size=batch_size, n_process=1, taxonomy=taxonomy))
+    return "ok", {"results": results}
+
+# Text extraction only, for endpoints that return the document text.
+# Returns ("ok", {"text": ..., "document": ..., "timings": ...}) or ("error", (status_code, detail)).
+def extract_document_text(filename: str, content_type: str, source: Union[bytes, str]) -> Tuple[str, Any]:
+    from fastapi import HTTPException
+
+    from app.services.text_extraction import extract_text_details
+
+    started = time.perf_counter()
+    try:
+        text, document = extract_text_details(filename, content_type, source)
+    except HTTPException as exc:
+        return "error", (exc.status_code, str(exc.detail))
+    except BrokenProcessPool:
+        return "error", _PAGE_WORKER_LOST
+    except Exception as exc:
+        return "error", (400, f"Could not read document: {exc}")
+
+    return "ok", {
+        "text": text,
+        "document": document,
+        "timings": {"text_extraction": round(time.perf_counter() - started, 4)},
+    }
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    if ANALYSIS_WORKERS <= 0:
+        return None
+
+    with _LOCK:
+        if _POOL["executor"] is None:
+            context = multiprocessing.get_context("spawn")
+            ready_workers = context.Value("i", 0)
+            _POOL["executor"] = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(ready_workers,),
+            )
+            _POOL["ready_workers"] = ready_workers
+            # Registered with the first pool, whichever of startup and warm-up creates it.
+            register_check("analysis_workers", analysis_workers_status)
+        return _POOL["executor"]
+
+# Readiness check: ready once every worker of the current pool has run _init_worker.
+def analysis_workers_status() -> Tuple[bool, Dict[str, Any]]:
+    with _LOCK:
+        running = _POOL["executor"] is not None
+        ready_workers = _POOL["ready_workers"]
+    ready = ready_workers.value if running and ready_workers is not None else 0
+    return ready >= ANALYSIS_WORKERS, {"workers": ANALYSIS_WORKERS, "ready_workers": ready}
+
+# Warm-up step: wait (up to timeout seconds) until every worker has finished
+# _init_worker, then run text through one warm-up job per worker.
+# Returns None when there is no process pool (the caller warms this process instead).
+def warm_analysis_workers(text: str, timeout: float = 300.0) -> Optional[Dict[str, Any]]:
+    executor = _get_executor()
+    if executor is None:
+        return None
+
+    futures = [executor.submit(_warm_worker, text) for _ in range(ANALYSIS_WORKERS)]
+    deadline = time.monotonic() + timeout
+    entities = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+    # A fast worker can take several warm-up jobs, so also wait for the others to finish starting.
+    while not analysis_workers_status()[0]:
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Analysis workers not ready after {timeout:.0f}s: {analysis_workers_status()[1]}")
+        time.sleep(0.1)
+    return {"workers": ANALYSIS_WORKERS, "entities": max(entities) if entities else 0}
+
+
+def _ping() -> bool:
+    return True
+
+# Start the worker processes ahead of the first upload (used by the app lifespan).
+# Workers are only spawned as jobs arrive, so one no-op job per worker makes each of
+# them start (and run _init_worker) now.
+def start_analysis_pool() -> bool:
+    executor = _get_executor()
+    if executor is None:
+        return False
+    for _ in range(ANALYSIS_WORKERS):
+        executor.submit(_ping)
+    return True
+
+
+def shutdown_analysis_pool() -> None:
+    with _LOCK:
+        executor = _POOL["executor"]
+        _POOL["executor"] = None
+        _POOL["ready_workers"] = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _record_stage(stage: str, seconds: float) -> None:
+    entry = _STAGE_TIMINGS[stage]
+    entry["count"] += 1
+    entry["total_seconds"] += seconds
+    entry["last_seconds"] = seconds
+    entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+# Submit a job (analyse_document or extract_document_text) to the pool, within the
+# queue bound. Returns (payload, seconds from submission to result).
+async def _run_job(fn, *args: Any) -> Tuple[Dict[str, Any], float]:
+    with _LOCK:
+        if _STATS["in_flight"] >= max(1, ANALYSIS_MAX_QUEUE):
+            _STATS["rejected"] += 1
+            raise PoolBusy(f"Analysis queue is full ({_STATS['in_flight']} documents in progress)")
+        _STATS["in_flight"] += 1
+        _STATS["submitted"] += 1
+
+    submitted = time.perf_counter()
+    executor = _get_executor()
+    try:
+        loop = asyncio.get_running_loop()
+        status, payload = await loop.run_in_executor(executor, fn, *args)
+    except BrokenProcessPool as exc:
+        with _LOCK:
+            _STATS["failed"] += 1
+            # Only the first job to notice replaces the pool; later ones find it already gone.
+            if executor is not None and _POOL["executor"] is executor:
+                _POOL["executor"] = None
+                _POOL["ready_workers"] = None
+                _STATS["pool_restarts"] += 1
+                broken = executor
+            else:
+                broken = None
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+            # Start the replacement now rather than on the next job, so /ready (which
+            # waits for its workers) recovers without needing traffic.
+            await asyncio.to_thread(start_analysis_pool)
+        raise WorkerLost("An analysis worker stopped unexpectedly. Please try again.") from exc
+    except BaseException:
+        with _LOCK:
+            _STATS["failed"] += 1
+        raise
+    finally:
+        with _LOCK:
+            _STATS["in_flight"] -= 1
+
+    if status == "error":
+        with _LOCK:
+            _STATS["failed"] += 1
+        raise DocumentError(*payload)
+
+    return payload, time.perf_counter() - submitted
+
+# Run analyse_document for an uploaded document without blocking the event loop.
+# Returns (extraction, timings) where timings has the seconds spent on the cache
+# lookup, queued and in each stage, and whether the result came from the cache.
+# Raises PoolBusy when the queue is full and DocumentError when the document
+# cannot be read. A path source must stay in place until this returns.
+# doc_hash saves hashing the document again when the caller already has it.
+async def run_document_analysis(
+    filename: str,
+    content_type: str,
+    source: Union[bytes, str],
+    taxonomy: str = DEFAULT_TAXONOMY,
+    doc_hash: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    from app.services.skills.taxonomy_registry import TAXONOMY_FILES, current_taxonomy_version
+
+    if taxonomy not in TAXONOMY_FILES:
+        raise KeyError(f"Unknown taxonomy {taxonomy!r}; expected one of {', '.join(sorted(TAXONOMY_FILES))}")
+    # The version keys the document cache and tells workers to reload after a hot reload.
+    # It is hashed from the taxonomy file, so this process never builds the matcher (or
+    # loads spaCy); the first read of the file runs in a thread.
+    taxonomy_version = await asyncio.to_thread(current_taxonomy_version, taxonomy)
+
+    if CACHE_ENABLED:
+        started = time.perf_counter()
+        if doc_hash is None:
+            # hashlib releases the GIL for large inputs, so a thread keeps the loop free.
+            doc_hash = await asyncio.to_thread(document_hash, source)
+        cached = None
+        if taxonomy_version is not None:
+            cached = await asyncio.to_thread(get_cached_document, doc_hash, taxonomy_version)
+        lookup_seconds = round(time.perf_counter() - started, 4)
+        if cached is not None:
+            with _LOCK:
+                _STATS["cache_hits"] += 1
+                _record_stage("cache_lookup", lookup_seconds)
+            return cached["extraction"], {"cached": True, "cache_lookup": lookup_seconds}
+    else:
+        doc_hash = None
+        lookup_seconds = 0.0
+
+    payload, elapsed = await _run_job(
+        analyse_document,
+        filename,
+        content_type,
+        source,
+        taxonomy,
+        taxonomy_version,
+        doc_hash,
+    )
+
+    record_cache_activity(payload["cache"])
+
+    timings: Dict[str, Any] = {"cached": False, "cache_lookup": lookup_seconds, **payload["timings"]}
+    # Whatever the job did not spend working was spent waiting for a worker (plus IPC).
+    timings["queue_wait"] = round(max(0.0, elapsed - timings["text_extraction"] - timings["entity_extraction"]), 4)
+
+    with _LOCK:
+        _STATS["completed"] += 1
+        for stage in STAGES:
+            _record_stage(stage, timings[stage])
+
+    return payload["extraction"], timings
+
+# Run extract_document_text in the pool. Returns (text, document details, timings).
+# Raises PoolBusy and DocumentError like run_document_analysis.
+async def run_text_extraction(
+    filename: str,
+    content_type: str,
+    source: Union[bytes, str],
+) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    payload, elapsed = await _run_job(extract_document_text, filename, content_type, source)
+
+    timings: Dict[str, Any] = dict(payload["timings"])
+    timings["queue_wait"] = round(max(0.0, elapsed - timings["text_extraction"]), 4)
+
+    with _LOCK:
+        _STATS["completed"] += 1
+        for stage in ("queue_wait", "text_extraction"):
+            _record_stage(stage, timings[stage])
+
+    return payload["text"], payload["document"], timings
+
+# Batch entity extraction in the pool, so spaCy never runs in the API process.
+# The texts are split into contiguous slices, one per worker (at most `slices`), each
+# slice goes through nlp.pipe in its worker, and the results come back in input order
+# with the same stats as entity_extraction.extract_entities_batch.
+# Raises KeyError for an unknown taxonomy and PoolBusy when the queue is full.
+async def run_entity_batch(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    slices: Optional[int] = None,
+    taxonomy: str = DEFAULT_TAXONOMY,
+) -> Dict[str, Any]:
+    from app.services.entity_extraction import BATCH_SIZE
+    from app.services.skills.taxonomy_registry import TAXONOMY_FILES, current_taxonomy_version
+
+    if taxonomy not in TAXONOMY_FILES:
+        raise KeyError(f"Unknown taxonomy {taxonomy!r}; expected one of {', '.join(sorted(TAXONOMY_FILES))}")
+    taxonomy_version = await asyncio.to_thread(current_taxonomy_version, taxonomy)
+
+    workers = max(1, ANALYSIS_WORKERS)
+    slices = max(1, min(slices or workers, workers, len(texts) or 1))
+    size = max(1, -(-len(texts) // slices))
+
+    started = time.perf_counter()
+    payloads = await asyncio.gather(
+        *(
+            _run_job(extract_entities_slice, texts[start : start + size], batch_size, taxonomy, taxonomy_version)
+            for start in range(0, len(texts), size)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    with _LOCK:
+        _STATS["completed"] += len(payloads)
+
+    results = [result for payload, _ in payloads for result in payload["results"]]
+    total_chars = sum(len(text or "") for text in texts)
+    return {
+        "results": results,
+        "stats": {
+            "documents": len(results),
+            "characters": total_chars,
+            "seconds": round(elapsed, 3),
+            "documents_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+            "characters_per_second": round(total_chars / elapsed, 1) if elapsed > 0 else None,
+            "batch_size": max(1, batch_size or BATCH_SIZE),
+            # Pool workers the batch was spread over.
+            "n_process": len(payloads),
+        },
+    }
+
+# Queue depth, job counters and per-stage timings for the stats endpoint.
+def get_analysis_pool_stats() -> Dict[str, Any]:
+    with _LOCK:
+        in_flight = _STATS["in_flight"]
+        workers = ANALYSIS_WORKERS if ANALYSIS_WORKERS > 0 else 1
+        stages = {
+            stage: {
+                "count": int(entry["count"]),
+                "mean_seconds": round(entry["total_seconds"] / entry["count"], 4) if entry["count"] else None,
+                "max_seconds": round(entry["max_seconds"], 4),
+                "last_seconds": round(entry["last_seconds"], 4),
+            }
+            for stage, entry in _STAGE_TIMINGS.items()
+        }
+        return {
+            "workers": ANALYSIS_WORKERS,
+            "process_pool": _POOL["executor"] is not None,
+            "max_queue": ANALYSIS_MAX_QUEUE,
+            "in_flight": in_flight,
+            # Jobs accepted but not yet picked up by a worker.
+            "queue_depth": max(0, in_flight - workers),
+            "submitted": _STATS["submitted"],
+            "completed": _STATS["completed"],
+            "failed": _STATS["failed"],
+            "rejected": _STATS["rejected"],
+            "cache_hits": _STATS["cache_hits"],
+            "pool_restarts": _STATS["pool_restarts"],
+            "stages": stages,
+        }
@@ -2,6 +2,8 @@
 
 # The file contains DB-like rows under a "courses" key, e.g.
 #  { "courses": [ { "url": "...", "course_name": "...", ... }, ... ] }
+# NDJSON exports (one course object per line, .ndjson / .jsonl) are accepted too.
+# Both are streamed, so peak memory depends on the batch size, not the file size.
 
 # Source note:
 # - This dataset was originally compiled from edX + Coursera sources (Coursera portion derived from Kaggle in earlier steps),
@@ -13,13 +15,32 @@
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
+import os
+import re
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
+import ijson
+from sqlalchemy import MetaData, Table, case, literal_column, null, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models.course import Course
+from app.models.migrations import analyze_tables
+from app.services.catalog.catalog_version import (
+    bump_catalog_version,
+    compute_catalog_fingerprint,
+    prebuild_catalog,
+    publish_catalog_version,
+    store_catalog_version,
+)
+from app.services.catalog.course_schema import refresh_course_schema
 
 # Parsing helpers
 def _to_int(x: Any) -> Optional[int]:
@@ -170,17 +191,162 @@ def _parse_skills_field(skills_raw: Any) -> List[str]:
 
     return deduped
 
-def _load_courses_export(path: Path) -> List[Dict[str, Any]]:
+# ---------------------------
+# Streaming export reader
+# ---------------------------
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# One scan step over JSON text outside strings: a complete string (skipped), a bare
+# NaN / Infinity token (valid for json.load, rejected by ijson), or the opening quote
+# of a string that continues past the end of the buffer.
+_JSON_SCAN = re.compile(
+    rb'"[^"\\]*(?:\\.[^"\\]*)*"|(?<![\w.])(?P<bare>-?(?:NaN|Infinity))(?!\w)|(?P<open>")',
+    re.DOTALL,
+)
+# The rest of a string up to (not including) its closing quote or a trailing lone backslash.
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# End of a buffer that may be the start of a bare token completed by the next read.
+_PARTIAL_TOKEN = re.compile(rb'(?<![\w.])-?(?:Infinit|Infini|Infin|Infi|Inf|In|I|Na|N)?\Z')
+
+
+# Placeholder yielded for an NDJSON line that is not valid JSON, so it is reported as a reject.
+class UnparsedRow(NamedTuple):
+    line: int
+    reason: str
+
+
+# File wrapper that rewrites bare NaN / Infinity tokens to null while streaming,
+# like sanitize_json_file() in the preprocessing scripts but without loading the whole file.
+# String contents are never touched ("Handling NaN values" stays as it is): the reader
+# tracks whether it is inside a string across reads. At most a few bytes are carried
+# over between reads (a possible token prefix or a trailing backslash), so a token or
+# an escape is never split.
+class _NonFiniteTokenReader:
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._carry = b""
+        self._out = b""
+        self._eof = False
+        self._in_string = False
+
+    # Rewrite buf, keeping back in self._carry whatever the next read may complete.
+    def _translate(self, buf: bytes, final: bool) -> bytes:
+        out: List[bytes] = []
+        pos = 0
+
+        if self._in_string:
+            body_end = _STRING_BODY.match(buf).end()
+            if body_end == len(buf) or buf[body_end:body_end + 1] == b"\\":
+                # Still inside the string; a trailing lone backslash waits for its escaped byte.
+                self._carry = buf[body_end:]
+                return buf[:body_end]
+            pos = body_end + 1
+            out.append(buf[:pos])
+            self._in_string = False
+
+        for match in _JSON_SCAN.finditer(buf, pos):
+            if match.lastgroup == "bare":
+                out.append(buf[pos:match.start()])
+                out.append(b"null")
+                pos = match.end()
+            elif match.lastgroup == "open":
+                body_end = _STRING_BODY.match(buf, match.end()).end()
+                out.append(buf[pos:body_end])
+                self._carry = buf[body_end:]
+                self._in_string = True
+                return b"".join(out)
+
+        cut = len(buf)
+        if not final:
+            partial = _PARTIAL_TOKEN.search(buf, pos)
+            if partial is not None:
+                cut = partial.start()
+        out.append(buf[pos:cut])
+        self._carry = buf[cut:]
+        return b"".join(out)
+
+    def _fill(self) -> None:
+        while not self._out and not self._eof:
+            chunk = self._f.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                self._eof = True
+                self._out = self._translate(self._carry, final=True)
+                self._carry = b""
+                return
+
+            self._out = self._translate(self._carry + chunk, final=False)
+
+    def read(self, size: int = -1) -> bytes:
+        self._fill()
+        if size is None or size < 0:
+            size = len(self._out)
+        data, self._out = self._out[:size], self._out[size:]
+        return data
+
+
+def _iter_json_export(path: Path) -> Iterator[Any]:
 #    Expected structure:
 #      { "courses": [ { ... }, ... ] }
 
+    count = 0
+    try:
+        with open(path, "rb") as f:
+            for row in ijson.items(f, "courses.item", use_float=True):
+                count += 1
+                yield row
+    except ijson.JSONError:
+        # Most likely a bare NaN / Infinity token. Read the file again through the
+        # sanitising reader and continue after the rows already yielded; a file that
+        # is malformed in some other way still raises.
+        already_read = count
+        with open(path, "rb") as f:
+            rows = ijson.items(_NonFiniteTokenReader(f), "courses.item", use_float=True)
+            for row in islice(rows, already_read, None):
+                count += 1
+                yield row
+
+    if count == 0:
+        # Tell an empty catalogue apart from a file without a "courses" list.
+        with open(path, "rb") as f:
+            found = any(
+                prefix == "courses" and event == "start_array"
+                for prefix, event, _ in ijson.parse(_NonFiniteTokenReader(f))
+            )
+        if not found:
+            raise ValueError(f"Unsupported JSON structure in {path}. Expected {{'courses': [...]}}")
+
+
+def _iter_ndjson_export(path: Path) -> Iterator[Any]:
     with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield UnparsedRow(line=line_number, reason=f"invalid JSON on line {line_number}: {exc.msg}")
 
-    if isinstance(data, dict) and isinstance(data.get("courses"), list):
-        return data["courses"]
+# Yield course rows one at a time from a JSON or NDJSON export.
+def iter_courses_export(path: Path) -> Iterator[Any]:
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        return _iter_ndjson_export(path)
+    return _iter_json_export(path)
 
-    raise ValueError(f"Unsupported JSON structure in {path}. Expected {{'courses': [...]}}")
+# Split any iterable into lists of at most batch_size items.
+def iter_batches(rows: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+# Fully loaded export, still used by the legacy ORM upsert path.
+def _load_courses_export(path: Path) -> List[Dict[str, Any]]:
+    return list(iter_courses_export(path))
 
 
 # ---------------------------
@@ -334,18 +500,584 @@ def upsert_courses(db: Session, rows: List[Dict[str, Any]], batch_size: int = 10
     return {"inserted": inserted, "updated": updated, "skipped": skipped, "total": total}
 
 
+# ---------------------------
+# Set-based bulk upsert
+# ---------------------------
+
+# Columns written by an import. skills_norm is maintained by the preprocessing
+# scripts, so an import never writes it. One rule covers every path: a course whose
+# content_hash changes loses its skills_norm (set to NULL, which the backfill script
+# picks up again); an unchanged course keeps it.
+IMPORT_COLUMNS = [
+    "url",
+    "course_name",
+    "provider",
+    "organization",
+    "type",
+    "level",
+    "subject",
+    "duration",
+    "rating",
+    "nu_reviews",
+    "enrollments",
+    "description",
+    "skills",
+    "has_rating",
+    "has_subject",
+    "has_no_enrol",
+    "content_hash",
+]
+
+# Only the first few rejects are returned in full so a very bad file cannot
+# produce an enormous response.
+MAX_REPORTED_REJECTS = 100
+
+# Worker processes for the parse/normalise stage of an import.
+# 0 or 1 keeps parsing in the importing process.
+INGEST_WORKERS = int(os.getenv("CATALOG_INGEST_WORKERS", "0"))
+# Batches handed to the pool but not yet written, per worker. Bounds memory
+# when parsing runs ahead of the database writer.
+INGEST_BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+# Stable hash of a normalised row, stored in courses.content_hash.
+# Incremental imports compare it with the stored hash to find changed rows.
+def _content_hash(values: Dict[str, Any]) -> str:
+    payload = {col: values.get(col) for col in IMPORT_COLUMNS if col != "content_hash"}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+# Parse and normalise one export row into the column values written to courses.
+# Returns (values, None) for a usable row or (None, reason) for a rejected one.
+def _normalise_row(r: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    if isinstance(r, UnparsedRow):
+        return None, r.reason
+    if not isinstance(r, dict):
+        return None, "row is not an object"
+
+    try:
+        url = (r.get("url") or "").strip()
+        name = (r.get("course_name") or "").strip()
+        provider = (r.get("provider") or "").strip()
+
+        if not url:
+            return None, "missing url"
+        if not name:
+            return None, "missing course_name"
+        if not provider:
+            return None, "missing provider"
+
+        values = {
+            "url": url,
+            "course_name": name,
+            "provider": provider,
+            "organization": _clean_braced_set_text(r.get("organization")),
+            "type": r.get("type"),
+            "level": r.get("level"),
+            "subject": _clean_braced_set_text(r.get("subject")),
+            "duration": _to_float(r.get("duration")),
+            "rating": _to_float(r.get("rating")),
+            "nu_reviews": _to_int(r.get("nu_reviews")),
+            "enrollments": _to_int(r.get("enrollments")),
+            "description": r.get("description"),
+            "skills": _parse_skills_field(r.get("skills")),
+            "has_rating": _to_int(r.get("has_rating")),
+            "has_subject": _to_int(r.get("has_subject")),
+            "has_no_enrol": _to_int(r.get("has_no_enrol")),
+        }
+        values["content_hash"] = _content_hash(values)
+        return values, None
+    except Exception as exc:
+        return None, f"could not parse row: {exc}"
+
+# Normalise a whole batch. Module-level so it can run in a worker process.
+def _normalise_batch(batch: List[Any]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    return [_normalise_row(r) for r in batch]
+
+# Yield (raw batch, normalised batch) pairs in input order.
+# With workers > 1 the batches are normalised in a process pool while earlier
+# batches are being written; at most workers * INGEST_BATCHES_IN_FLIGHT_PER_WORKER
+# batches are pending at once.
+def _iter_normalised_batches(
+    rows: Iterable[Any],
+    batch_size: int,
+    workers: int,
+) -> Iterator[Tuple[List[Any], List[Tuple[Optional[Dict[str, Any]], Optional[str]]]]]:
+    batches = iter_batches(rows, batch_size)
+
+    if workers <= 1:
+        for batch in batches:
+            yield batch, _normalise_batch(batch)
+        return
+
+    window = workers * INGEST_BATCHES_IN_FLIGHT_PER_WORKER
+    pending: "deque[Tuple[List[Any], Future]]" = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in batches:
+            pending.append((batch, pool.submit(_normalise_batch, batch)))
+            if len(pending) >= window:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+def _build_upsert_statement(table: Table):
+    stmt = pg_insert(table)
+    updates = {col: stmt.excluded[col] for col in IMPORT_COLUMNS if col != "url"}
+    # Changed content makes the stored skills_norm stale (see IMPORT_COLUMNS).
+    updates["skills_norm"] = case(
+        (table.c.content_hash.is_distinct_from(stmt.excluded.content_hash), null()),
+        else_=table.c.skills_norm,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["url"],
+        set_=updates,
+    ).returning(literal_column("(xmax = 0)").label("inserted"))
+
+# Built once per target table; SQLAlchemy caches the compiled form and sends each batch
+# as multi-row VALUES pages (insertmanyvalues) rather than one statement per row.
+_UPSERT_STATEMENTS: Dict[str, Any] = {"courses": _build_upsert_statement(Course.__table__)}
+
+# Write one batch of already-normalised rows with INSERT ... ON CONFLICT (url) DO UPDATE.
+# Returns (inserted, updated) using Postgres' xmax trick: xmax = 0 only for fresh inserts.
+def _write_course_batch(db: Session, values: List[Dict[str, Any]], table: str = "courses") -> Tuple[int, int]:
+    if not values:
+        return 0, 0
+
+    statement = _UPSERT_STATEMENTS.get(table)
+    if statement is None:
+        # Same columns as courses under another name, e.g. the shadow table.
+        statement = _build_upsert_statement(Course.__table__.to_metadata(MetaData(), name=table))
+        _UPSERT_STATEMENTS[table] = statement
+
+    flags = [bool(row[0]) for row in db.execute(statement, values).fetchall()]
+    inserted = sum(1 for flag in flags if flag)
+    return inserted, len(flags) - inserted
+
+# Set-based upsert: parse every row of a batch, deduplicate by URL in memory
+# (the last occurrence wins, as it would with row-by-row upserts), then write the
+# batch in one statement. Bad rows are reported as rejects instead of being retried one by one.
+# rows can be any iterable, e.g. the streaming export reader; only a bounded number of batches is held at a time.
+# Parsing can be spread over a process pool (workers); writing always stays in this process.
+def bulk_upsert_courses(
+    db: Session,
+    rows: Iterable[Any],
+    batch_size: int = 1000,
+    workers: Optional[int] = None,
+    table: str = "courses",
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    if workers is None:
+        workers = INGEST_WORKERS
+
+    inserted = 0
+    updated = 0
+    duplicates = 0
+    total = 0
+    rejects: List[Dict[str, Any]] = []
+    reject_count = 0
+
+    def reject(row_number: int, row: Any, reason: str) -> None:
+        nonlocal reject_count
+        reject_count += 1
+        if len(rejects) < MAX_REPORTED_REJECTS:
+            url = row.get("url") if isinstance(row, dict) else None
+            rejects.append({"row": row_number, "url": url, "reason": reason})
+
+    for batch, normalised in _iter_normalised_batches(rows, batch_size, workers):
+        i = total
+        total += len(batch)
+
+        by_url: Dict[str, Dict[str, Any]] = {}
+        row_numbers: Dict[str, int] = {}
+        for offset, (r, (values, reason)) in enumerate(zip(batch, normalised)):
+            if values is None:
+                reject(i + offset, r, reason or "invalid row")
+                continue
+
+            if values["url"] in by_url:
+                duplicates += 1
+            by_url[values["url"]] = values
+            row_numbers[values["url"]] = i + offset
+
+        try:
+            batch_inserted, batch_updated = _write_course_batch(db, list(by_url.values()), table=table)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            # The whole statement failed, so report every row of it with the DB error.
+            for url, values in by_url.items():
+                reject(row_numbers[url], values, f"batch write failed: {exc.__class__.__name__}")
+            continue
+
+        inserted += batch_inserted
+        updated += batch_updated
+        if progress is not None:
+            progress(total)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": reject_count,
+        "duplicates": duplicates,
+        "total": total,
+        "rejects": rejects,
+    }
+
+# ---------------------------
+# Incremental import
+# ---------------------------
+
+DELETE_BATCH_SIZE = 5000
+# Largest share of the stored courses an incremental import may delete on its own.
+# An export that would remove more (or that has no rows at all) is treated as empty
+# or truncated: its inserts and updates are applied, its deletes are not, unless the
+# caller passes allow_mass_delete=True.
+MAX_DELETE_FRACTION = float(os.getenv("CATALOG_MAX_DELETE_FRACTION", "0.2"))
+
+# url -> content_hash for every stored course.
+def _load_stored_hashes(db: Session) -> Dict[str, Optional[str]]:
+    rows = db.execute(text("SELECT url, content_hash FROM courses")).fetchall()
+    return {str(row[0]): row[1] for row in rows}
+
+# Compare the export with the stored content hashes and only write what differs:
+# new URLs are inserted, rows whose hash changed are updated, and stored courses
+# missing from the export are deleted. Unchanged rows are not touched at all.
+# Rows stored before content hashes existed have a NULL hash and are rewritten once.
+def incremental_sync_courses(
+    db: Session,
+    rows: Iterable[Any],
+    batch_size: int = 1000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    allow_mass_delete: bool = False,
+) -> Dict[str, Any]:
+    if workers is None:
+        workers = INGEST_WORKERS
+
+    stored = _load_stored_hashes(db)
+    seen: Set[str] = set()
+
+    inserted = 0
+    updated = 0
+    unchanged = 0
+    duplicates = 0
+    total = 0
+    failed_batches = 0
+    rejects: List[Dict[str, Any]] = []
+    reject_count = 0
+
+    def reject(row_number: int, row: Any, reason: str) -> None:
+        nonlocal reject_count
+        reject_count += 1
+        if len(rejects) < MAX_REPORTED_REJECTS:
+            url = row.get("url") if isinstance(row, dict) else None
+            rejects.append({"row": row_number, "url": url, "reason": reason})
+
+    for batch, normalised in _iter_normalised_batches(rows, batch_size, workers):
+        i = total
+        total += len(batch)
+
+        changed: Dict[str, Dict[str, Any]] = {}
+        row_numbers: Dict[str, int] = {}
+        for offset, (r, (values, reason)) in enumerate(zip(batch, normalised)):
+            if values is None:
+                # Keep a rejected row's course (if it names one) out of the delete set.
+                if isinstance(r, dict) and str(r.get("url") or "").strip():
+                    seen.add(str(r.get("url")).strip())
+                reject(i + offset, r, reason or "invalid row")
+                continue
+
+            url = values["url"]
+            if url in seen:
+                duplicates += 1
+            seen.add(url)
+
+            if stored.get(url) == values["content_hash"]:
+                if url in changed:
+                    # A later duplicate restores the stored content.
+                    del changed[url]
+                unchanged += 1
+                continue
+
+            changed[url] = values
+            row_numbers[url] = i + offset
+
+        if progress is not None:
+            progress(total)
+
+        if not changed:
+            continue
+
+        try:
+            batch_inserted, batch_updated = _write_course_batch(db, list(changed.values()))
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            failed_batches += 1
+            for url, values in changed.items():
+                reject(row_numbers[url], values, f"batch write failed: {exc.__class__.__name__}")
+            continue
+
+        inserted += batch_inserted
+        updated += batch_updated
+        for url, values in changed.items():
+            stored[url] = values["content_hash"]
+
+    deleted = 0
+    deletes_skipped = 0
+    removed = [url for url in stored if url not in seen]
+    if failed_batches:
+        # The export was not fully applied, so leave existing courses alone.
+        print(f"Incremental import: {failed_batches} batches failed, skipping deletes.")
+        deletes_skipped = len(removed)
+    elif removed and not allow_mass_delete and (not seen or len(removed) > MAX_DELETE_FRACTION * len(stored)):
+        print(
+            f"Incremental import: export would delete {len(removed)} of {len(stored)} courses "
+            f"(limit {MAX_DELETE_FRACTION:.0%}), skipping deletes. Pass allow_mass_delete to apply them."
+        )
+        deletes_skipped = len(removed)
+    else:
+        for start in range(0, len(removed), DELETE_BATCH_SIZE):
+            chunk = removed[start : start + DELETE_BATCH_SIZE]
+            result = db.execute(text("DELETE FROM courses WHERE url = ANY(:urls)"), {"urls": chunk})
+            deleted += int(result.rowcount or 0)
+        db.commit()
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        # Courses missing from the export but kept (failed batches or the delete limit).
+        "deletes_skipped": deletes_skipped,
+        "unchanged": unchanged,
+        "skipped": reject_count,
+        "duplicates": duplicates,
+        "total": total,
+        "rejects": rejects,
+    }
+
+# ---------------------------
+# Shadow table swap
+# ---------------------------
+
+SHADOW_TABLE = "courses_next"
+RETIRED_TABLE = "courses_old"
+# How long the swap waits for readers to release the courses table before giving up.
+SWAP_LOCK_TIMEOUT = "10s"
+# Arbitrary constant used as the advisory lock key for full (shadow table) imports.
+_SWAP_LOCK_KEY = 7_310_553
+
+
+def _index_definitions(db: Session, table: str) -> Dict[str, str]:
+    # index name -> definition without its own name and table, e.g. "UNIQUE ... USING btree (url)"
+    rows = db.execute(
+        text(
+            """
+            SELECT indexname, indexdef
+            FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = :table
+            """
+        ),
+        {"table": table},
+    ).fetchall()
+    return {
+        str(row[0]): re.sub(r"^CREATE (UNIQUE )?INDEX \S+ ON \S+ ", r"\1", str(row[1]))
+        for row in rows
+    }
+
+# Create an empty copy of courses (columns, defaults, constraints and indexes).
+# The copy shares the courses id sequence, so its ids never clash with live ones.
+def _create_shadow_table(db: Session) -> None:
+    db.execute(text(f"DROP TABLE IF EXISTS {SHADOW_TABLE}"))
+    db.execute(text(f"CREATE TABLE {SHADOW_TABLE} (LIKE courses INCLUDING ALL)"))
+    db.commit()
+
+# skills_norm is produced by the preprocessing scripts, not by imports.
+# Courses whose imported content is unchanged keep their existing skills_norm; changed
+# ones are left NULL, the same rule the upsert applies (see IMPORT_COLUMNS).
+def _carry_over_skills_norm(db: Session) -> None:
+    db.execute(
+        text(
+            f"""
+            UPDATE {SHADOW_TABLE} AS n
+            SET skills_norm = c.skills_norm
+            FROM courses AS c
+            WHERE c.url = n.url
+              AND c.content_hash = n.content_hash
+              AND c.skills_norm IS NOT NULL
+            """
+        )
+    )
+    db.commit()
+
+# Swap the loaded shadow table in with renames inside one transaction.
+# Readers see either the whole old catalogue or the whole new one, never a partial one.
+# The new table's catalogue version is stored in the same transaction.
+def _swap_in_shadow_table(db: Session, version: str) -> None:
+    live_indexes = _index_definitions(db, "courses")
+    shadow_indexes = _index_definitions(db, SHADOW_TABLE)
+    # Shadow index name -> live index name, so the new table ends up with the original names.
+    renames = {
+        shadow_name: live_name
+        for live_name, definition in live_indexes.items()
+        for shadow_name, shadow_definition in shadow_indexes.items()
+        if definition == shadow_definition
+    }
+    sequence = db.execute(text("SELECT pg_get_serial_sequence('courses', 'id')")).scalar()
+
+    try:
+        db.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+        db.execute(text(f"ALTER TABLE courses RENAME TO {RETIRED_TABLE}"))
+        db.execute(text(f"ALTER TABLE {SHADOW_TABLE} RENAME TO courses"))
+        if sequence:
+            # Otherwise dropping the old table would drop the shared id sequence with it.
+            db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY courses.id"))
+        db.execute(text(f"DROP TABLE {RETIRED_TABLE}"))
+        for shadow_name, live_name in renames.items():
+            db.execute(text(f'ALTER INDEX "{shadow_name}" RENAME TO "{live_name}"'))
+        # Other workers see the new table and its version in the same commit.
+        store_catalog_version(db, version)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+# Hold a Postgres session-level advisory lock for the duration of the block, so only one
+# full import at a time (across threads and backend workers) owns the shadow table.
+# The lock lives on its own connection: the Session hands its connection back to the
+# pool at every commit, which would leave a session lock on an arbitrary connection.
+@contextmanager
+def _catalog_swap_lock(db: Session) -> Iterator[None]:
+    conn = db.get_bind().connect()
+    try:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _SWAP_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _SWAP_LOCK_KEY})
+    finally:
+        conn.close()
+
+# Full re-import without an empty or half-filled courses table:
+# load the export into a shadow table, prebuild catalogue-derived data for it,
+# then swap it in and publish the new catalogue version in the same moment.
+def swap_in_catalog(
+    db: Session,
+    rows: Iterable[Any],
+    batch_size: int = 1000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    # A second full import waits here rather than dropping or refilling this one's shadow table.
+    with _catalog_swap_lock(db):
+        return _swap_in_catalog_locked(db, rows, batch_size, workers, progress)
+
+
+def _swap_in_catalog_locked(
+    db: Session,
+    rows: Iterable[Any],
+    batch_size: int,
+    workers: Optional[int],
+    progress: Optional[Callable[[int], None]],
+) -> Dict[str, Any]:
+    _create_shadow_table(db)
+    try:
+        stats = bulk_upsert_courses(
+            db,
+            rows,
+            batch_size=batch_size,
+            workers=workers,
+            table=SHADOW_TABLE,
+            progress=progress,
+        )
+        _carry_over_skills_norm(db)
+        analyze_tables(db.connection(), [SHADOW_TABLE])
+        db.commit()
+
+        version = compute_catalog_fingerprint(db, SHADOW_TABLE)
+        installers = prebuild_catalog(db, version, SHADOW_TABLE)
+        db.commit()
+
+        _swap_in_shadow_table(db, version)
+    except Exception:
+        db.rollback()
+        db.execute(text(f"DROP TABLE IF EXISTS {SHADOW_TABLE}"))
+        db.commit()
+        raise
+
+    refresh_course_schema(db)
+    for install in installers:
+        install()
+    publish_catalog_version(version)
+    return stats
+
+
 def ingest_catalog(
     db: Session,
     base_dir: Path,
     filename: str = "course_catalogue.json",
     truncate_first: bool = True,
-) -> Dict[str, int]:
+    mode: str = "bulk",
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    allow_mass_delete: bool = False,
+) -> Dict[str, Any]:
     # Ingest courses from a JSON export file into the database.
+    # mode="bulk" uses the set-based INSERT ... ON CONFLICT path,
+    # mode="orm" the original row-by-row ORM upsert,
+    # mode="incremental" only writes inserted, changed and deleted rows (truncate_first is ignored).
+    # With truncate_first, the bulk path loads a shadow table and swaps it in,
+    # so the live table is never empty while the import runs.
+    # workers sets the parse/normalise process pool size for the bulk path
+    # (defaults to CATALOG_INGEST_WORKERS).
+    # progress, if given, is called with the number of rows read so far after each batch.
+    # allow_mass_delete lets an incremental import delete more than MAX_DELETE_FRACTION
+    # of the catalogue (or all of it, for an empty export).
     path = base_dir / filename
-    rows = _load_courses_export(path)
+    if mode == "orm":
+        rows: Iterable[Any] = _load_courses_export(path)
+    else:
+        rows = iter_courses_export(path)
+        # Read the first row before truncating, so a missing or malformed file
+        # fails before the existing catalogue is deleted.
+        first = list(islice(rows, 1))
+        rows = chain(first, rows)
 
-    if truncate_first:
-        db.query(Course).delete(synchronize_session=False)
-        db.commit()
+    if mode == "incremental":
+        stats = incremental_sync_courses(
+            db,
+            rows,
+            batch_size=1000,
+            workers=workers,
+            progress=progress,
+            allow_mass_delete=allow_mass_delete,
+        )
+        if not (stats["inserted"] or stats["updated"] or stats["deleted"]):
+            # Nothing changed, so the catalogue version and derived indexes stay as they are.
+            return stats
+    elif mode != "orm" and truncate_first:
+        # The shadow table was analysed and the new version published by the swap.
+        return swap_in_catalog(db, rows, batch_size=1000, workers=workers, progress=progress)
+    else:
+        if truncate_first:
+            db.query(Course).delete(synchronize_session=False)
+            db.commit()
+
+        if mode == "orm":
+            stats = upsert_courses(db, rows, batch_size=1000)
+        else:
+            stats = bulk_upsert_courses(db, rows, batch_size=1000, workers=workers, progress=progress)
+
+    # Bulk changes make the planner statistics stale, so refresh them for the indexes.
+    analyze_tables(db.connection(), ["courses"])
+    db.commit()
 
-    return upsert_courses(db, rows, batch_size=1000)
\ No newline at end of file
+    # Re-read the table schema and give the catalogue a new version
+    # so catalogue-derived caches are rebuilt.
+    refresh_course_schema(db)
+    bump_catalog_version(db)
+    return stats
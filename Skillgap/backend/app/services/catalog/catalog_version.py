@@ -0,0 +1,158 @@
+# catalog_version.py
+# Tracks a version id for the course catalogue currently stored in the database.
+# The version is a content fingerprint of the courses table, so it stays the same
+# across restarts and changes whenever a catalogue import changes the data.
+# Fingerprinting scans the whole table, so it is only done at import time; the result
+# is stored in the one-row catalog_version table, and request-path callers only read
+# that row.
+# Anything that caches catalogue-derived data (ranker indexes, result caches, ...)
+# should key that data on this version and can register a listener to be told
+# when an import bumps it.
+# A prebuilder can also be registered to build that data from a shadow table before
+# it is swapped in, so the new data is ready the moment the new version is published.
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# How long a read version is trusted before the catalog_version row is read again.
+# The recheck lets other backend worker processes notice an import done elsewhere.
+VERSION_RECHECK_SECONDS = 30.0
+
+_LOCK = Lock()
+_STATE: Dict[str, Optional[object]] = {"version": None, "checked_at": 0.0}
+_LISTENERS: List[Callable[[str], None]] = []
+# (db, version, table) -> installer run once the table is live, or None
+_PREBUILDERS: List[Callable[[Session, str, str], Optional[Callable[[], None]]]] = []
+
+# Fingerprint the courses table: row count plus an md5 over every row's content.
+# Rows are hashed individually and ordered by id so the result is deterministic.
+# A shadow copy of the table with the same rows gets the same fingerprint.
+def compute_catalog_fingerprint(db: Session, table: str = "courses") -> str:
+    sql = text(
+        f"""
+        SELECT
+            count(*) AS row_count,
+            md5(coalesce(string_agg(md5(c::text), '' ORDER BY c.id), '')) AS digest
+        FROM {table} c
+        """
+    )
+    row = db.execute(sql).mappings().first()
+    row_count = int(row["row_count"] or 0) if row else 0
+    digest = str(row["digest"] or "") if row else ""
+    return f"{row_count}-{digest[:16]}"
+
+# Record version as the current catalogue version. Does not commit, so an import can
+# store it in the same transaction that changes the courses table.
+def store_catalog_version(db: Session, version: str) -> None:
+    db.execute(
+        text(
+            """
+            INSERT INTO catalog_version (id, version, updated_at) VALUES (1, :version, now())
+            ON CONFLICT (id) DO UPDATE SET version = EXCLUDED.version, updated_at = EXCLUDED.updated_at
+            """
+        ),
+        {"version": version},
+    )
+
+# The stored catalogue version. A database that has never seen an import
+# (catalog_version is empty) is fingerprinted once and the result stored.
+def _read_version(db: Session) -> str:
+    version = db.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar()
+    if version is not None:
+        return str(version)
+
+    # Seed on its own connection, so the caller's transaction is not committed here.
+    with db.get_bind().begin() as conn:
+        version = compute_catalog_fingerprint(conn)
+        conn.execute(
+            text("INSERT INTO catalog_version (id, version) VALUES (1, :version) ON CONFLICT (id) DO NOTHING"),
+            {"version": version},
+        )
+        stored = conn.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar()
+    return str(stored or version)
+
+# Register a callback that is run with the new version whenever it changes.
+def add_catalog_listener(callback: Callable[[str], None]) -> None:
+    with _LOCK:
+        if callback not in _LISTENERS:
+            _LISTENERS.append(callback)
+
+
+# Register a callback that builds catalogue-derived data from a table that is not live yet.
+# It returns a function that installs the prebuilt data, or None if there is nothing to install.
+def add_catalog_prebuilder(callback: Callable[[Session, str, str], Optional[Callable[[], None]]]) -> None:
+    with _LOCK:
+        if callback not in _PREBUILDERS:
+            _PREBUILDERS.append(callback)
+
+# Run every prebuilder against the given table and return the installers.
+def prebuild_catalog(db: Session, version: str, table: str) -> List[Callable[[], None]]:
+    with _LOCK:
+        prebuilders = list(_PREBUILDERS)
+
+    installers: List[Callable[[], None]] = []
+    for prebuild in prebuilders:
+        try:
+            installer = prebuild(db, version, table)
+        except Exception as exc:
+            # The data is rebuilt lazily for the new version instead.
+            print(f"Catalogue prebuild failed: {exc}")
+            continue
+        if installer is not None:
+            installers.append(installer)
+    return installers
+
+
+def _notify(version: str) -> None:
+    with _LOCK:
+        listeners = list(_LISTENERS)
+
+    for callback in listeners:
+        try:
+            callback(version)
+        except Exception as exc:
+            print(f"Catalogue version listener failed: {exc}")
+
+# Return the current catalogue version, re-reading the catalog_version row when the
+# cached value is missing or older than VERSION_RECHECK_SECONDS.
+def get_catalog_version(db: Session) -> str:
+    with _LOCK:
+        version = _STATE["version"]
+        checked_at = float(_STATE["checked_at"] or 0.0)
+
+    if version is not None and (time.monotonic() - checked_at) < VERSION_RECHECK_SECONDS:
+        return str(version)
+
+    return _set_version(_read_version(db))
+
+# Fingerprint the table after a catalogue import, store and commit the new version,
+# and tell listeners if it changed.
+def bump_catalog_version(db: Session) -> str:
+    version = compute_catalog_fingerprint(db)
+    store_catalog_version(db, version)
+    db.commit()
+    return _set_version(version)
+
+
+# Make an already computed and stored version current, e.g. right after a shadow
+# table swap. Listeners are told straight away if it differs from the previous version.
+def publish_catalog_version(version: str) -> str:
+    return _set_version(version)
+
+
+def _set_version(new_version: str) -> str:
+    with _LOCK:
+        old_version = _STATE["version"]
+        _STATE["version"] = new_version
+        _STATE["checked_at"] = time.monotonic()
+
+    if old_version is not None and old_version != new_version:
+        _notify(new_version)
+
+    return new_version
@@ -0,0 +1,109 @@
+# course_schema.py
+# Cached metadata about the live courses table.
+# The table is introspected through information_schema once, and the column set plus
+# the compiled catalogue SELECT statement are reused until a catalogue import or an
+# explicit admin refresh asks for them to be rebuilt.
+# This keeps the information_schema round-trip and statement building off the hot path.
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+# Columns the recommender reads, in the order they are selected.
+PREFERRED_FIELDS = [
+    "id",
+    "url",
+    "course_name",
+    "provider",
+    "organization",
+    "organisation",
+    "type",
+    "level",
+    "subject",
+    "duration",
+    "rating",
+    "nu_reviews",
+    "enrollments",
+    "description",
+    "skills_norm",
+]
+
+_LOCK = Lock()
+_STATE: Dict[str, object] = {"schema": None, "generation": 0}
+
+
+class CourseSchema:
+    def __init__(self, columns: Set[str], generation: int):
+        self.columns = set(columns)
+        # Increases on every refresh so dependants can tell when to rebuild.
+        self.generation = generation
+        self.select_fields: List[str] = build_select_fields(self.columns)
+        # Compiled once and reused for every catalogue load.
+        self.select_statement: TextClause = self.select_statement_for("courses")
+
+    # The catalogue SELECT against another table with the same columns,
+    # e.g. a shadow table that is about to replace courses.
+    def select_statement_for(self, table: str) -> TextClause:
+        select_sql = ",\n            ".join(self.select_fields)
+        return text(
+            f"""
+            SELECT
+                {select_sql}
+            FROM {table}
+            ORDER BY id
+            """
+        )
+
+    def has_fields(self, fields: Set[str]) -> bool:
+        return fields.issubset(self.columns)
+
+# Read the live courses table schema and return the set of available column names.
+def introspect_course_columns(db: Session) -> Set[str]:
+    sql = text(
+        """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'courses'
+        """
+    )
+    rows = db.execute(sql).mappings().all()
+    return {str(row["column_name"]).strip().lower() for row in rows}
+
+# Build the SELECT field list dynamically
+# Helps to prevent crashes caused by querying columns that are not present.
+def build_select_fields(available_columns: Set[str]) -> List[str]:
+    return [field for field in PREFERRED_FIELDS if field in available_columns]
+
+def _introspect_locked(db: Session) -> "CourseSchema":
+    _STATE["generation"] = int(_STATE["generation"]) + 1
+    schema = CourseSchema(introspect_course_columns(db), generation=int(_STATE["generation"]))
+    _STATE["schema"] = schema
+    return schema
+
+# Return the cached schema, introspecting the table only the first time.
+def get_course_schema(db: Session) -> CourseSchema:
+    schema = _STATE["schema"]
+    if schema is not None:
+        return schema
+
+    with _LOCK:
+        schema = _STATE["schema"]
+        if schema is None:
+            schema = _introspect_locked(db)
+
+    return schema
+
+# Re-read the schema, e.g. after a catalogue import or an admin signal.
+# Without a session the cached schema is just dropped and re-read on next use.
+def refresh_course_schema(db: Optional[Session] = None) -> Optional[CourseSchema]:
+    with _LOCK:
+        if db is None:
+            _STATE["schema"] = None
+            return None
+
+        return _introspect_locked(db)
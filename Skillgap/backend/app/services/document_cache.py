@@ -0,0 +1,245 @@
+# document_cache.py
+# Content-addressed on-disk cache of document analyses.
+# Users re-upload the same CV and JD while they iterate on confirmed skills, and
+# every upload used to re-run pdfplumber, the text cleaning and spaCy from scratch.
+# Entries are keyed by the SHA-256 of the uploaded bytes plus the extractor version
+# and the taxonomy version, so a rebuilt taxonomy or a change to the extraction code
+# never serves an old result. Each entry stores only the extract_entities result
+# (taxonomy skills, qualification and experience matches) as one JSON file: the
+# document text itself is never written, so nothing of a deleted account's CV is
+# left behind on disk.
+# The store is shared by every process (API workers and analysis pool workers).
+# Writes happen in the analysis workers, which hand their counts back with the job
+# result (record_cache_activity), so the stats endpoint sees them.
+# When it grows past its size limit the least recently used entries (oldest mtime;
+# hits touch the file) are deleted. Entries from another extractor version are
+# removed at startup by purge_stale_documents.
+#
+# Configuration (environment):
+#   SKILLGAP_DOCUMENT_CACHE=0                 disable the cache
+#   SKILLGAP_DOCUMENT_CACHE_DIR=...           where entries are stored (default app/data/document_cache)
+#   SKILLGAP_DOCUMENT_CACHE_MAX_MB=256        size limit before eviction
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Bump whenever text cleaning or entity extraction changes what they return, or the
+# entry format changes, so entries written by the old code are no longer used.
+EXTRACTOR_VERSION = "3"
+
+CACHE_ENABLED = os.getenv("SKILLGAP_DOCUMENT_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+CACHE_DIR = Path(
+    os.getenv("SKILLGAP_DOCUMENT_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "document_cache"))
+)
+CACHE_MAX_BYTES = int(float(os.getenv("SKILLGAP_DOCUMENT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# Eviction trims the store to this fraction of the limit, so it does not run on every write.
+EVICT_TO_FRACTION = 0.9
+
+_LOCK = Lock()
+# Size of the store as seen by this process; None until the directory was scanned.
+_STATE: Dict[str, Optional[int]] = {"bytes": None}
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+
+# SHA-256 of a document given as bytes or as the path of a file (read in chunks).
+def document_hash(source: Union[bytes, str]) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        digest = hashlib.sha256()
+        with open(source, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return hashlib.sha256(source).hexdigest()
+
+# The extractor version also covers the matcher engine and match policy, which change the entities found.
+def _extractor_version() -> str:
+    from app.services.entity_extraction import SKILL_MATCH_POLICY, SKILL_MATCHER_ENGINE
+
+    return f"{EXTRACTOR_VERSION}:{SKILL_MATCHER_ENGINE}:{SKILL_MATCH_POLICY}"
+
+
+def cache_key(doc_hash: str, taxonomy_version: str) -> str:
+    raw = f"{doc_hash}|{_extractor_version()}|{taxonomy_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str, cache_dir: Path) -> Path:
+    # Two-character fan-out keeps directories small.
+    return cache_dir / key[:2] / f"{key}.json"
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _LOCK:
+        _STATS[name] += amount
+
+# Add the counts returned by put_cached_document (possibly in a worker process) to this process's stats.
+def record_cache_activity(counts: Dict[str, int]) -> None:
+    with _LOCK:
+        for name in ("writes", "evictions", "errors"):
+            _STATS[name] += int(counts.get(name, 0))
+
+# Return {"extraction": ...} for a cached document, or None.
+def get_cached_document(
+    doc_hash: str,
+    taxonomy_version: str,
+    cache_dir: Path = CACHE_DIR,
+) -> Optional[Dict[str, Any]]:
+    if not CACHE_ENABLED:
+        return None
+
+    path = _entry_path(cache_key(doc_hash, taxonomy_version), cache_dir)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        # Mark as recently used for eviction.
+        os.utime(path)
+    except FileNotFoundError:
+        _count("misses")
+        return None
+    except (OSError, ValueError) as exc:
+        # Unreadable or half-written entry: treat as a miss, the next write replaces it.
+        print(f"Document cache read failed for {path.name}: {exc}")
+        _count("errors")
+        _count("misses")
+        return None
+
+    _count("hits")
+    return entry
+
+# Store the extraction for a document. Errors are reported and swallowed: a failed
+# cache write must never fail the analysis itself.
+# Nothing is counted here, since this usually runs in a worker process; the returned
+# {"writes", "evictions", "errors"} counts go to record_cache_activity in the parent.
+def put_cached_document(
+    doc_hash: str,
+    taxonomy_version: str,
+    extraction: Dict[str, Any],
+    cache_dir: Path = CACHE_DIR,
+) -> Dict[str, int]:
+    counts = {"writes": 0, "evictions": 0, "errors": 0}
+    if not CACHE_ENABLED:
+        return counts
+
+    path = _entry_path(cache_key(doc_hash, taxonomy_version), cache_dir)
+    payload = json.dumps(
+        {
+            "document_hash": doc_hash,
+            "extractor_version": _extractor_version(),
+            "taxonomy_version": taxonomy_version,
+            "extraction": extraction,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary name first so readers never see a partial entry.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"Document cache write failed for {path.name}: {exc}")
+        counts["errors"] = 1
+        return counts
+
+    counts["writes"] = 1
+    with _LOCK:
+        if _STATE["bytes"] is not None:
+            _STATE["bytes"] += len(payload)
+        over_limit = _STATE["bytes"] is None or _STATE["bytes"] > CACHE_MAX_BYTES
+    if over_limit:
+        counts["evictions"] = _evict(CACHE_MAX_BYTES, cache_dir)
+    return counts
+
+
+def _scan_entries(cache_dir: Path) -> List[Tuple[float, int, Path]]:
+    entries = []
+    for path in cache_dir.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+# Delete least recently used entries until the store is under max_bytes * EVICT_TO_FRACTION.
+# Only runs the deletion when the store is actually over max_bytes.
+# Returns the number of entries removed.
+def evict_documents(max_bytes: int = CACHE_MAX_BYTES, cache_dir: Path = CACHE_DIR) -> int:
+    removed = _evict(max_bytes, cache_dir)
+    _count("evictions", removed)
+    return removed
+
+
+def _evict(max_bytes: int, cache_dir: Path) -> int:
+    entries = _scan_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    if total > max_bytes:
+        target = int(max_bytes * EVICT_TO_FRACTION)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # Another process evicted it first.
+                pass
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+    with _LOCK:
+        _STATE["bytes"] = total
+    return removed
+
+# Delete every entry not written by the current extractor version (older code, another
+# matcher engine or policy, or the old format that also stored the document text).
+# Reads each entry, so it runs once in the background at startup.
+# Returns the number of entries removed.
+def purge_stale_documents(cache_dir: Path = CACHE_DIR) -> int:
+    if not CACHE_ENABLED:
+        return 0
+
+    current = _extractor_version()
+    removed = 0
+    for _, _, path in _scan_entries(cache_dir):
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            stale = not isinstance(entry, dict) or entry.get("extractor_version") != current or "text" in entry
+        except (OSError, ValueError):
+            stale = True
+        if not stale:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+
+    with _LOCK:
+        _STATE["bytes"] = None
+        _STATS["evictions"] += removed
+    return removed
+
+# Counters for this process plus the size of the store on disk.
+def get_document_cache_stats(cache_dir: Path = CACHE_DIR) -> Dict[str, Any]:
+    entries = _scan_entries(cache_dir) if CACHE_ENABLED else []
+    with _LOCK:
+        stats = dict(_STATS)
+    return {
+        "enabled": CACHE_ENABLED,
+        "directory": str(cache_dir),
+        "extractor_version": EXTRACTOR_VERSION,
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        "max_bytes": CACHE_MAX_BYTES,
+        **stats,
+    }
@@ -1,19 +1,51 @@
 # entity_extraction.py
 from __future__ import annotations
-import json
+import os
 import re
+import time
 from pathlib import Path
 from functools import lru_cache
-from typing import Dict, List, Any, Tuple
-import spacy
-from spacy.matcher import PhraseMatcher
-
-# Taxonomy files
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+
+from app.services.skills.skill_matcher import POLICIES, SkillMatcher, build_skill_matcher
+from app.services.skills.taxonomy_registry import (
+    DEFAULT_TAXONOMY,
+    TAXONOMY_FILES,
+    LoadedTaxonomy,
+    get_taxonomy,
+    read_taxonomy_file,
+)
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.matcher import PhraseMatcher
+    from spacy.tokens import Doc
+
+# Taxonomy files (the registry also knows the original unfiltered taxonomy)
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-ACTIVE_TAXONOMY_PATH = DATA_DIR / "skill_taxonomy_it_active.json"
+ACTIVE_TAXONOMY_PATH = TAXONOMY_FILES[DEFAULT_TAXONOMY]
+
+# Defaults for batch extraction (nlp.pipe); can be overridden per call.
+BATCH_SIZE = int(os.getenv("ENTITY_EXTRACTION_BATCH_SIZE", "64"))
+N_PROCESS = int(os.getenv("ENTITY_EXTRACTION_N_PROCESS", "1"))
+
+# Dictionary skill matching engine:
+#   phrasematcher  spaCy PhraseMatcher over the en_core_web_sm tokenizer (default)
+#   aho-corasick   precompiled automaton in skills/skill_matcher.py, no spaCy needed
+# SKILLGAP_SKILL_MATCH_POLICY (aho-corasick only): "all" keeps every match like the
+# PhraseMatcher, "longest" keeps leftmost-longest non-overlapping matches.
+SKILL_MATCHER_ENGINES = ("phrasematcher", "aho-corasick")
+SKILL_MATCHER_ENGINE = os.getenv("SKILLGAP_SKILL_MATCHER", "phrasematcher").strip().lower()
+SKILL_MATCH_POLICY = os.getenv("SKILLGAP_SKILL_MATCH_POLICY", "all").strip().lower()
+
+# spaCy and the en_core_web_sm model are loaded on first use rather than at import,
+# so processes that never extract entities (auth-only workers, CLI scripts) start fast.
+@lru_cache(maxsize=1)
+def _get_nlp() -> "Language":
+    import spacy
 
-# PhraseMatcher doesn't need NER/parser
-_nlp = spacy.load("en_core_web_sm", disable=["ner", "parser", "tagger", "lemmatizer"])
+    # PhraseMatcher doesn't need NER/parser
+    return spacy.load("en_core_web_sm", disable=["ner", "parser", "tagger", "lemmatizer"])
 
 QUALIFICATION_KEYWORDS = [
     "degree", "bachelor", "diploma", "professional certificate",
@@ -37,45 +69,46 @@ def _preprocess_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text)
     return text
 
-# Loads the taxonomy, builds a PhraseMatcher, and extracts entities from text.
+# Loads the active taxonomy skill list (lowercased, unique, longest first).
 def _load_taxonomy_file() -> Tuple[Path, List[str]]:
-    if ACTIVE_TAXONOMY_PATH.exists():
-        path = ACTIVE_TAXONOMY_PATH
-
-    if not path.exists():
-        raise FileNotFoundError(
-            f"No taxonomy file found. Expected either:\n"
-            f" - {ACTIVE_TAXONOMY_PATH}\n"
-            f"Make sure you generated skill_taxonomy_it_active.json (and optionally the active version)."
+    return ACTIVE_TAXONOMY_PATH, read_taxonomy_file(ACTIVE_TAXONOMY_PATH)
+
+# Build the dictionary matcher for a taxonomy skill list with the configured engine.
+# Every PhraseMatcher is built on the one shared spaCy vocab, so loading several
+# taxonomies (or reloading one) does not load another pipeline.
+def build_taxonomy_matcher(skills: List[str]) -> Union["PhraseMatcher", SkillMatcher]:
+    if SKILL_MATCHER_ENGINE not in SKILL_MATCHER_ENGINES:
+        raise ValueError(
+            f"Unknown SKILLGAP_SKILL_MATCHER {SKILL_MATCHER_ENGINE!r}; expected one of {', '.join(SKILL_MATCHER_ENGINES)}"
         )
-    skills = json.loads(path.read_text(encoding="utf-8"))
-    #lowercase + unique + longest-first helps overlap behaviour ('machine learning' before 'learning')
-    cleaned = sorted({str(s).strip().lower() for s in skills if s and str(s).strip()}, key=len, reverse=True)
-    return path, cleaned
+    if SKILL_MATCH_POLICY not in POLICIES:
+        raise ValueError(f"Unknown SKILLGAP_SKILL_MATCH_POLICY {SKILL_MATCH_POLICY!r}; expected one of {', '.join(POLICIES)}")
 
-# Manual overrides for common IT skill synonyms, typos, or unnormalisable variants.
-@lru_cache(maxsize=1)
-def _get_taxonomy_and_matcher() -> Tuple[Path, List[str], PhraseMatcher]:
-#    Cached loader for runtime speed.
-#    If you rebuild the active taxonomy and want FastAPI to pick it up,
-#    restart the backend (or clear the cache manually).
+    if SKILL_MATCHER_ENGINE == "aho-corasick":
+        return build_skill_matcher(skills, policy=SKILL_MATCH_POLICY)
 
-    path, skills = _load_taxonomy_file()
+    from spacy.matcher import PhraseMatcher
 
-    matcher = PhraseMatcher(_nlp.vocab, attr="LOWER")
-    patterns = [_nlp.make_doc(s) for s in skills]
+    nlp = _get_nlp()
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    patterns = [nlp.make_doc(s) for s in skills]
     matcher.add("ICT_SKILL", patterns)
-
-    return path, skills, matcher
-
-# Extract skills using a simple dictionary lookup via spaCy's PhraseMatcher.
-def _extract_dictionary_skills(text: str) -> List[str]:
-    cleaned = _preprocess_text(text)
-    if not cleaned:
-        return []
-
-    _, _, matcher = _get_taxonomy_and_matcher()
-    doc = _nlp(cleaned)
+    return matcher
+
+# The taxonomy, its matcher and version come from the registry, which swaps in a new
+# matcher when the taxonomy file changes or an admin reload is requested, so a
+# rebuilt taxonomy no longer needs a backend restart.
+def _get_taxonomy_and_matcher(taxonomy: str = DEFAULT_TAXONOMY) -> Tuple[Path, List[str], Union["PhraseMatcher", SkillMatcher]]:
+    loaded = get_taxonomy(taxonomy)
+    return loaded.path, loaded.skills, loaded.matcher
+
+# Build the taxonomy matcher ahead of the first request (used by the startup task).
+# Returns the number of taxonomy skills loaded.
+def load_skill_matcher(taxonomy: str = DEFAULT_TAXONOMY) -> int:
+    return len(get_taxonomy(taxonomy).skills)
+
+# Run the shared PhraseMatcher over an already tokenised doc.
+def _skills_from_doc(doc: "Doc", matcher: "PhraseMatcher") -> List[str]:
     matches = matcher(doc)
 
     found = set()
@@ -86,6 +119,18 @@ def _extract_dictionary_skills(text: str) -> List[str]:
 
     return sorted(found)
 
+# Extract skills using a simple dictionary lookup via spaCy's PhraseMatcher.
+def _extract_dictionary_skills(text: str, matcher: Optional[Union["PhraseMatcher", SkillMatcher]] = None) -> List[str]:
+    cleaned = _preprocess_text(text)
+    if not cleaned:
+        return []
+
+    if matcher is None:
+        _, _, matcher = _get_taxonomy_and_matcher()
+    if isinstance(matcher, SkillMatcher):
+        return matcher.find(cleaned)
+    return _skills_from_doc(_get_nlp()(cleaned), matcher)
+
 # Extract some basic non-skill entities using simple keyword and regex matching.
 def _extract_other_entities(text: str) -> List[Dict[str, str]]:
     cleaned = _preprocess_text(text)
@@ -101,11 +146,15 @@ def _extract_other_entities(text: str) -> List[Dict[str, str]]:
 
     return entities
 
-def extract_entities(text: str) -> Dict[str, Any]:
+def extract_entities(text: str, taxonomy: str = DEFAULT_TAXONOMY) -> Dict[str, Any]:
 # Main function to extract entities from job description text.
-    taxonomy_path, taxonomy_skills, _ = _get_taxonomy_and_matcher()
-    dictionary_skills = _extract_dictionary_skills(text)
-    
+# meta.taxonomy_version records which taxonomy build produced the skills.
+    loaded = get_taxonomy(taxonomy)
+    dictionary_skills = _extract_dictionary_skills(text, loaded.matcher)
+    return _build_result(text, dictionary_skills, loaded)
+
+# Assemble the extract_entities response from the matched dictionary skills.
+def _build_result(text: str, dictionary_skills: List[str], loaded: LoadedTaxonomy) -> Dict[str, Any]:
     raw_entities: List[Dict[str, str]] = [{"text": s, "type": "technical"} for s in dictionary_skills]
     # Add other entity types (qualifications, experience) to the raw entities list.
     raw_entities.extend(_extract_other_entities(text))
@@ -122,9 +171,80 @@ def extract_entities(text: str) -> Dict[str, Any]:
         "raw_entities": raw_entities,
         "unique_entities": unique,
         "meta": {
-            "taxonomy_file": str(taxonomy_path),
-            "taxonomy_skill_count": len(taxonomy_skills),
+            "taxonomy": loaded.name,
+            "taxonomy_version": loaded.version,
+            "taxonomy_file": str(loaded.path),
+            "taxonomy_skill_count": len(loaded.skills),
             "matched_technical_count": len(dictionary_skills),
             "unique_entity_count": len(unique),
         }
-    }
\ No newline at end of file
+    }
+
+# Extract entities from many texts at once, in input order.
+# Texts are streamed through nlp.pipe, so tokenisation is batched (and can use several
+# processes) instead of one _nlp() call per document; the shared PhraseMatcher then
+# runs over each doc. Each result is the same shape as extract_entities().
+# The aho-corasick engine needs no tokenisation, so texts are matched one by one and
+# batch_size / n_process are ignored. The whole batch uses one taxonomy version,
+# even if a reload swaps in a new one part way through.
+def iter_extract_entities(
+    texts: Iterable[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+    taxonomy: str = DEFAULT_TAXONOMY,
+) -> Iterator[Dict[str, Any]]:
+    loaded = get_taxonomy(taxonomy)
+    matcher = loaded.matcher
+
+    if isinstance(matcher, SkillMatcher):
+        for text in texts:
+            cleaned = _preprocess_text(text or "")
+            dictionary_skills = matcher.find(cleaned) if cleaned else []
+            yield _build_result(text or "", dictionary_skills, loaded)
+        return
+
+    nlp = _get_nlp()
+
+    originals: List[str] = []
+
+    def cleaned_texts() -> Iterator[str]:
+        for text in texts:
+            originals.append(text or "")
+            yield _preprocess_text(text or "")
+
+    docs = nlp.pipe(
+        cleaned_texts(),
+        batch_size=max(1, batch_size or BATCH_SIZE),
+        n_process=max(1, n_process or N_PROCESS),
+    )
+    for position, doc in enumerate(docs):
+        dictionary_skills = _skills_from_doc(doc, matcher) if len(doc) else []
+        yield _build_result(originals[position], dictionary_skills, loaded)
+        originals[position] = ""
+
+# Batch wrapper around iter_extract_entities that also reports throughput.
+# Runs in the calling process (scripts, benchmarks); the API spreads batches over the
+# analysis process pool with analysis_pool.run_entity_batch instead.
+def extract_entities_batch(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+    taxonomy: str = DEFAULT_TAXONOMY,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    results = list(iter_extract_entities(texts, batch_size=batch_size, n_process=n_process, taxonomy=taxonomy))
+    elapsed = time.perf_counter() - started
+
+    total_chars = sum(len(text or "") for text in texts)
+    return {
+        "results": results,
+        "stats": {
+            "documents": len(results),
+            "characters": total_chars,
+            "seconds": round(elapsed, 3),
+            "documents_per_second": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+            "characters_per_second": round(total_chars / elapsed, 1) if elapsed > 0 else None,
+            "batch_size": max(1, batch_size or BATCH_SIZE),
+            "n_process": max(1, n_process or N_PROCESS),
+        },
+    }
@@ -1,12 +1,22 @@
 # entity_storage.py
 # Handles saving extracted entities into the database:
 # CV entities -> cv_entities table
-# JD entities -> jd_entities table
+# JD entities -> jd_entities table, keyed by document content hash and taxonomy
+#                version, plus a job_postings row linking the uploading user to that set
 
 # Entity lists are cleaned and deduplicated before being saved.
-from sqlalchemy.orm import Session
+# CV saving is diff-based: the stored (entity_name, entity_type) set is compared with the
+# new one and only the difference is written, as one multi-row DELETE and one
+# multi-row INSERT, so re-analysing an unchanged document costs a single SELECT.
+# JD sets are shared between users, so they are written once and never diffed.
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.CV_entity import CVEntity
 from app.models.JD_entity import JDEntity
+from app.models.job_posting import JobPosting
 
 def _clean_entity_name(value) -> str:
     # Normalise entity text so comparisons and duplicate checks are more reliable.
@@ -44,59 +54,168 @@ def _dedupe_entity_list(entity_list: list) -> list:
 
     return cleaned
 
+# Bring the rows of `model` matching `scope` (column -> value) in line with cleaned_entities.
+# Rows whose (entity_name, entity_type) is no longer present, and duplicate rows, are
+# deleted by id; missing entities are inserted in one executemany, which SQLAlchemy
+# sends as multi-row VALUES pages (insertmanyvalues). Kept rows from an older taxonomy
+# build are re-tagged with one UPDATE. Does not commit.
+# Returns the counts of inserted, deleted, retagged and unchanged rows.
+async def _apply_entity_diff(
+    db: AsyncSession,
+    model,
+    scope: Dict[str, Any],
+    cleaned_entities: list,
+    taxonomy_version: Optional[str],
+) -> Dict[str, int]:
+    filters = [getattr(model, column) == value for column, value in scope.items()]
+    stored_rows = (
+        await db.execute(
+            select(model.id, model.entity_name, model.entity_type, model.taxonomy_version).where(*filters)
+        )
+    ).all()
+
+    wanted = {(ent["text"], ent["type"]) for ent in cleaned_entities}
+    kept: Dict[tuple, Any] = {}
+    stale_ids: List[int] = []
+    for row in stored_rows:
+        key = (_clean_entity_name(row.entity_name), _clean_entity_type(row.entity_type))
+        if key in wanted and key not in kept:
+            kept[key] = row
+        else:
+            stale_ids.append(row.id)
+
+    new_rows = [
+        {**scope, "entity_name": ent["text"], "entity_type": ent["type"], "taxonomy_version": taxonomy_version}
+        for ent in cleaned_entities
+        if (ent["text"], ent["type"]) not in kept
+    ]
+    retag_ids = [row.id for row in kept.values() if row.taxonomy_version != taxonomy_version]
+
+    if stale_ids:
+        await db.execute(delete(model).where(model.id.in_(stale_ids)))
+    if new_rows:
+        await db.execute(insert(model), new_rows)
+    if retag_ids:
+        await db.execute(update(model).where(model.id.in_(retag_ids)).values(taxonomy_version=taxonomy_version))
+
+    return {
+        "inserted": len(new_rows),
+        "deleted": len(stale_ids),
+        "retagged": len(retag_ids),
+        "unchanged": len(kept) - len(retag_ids),
+    }
+
 # Save extracted CV entities for a given user.
 # A fresh CV analysis should replace the old CV entities for that user.
-def save_cv_entities(db: Session, user_id: int, entity_list: list):
+# taxonomy_version records which taxonomy build the entities came from.
+async def save_cv_entities(db: AsyncSession, user_id: int, entity_list: list, taxonomy_version: str = None):
     cleaned_entities = _dedupe_entity_list(entity_list)
 
     try:
-        # Remove the previous CV entities for this user so repeated analysis runs
+        # Entities no longer in the CV are removed, so repeated analysis runs
         # do not keep growing the table.
-        db.query(CVEntity).filter(CVEntity.user_id == user_id).delete()
-
-        for ent in cleaned_entities:
-            cv_ent = CVEntity(
-                user_id=user_id,
-                entity_name=ent["text"],
-                entity_type=ent["type"],
-            )
-            db.add(cv_ent)
+        changes = await _apply_entity_diff(db, CVEntity, {"user_id": user_id}, cleaned_entities, taxonomy_version)
 
-        db.commit()
+        await db.commit()
 
         return {
             "status": "CV entities saved",
             "user_id": user_id,
             "count": len(cleaned_entities),
+            "taxonomy_version": taxonomy_version,
+            **changes,
         }
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise
 
-# Save Job Description entities.
-# Each new JD upload replaces the previous JD entities globally.
-def save_jd_entities(db: Session, entity_list: list):
+# Save Job Description entities as a job owned by owner_id.
+# The entities are stored once per (content_hash, taxonomy_version) and never rewritten:
+# when the set already exists (another user uploaded the same JD with the same taxonomy
+# build) the job is only linked to it, so other users' gap targets cannot change.
+# A truncated extraction (page cap or time budget) depends on limits and load, so it
+# is never stored as the shared set: the job is linked to the key and picks up the
+# entities once a complete upload of the document stores them. An existing job keeps
+# its current taxonomy version rather than moving to a set that is not stored.
+# Returns the job_id to pass to gap computation, and entities_pending=True when the
+# job has no stored entities yet (so there is no gap to compute until a re-upload).
+async def save_jd_entities(
+    db: AsyncSession,
+    owner_id: int,
+    content_hash: str,
+    entity_list: list,
+    taxonomy_version: str = None,
+    filename: str = None,
+    truncated: bool = False,
+):
     cleaned_entities = _dedupe_entity_list(entity_list)
 
     try:
-        # Clear the previously stored JD entities so the next gap analysis
-        # only uses the current JD.
-        db.query(JDEntity).delete()
-
-        for ent in cleaned_entities:
-            jd_ent = JDEntity(
-                entity_name=ent["text"],
-                entity_type=ent["type"],
+        # Serialise writers of the same entity set only; uploads of different JDs
+        # never wait on each other. Released at commit/rollback.
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"jd:{content_hash}:{taxonomy_version}"},
+        )
+        shared = (
+            await db.execute(
+                select(
+                    exists().where(
+                        JDEntity.content_hash == content_hash,
+                        JDEntity.taxonomy_version.is_not_distinct_from(taxonomy_version),
+                    )
+                )
             )
-            db.add(jd_ent)
-
-        db.commit()
+        ).scalar()
+
+        inserted = 0
+        if not shared and not truncated and cleaned_entities:
+            await db.execute(
+                insert(JDEntity),
+                [
+                    {
+                        "content_hash": content_hash,
+                        "entity_name": ent["text"],
+                        "entity_type": ent["type"],
+                        "taxonomy_version": taxonomy_version,
+                    }
+                    for ent in cleaned_entities
+                ],
+            )
+            inserted = len(cleaned_entities)
+        stored = shared or inserted > 0
+
+        statement = pg_insert(JobPosting).values(
+            owner_id=owner_id,
+            content_hash=content_hash,
+            filename=filename,
+            taxonomy_version=taxonomy_version,
+        )
+        updates = {"filename": statement.excluded.filename, "uploaded_at": func.now()}
+        if stored:
+            updates["taxonomy_version"] = statement.excluded.taxonomy_version
+        statement = statement.on_conflict_do_update(
+            constraint="uq_job_postings_owner_content",
+            set_=updates,
+        ).returning(JobPosting.id, JobPosting.taxonomy_version)
+        job = (await db.execute(statement)).one()
+        pending = truncated and not stored and job.taxonomy_version == taxonomy_version
+
+        await db.commit()
 
         return {
-            "status": "JD entities saved",
+            "status": "JD entities saved" if stored else "JD linked without storing entities",
+            "job_id": job.id,
             "count": len(cleaned_entities),
+            # The taxonomy version the job compares against.
+            "taxonomy_version": job.taxonomy_version,
+            # True when the entity set was already stored and nothing was written.
+            "shared": bool(shared),
+            "inserted": inserted,
+            "truncated": truncated,
+            "entities_pending": pending,
         }
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise
\ No newline at end of file
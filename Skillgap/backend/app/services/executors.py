@@ -0,0 +1,68 @@
+# executors.py
+# Where blocking work runs, so async endpoints never do it on the event loop.
+#   - CPU-bound document analysis (pdfplumber, spaCy), including batch entity
+#     extraction, runs in the analysis process pool (analysis_pool.py). It holds the
+#     GIL, so a thread pool would still compete with the event loop.
+#   - Password hashing and checking (bcrypt) runs in a small dedicated thread pool.
+#     bcrypt releases the GIL, so threads are enough, and a burst of logins can only
+#     occupy these threads rather than the ones serving database requests.
+#   - Database access goes through the async session (get_async_db in models/db.py).
+#     Services that still take a synchronous Session run in the request threadpool:
+#     their endpoints are plain `def` (FastAPI runs those and sync dependencies in the
+#     threadpool), or call run_in_threadpool. The threadpool is bounded by
+#     configure_threadpool.
+#
+# Configuration (environment):
+#   SKILLGAP_THREADPOOL_SIZE=40           threads for sync endpoints, dependencies and sync DB calls
+#   SKILLGAP_PASSWORD_HASH_THREADS=4      threads for bcrypt
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+THREADPOOL_SIZE = int(os.getenv("SKILLGAP_THREADPOOL_SIZE", "40"))
+PASSWORD_HASH_THREADS = int(os.getenv("SKILLGAP_PASSWORD_HASH_THREADS", "4"))
+
+_LOCK = Lock()
+_EXECUTORS: Dict[str, Optional[ThreadPoolExecutor]] = {"password": None}
+
+# Size the AnyIO threadpool FastAPI uses for sync endpoints, dependencies and
+# run_in_threadpool. Called once from the app lifespan.
+def configure_threadpool(size: int = THREADPOOL_SIZE) -> int:
+    import anyio.to_thread
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(1, size)
+    return limiter.total_tokens
+
+
+def _executor(name: str, threads: int, thread_name_prefix: str) -> ThreadPoolExecutor:
+    with _LOCK:
+        if _EXECUTORS[name] is None:
+            _EXECUTORS[name] = ThreadPoolExecutor(
+                max_workers=max(1, threads),
+                thread_name_prefix=thread_name_prefix,
+            )
+        return _EXECUTORS[name]
+
+# Run hash_password / verify_password (or anything else bcrypt-bound) off the event loop.
+async def run_password_work(fn: Callable[..., T], *args: Any) -> T:
+    loop = asyncio.get_running_loop()
+    executor = _executor("password", PASSWORD_HASH_THREADS, "password-hash")
+    return await loop.run_in_executor(executor, partial(fn, *args))
+
+
+def shutdown_executors() -> None:
+    with _LOCK:
+        executors = [executor for executor in _EXECUTORS.values() if executor is not None]
+        for name in _EXECUTORS:
+            _EXECUTORS[name] = None
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,27 +1,61 @@
 # gap_analysis.py
-# Compares the current user's CV entities against the current stored JD entities.
+# Compares the current user's CV entities against the JD entities of one of their jobs.
 # Finds which JD entities are NOT present in the CV entities.
 # CV entities are scoped to the user.
-# JD entities are treated as the single current job description.
-from sqlalchemy.orm import Session
+# JD entities are scoped to the job, whose document they were extracted from
+# (see job_posting.py), so users comparing against different jobs read disjoint rows.
+from typing import Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.CV_entity import CVEntity
 from app.models.JD_entity import JDEntity
+from app.models.job_posting import JobPosting
 
 def _norm(value) -> str:
     return str(value or "").strip().lower()
 
-# Compute missing entities for a given user.
-def compute_missing_entities(db: Session, user_id: int) -> list:
-    # Get the current user's CV entities.
-    cv_items = (
-        db.query(CVEntity.entity_name)
-        .filter(CVEntity.user_id == user_id)
-        .all()
+# The user's job with the given id, or their most recently uploaded job when job_id is None.
+# Returns None if there is no such job (or it belongs to another user).
+async def get_user_job(db: AsyncSession, user_id: int, job_id: Optional[int] = None) -> Optional[JobPosting]:
+    query = select(JobPosting).where(JobPosting.owner_id == user_id)
+    if job_id is not None:
+        query = query.where(JobPosting.id == job_id)
+    result = await db.execute(query.order_by(JobPosting.uploaded_at.desc(), JobPosting.id.desc()).limit(1))
+    return result.scalars().first()
+
+# Whether the entity set the job is pinned to has been stored. It is missing when the
+# document had no recognised entities, or when every upload of it so far was truncated.
+async def job_has_entities(db: AsyncSession, job: JobPosting) -> bool:
+    return bool(
+        (
+            await db.execute(
+                select(
+                    exists().where(
+                        JDEntity.content_hash == job.content_hash,
+                        JDEntity.taxonomy_version.is_not_distinct_from(job.taxonomy_version),
+                    )
+                )
+            )
+        ).scalar()
     )
+
+# Compute missing entities for a given user against one of their jobs.
+async def compute_missing_entities(db: AsyncSession, user_id: int, job_id: int) -> list:
+    # Get the current user's CV entities.
+    cv_items = await db.execute(select(CVEntity.entity_name).where(CVEntity.user_id == user_id))
     cv_set = {_norm(row[0]) for row in cv_items if _norm(row[0])}
 
-    # Get the current JD entities.
-    jd_items = db.query(JDEntity.entity_name).all()
+    # Get the job's JD entities; the owner check keeps other users' jobs out of reach.
+    jd_items = await db.execute(
+        select(JDEntity.entity_name)
+        .join(
+            JobPosting,
+            (JobPosting.content_hash == JDEntity.content_hash)
+            & JDEntity.taxonomy_version.is_not_distinct_from(JobPosting.taxonomy_version),
+        )
+        .where(JobPosting.id == job_id, JobPosting.owner_id == user_id)
+    )
     jd_set = {_norm(row[0]) for row in jd_items if _norm(row[0])}
     # If there is no JD loaded, there is nothing to compare against.
     if not jd_set:
@@ -0,0 +1,92 @@
+# readiness.py
+# Startup progress for the /ready endpoint.
+# Each component the app needs before it should take traffic (the course catalogue,
+# the taxonomy matcher and the ranker caches) records its status here while the
+# background startup task runs. The app is ready once every component is ready.
+# Timings of the individual warm-up steps are kept alongside for the same response.
+# Parts that can stop being ready after startup (the analysis pool workers, which are
+# replaced when one dies) register a live check instead, evaluated on every snapshot.
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple
+
+COMPONENTS = ["catalog", "taxonomy", "ranker"]
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+_LOCK = Lock()
+_STATE: Dict[str, Dict[str, Any]] = {name: {"status": PENDING} for name in COMPONENTS}
+_WARMUP_STEPS: Dict[str, Dict[str, Any]] = {}
+# name -> check returning (ready, details)
+_CHECKS: Dict[str, Callable[[], Tuple[bool, Dict[str, Any]]]] = {}
+
+
+def mark_running(component: str, **details: Any) -> None:
+    with _LOCK:
+        _STATE[component] = {"status": RUNNING, "started_at": time.time(), **details}
+
+# Merge progress details (e.g. rows imported so far) into a running component.
+def update_progress(component: str, **details: Any) -> None:
+    with _LOCK:
+        _STATE[component].update(details)
+
+
+def mark_ready(component: str, **details: Any) -> None:
+    with _LOCK:
+        entry = _STATE[component]
+        started_at = entry.get("started_at")
+        entry.update(details)
+        entry["status"] = READY
+        if started_at is not None:
+            entry["seconds"] = round(time.time() - started_at, 3)
+
+
+def mark_failed(component: str, error: str) -> None:
+    with _LOCK:
+        entry = _STATE[component]
+        entry["status"] = FAILED
+        entry["error"] = error
+
+
+# Store the outcome of one warm-up step (status, seconds and any details).
+def record_warmup_step(step: str, **details: Any) -> None:
+    with _LOCK:
+        _WARMUP_STEPS[step] = dict(details)
+
+
+# Add (or replace) a live readiness check reported as its own component.
+def register_check(name: str, check: Callable[[], Tuple[bool, Dict[str, Any]]]) -> None:
+    with _LOCK:
+        _CHECKS[name] = check
+
+
+def _check_components() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        checks = list(_CHECKS.items())
+    components: Dict[str, Dict[str, Any]] = {}
+    for name, check in checks:
+        ready, details = check()
+        components[name] = {"status": READY if ready else PENDING, **details}
+    return components
+
+
+def is_ready() -> bool:
+    return readiness_snapshot()["ready"]
+
+# Copy of every component's status for the /ready response.
+def readiness_snapshot() -> Dict[str, Any]:
+    with _LOCK:
+        components = {name: dict(entry) for name, entry in _STATE.items()}
+        warmup = {step: dict(entry) for step, entry in _WARMUP_STEPS.items()}
+    components.update(_check_components())
+    return {
+        "ready": all(entry["status"] == READY for entry in components.values()),
+        "components": components,
+        "warmup": warmup,
+    }
@@ -4,10 +4,30 @@
 # Raw scores are not exposed to the API response
 
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Set
-from sqlalchemy import text
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set
+import numpy as np
 from sqlalchemy.orm import Session
-from app.services.recommender.scoring import jaccard, tfidf_cosine_scores, weighted_final
+from app.services.catalog.catalog_version import (
+    add_catalog_listener,
+    add_catalog_prebuilder,
+    get_catalog_version,
+)
+from app.services.catalog.course_schema import CourseSchema, get_course_schema
+from app.services.recommender.scoring import (
+    jaccard,
+    jaccard_many,
+    tfidf_cosine_scores,
+    weighted_final,
+    weighted_final_many,
+)
+from app.services.recommender.result_cache import RecommendationCache
+from app.services.recommender.skill_index import SkillIndex, build_skill_index
+from app.services.recommender.tfidf_index import (
+    get_tfidf_index,
+    install_tfidf_index,
+    prebuild_tfidf_index,
+)
 
 # Synonym map kept only for course-matching purposes.
 # main.py already handles broader user-facing missing-skill cleanup and pruning.
@@ -51,12 +71,6 @@ def _apply_synonyms(values: Set[str]) -> Set[str]:
 
     return output
 
-# Convert a Python set into a PostgreSQL array literal string.
-# Used with the Postgres jsonb ?| operator when checking overlap
-# against the skills_norm column.
-def _to_pg_array_literal(values: Set[str]) -> str:
-    return "{" + ",".join(sorted(values)) + "}"
-
 # Infer the effective level filter based on guided question answers.
 # If the user explicitly selects a level, use it.
 # If the user says they have not taken a course before, assume beginner.
@@ -223,39 +237,102 @@ def _consistent_fields(rows: List[Dict[str, Any]], field: str, threshold: float
 
     return (present / len(rows)) >= threshold
 
-# Read the live courses table schema and return the set of available column names.
-def _get_available_course_columns(db: Session) -> Set[str]:
-    sql = text(
-        """
-        SELECT column_name
-        FROM information_schema.columns
-        WHERE table_name = 'courses'
-        """
+# A valid ranker result requires these minimum columns.
+REQUIRED_FIELDS = {"id", "url", "course_name", "provider", "description", "skills_norm"}
+
+_INDEX_LOCK = Lock()
+_INDEX_STATE: Dict[str, Any] = {"index": None, "schema_generation": None}
+
+# Ranked results keyed by catalogue version + canonical gap + ranking options.
+# Cleared as soon as a catalogue import changes the version.
+_RESULT_CACHE = RecommendationCache()
+add_catalog_listener(lambda version: _RESULT_CACHE.clear())
+
+# Hit/miss counters for sizing the recommendation cache.
+def get_recommendation_cache_stats() -> Dict[str, Any]:
+    return _RESULT_CACHE.stats()
+
+# Normalise and canonicalise a course's stored skills_norm value.
+def _canonical_course_skills(raw_skills: Any) -> List[str]:
+    # skills_norm is a JSONB array; anything else never matched the old ?| overlap filter.
+    if not isinstance(raw_skills, list):
+        return []
+    skills_norm = [_norm(skill) for skill in (raw_skills or []) if _norm(skill)]
+    return sorted(_apply_synonyms(set(skills_norm)))
+
+# Read every course row the ranker can use, in id order, with the cached catalogue SELECT.
+# Returns None when the live table is missing one of the required columns.
+def _load_catalog_rows(db: Session, schema: CourseSchema, table: str = "courses") -> Optional[List[Dict[str, Any]]]:
+    if not schema.has_fields(REQUIRED_FIELDS):
+        return None
+
+    statement = schema.select_statement if table == "courses" else schema.select_statement_for(table)
+    return [dict(row) for row in db.execute(statement).mappings().all()]
+
+
+def _build_index_from_rows(version: str, rows: List[Dict[str, Any]], schema: CourseSchema) -> SkillIndex:
+    return build_skill_index(
+        version,
+        rows,
+        _canonical_course_skills,
+        has_level_column="level" in schema.columns,
+        ambiguous_checks={"go": _is_strong_go_course},
     )
-    rows = db.execute(sql).mappings().all()
-    return {str(row["column_name"]).strip().lower() for row in rows}
-
-# Build the SELECT field list dynamically 
-# Helps to prevent crashes caused by querying columns that are not present.
-def _build_select_fields(available_columns: Set[str]) -> List[str]:
-    preferred_fields = [
-        "id",
-        "url",
-        "course_name",
-        "provider",
-        "organization",
-        "organisation",
-        "type",
-        "level",
-        "subject",
-        "duration",
-        "rating",
-        "nu_reviews",
-        "enrollments",
-        "description",
-        "skills_norm",
-    ]
-    return [field for field in preferred_fields if field in available_columns]
+
+# Return the inverted skill index for the current catalogue version,
+# building it from the courses table the first time and after every catalogue change.
+# A schema refresh also forces a rebuild, since the selected columns may have changed.
+def _get_skill_index(db: Session) -> Optional[SkillIndex]:
+    version = get_catalog_version(db)
+    schema = get_course_schema(db)
+
+    index = _INDEX_STATE["index"]
+    if index is not None and index.version == version and _INDEX_STATE["schema_generation"] == schema.generation:
+        return index
+
+    with _INDEX_LOCK:
+        index = _INDEX_STATE["index"]
+        if index is not None and index.version == version and _INDEX_STATE["schema_generation"] == schema.generation:
+            return index
+
+        rows = _load_catalog_rows(db, schema)
+        if rows is None:
+            return None
+
+        index = _build_index_from_rows(version, rows, schema)
+        _INDEX_STATE["index"] = index
+        _INDEX_STATE["schema_generation"] = schema.generation
+
+    return index
+
+# Build (or load) every catalogue index the ranker needs, e.g. at startup or after an import,
+# so the first recommendation request does not pay for it.
+def warm_ranker_indexes(db: Session) -> None:
+    _get_skill_index(db)
+    get_tfidf_index(db)
+
+# Build both indexes from a shadow catalogue table before it is swapped in.
+# The returned installer makes them current once the swap has committed, so the
+# first request against the new catalogue version does not rebuild anything.
+def _prebuild_ranker_indexes(db: Session, version: str, table: str) -> Optional[Callable[[], None]]:
+    schema = get_course_schema(db)
+    rows = _load_catalog_rows(db, schema, table)
+    if rows is None:
+        return None
+
+    skill_index = _build_index_from_rows(version, rows, schema)
+    tfidf_index = prebuild_tfidf_index(db, version, table)
+
+    def install() -> None:
+        with _INDEX_LOCK:
+            _INDEX_STATE["index"] = skill_index
+            _INDEX_STATE["schema_generation"] = get_course_schema(db).generation
+        install_tfidf_index(tfidf_index)
+
+    return install
+
+
+add_catalog_prebuilder(_prebuild_ranker_indexes)
 
 # Return a broad, relevance-sorted candidate pool from which the final list will be built. 
 def _build_candidate_pool(
@@ -364,103 +441,82 @@ def _apply_provider_diversity(
     )
     return selected[:top_n]
 
-# Rank courses for the user's missing entities using:
-# - overlap filtering in Postgres
-# - Jaccard similarity
-# - optional TF-IDF cosine similarity
-# - guided-question filtering for level
-# - a soft provider-diversity pass after ranking
-def rank_courses_for_missing(
-    db: Session,
-    missing_entities: List[str],
-    top_n: int = 10,
-    use_cosine: bool = True,
-    experience_level: Optional[str] = None,
-    has_taken_course: Optional[bool] = None,
-    w_jaccard: float = 0.75,
-    w_cosine: float = 0.25,
-) -> List[Dict[str, Any]]:
-    # Normalise and canonicalise the missing entities first.
-    missing = {_norm(entity) for entity in (missing_entities or []) if _norm(entity)}
-    missing = _apply_synonyms(missing)
-
-    if not missing:
-        return []
-
-    # Infer the level filter from the guided-question answers.
-    level_filter = _infer_level_filter(experience_level, has_taken_course)
-    allowed_levels = LEVEL_MAP.get(level_filter, None) if level_filter else None
-
-    # Read the live DB schema so we only query columns that actually exist.
-    available_columns = _get_available_course_columns(db)
-    select_fields = _build_select_fields(available_columns)
-
-    # A valid ranker result requires these minimum columns.
-    required_fields = {"id", "url", "course_name", "provider", "description", "skills_norm"}
-    if not required_fields.issubset(set(select_fields)):
-        return []
-
-    params: Dict[str, Any] = {}
-    params["missing"] = _to_pg_array_literal(missing)
-
-    # Base candidate filter:
-    # keep only courses whose skills_norm overlaps any missing entity.
-    base_match_sql = "skills_norm IS NOT NULL AND skills_norm ?| :missing"
-
-    # Extra fallback for gRPC if it appears in text but not in skills_norm.
-    grpc_fallback_sql = ""
-    if "grpc" in missing:
-        grpc_fallback_sql = (
-            " OR lower(course_name) LIKE '%grpc%'"
-            " OR lower(description) LIKE '%remote procedure%'"
-        )
-
-    # Optional level filter if one was inferred or explicitly provided.
-    level_clause = ""
-    if allowed_levels and "level" in available_columns:
-        params["levels"] = list(allowed_levels)
-        level_clause = " AND level IS NOT NULL AND lower(level) = ANY(:levels)"
-
-    select_sql = ",\n            ".join(select_fields)
-
-    sql = text(
-        f"""
-        SELECT
-            {select_sql}
-        FROM courses
-        WHERE ({base_match_sql}{grpc_fallback_sql})
-        {level_clause}
-        LIMIT 2500
-        """
-    )
-    rows = db.execute(sql, params).mappings().all()
-
-    if not rows:
-        return []
+# Score the candidate rows against the query using the precomputed catalogue TF-IDF index.
+# Only the query is transformed per request; the course vectors come from the saved index.
+# If the index cannot be loaded or built, fall back to fitting a vectorizer on the candidates.
+def _cosine_scores_for_rows(db: Session, query_text: str, rows: List[Any]) -> List[float]:
+    try:
+        index = get_tfidf_index(db)
+        return index.scores(query_text, [row.get("id") for row in rows])
+    except Exception as exc:
+        print(f"TF-IDF index unavailable, scoring candidates directly: {exc}")
 
-    # Prepare course documents for optional cosine re-ranking.
     docs: List[str] = []
     for row in rows:
         course_name = str(row.get("course_name") or "")
         description = str(row.get("description") or "")
         docs.append(f"{course_name}. {description}")
 
-    # Create a single query document from the missing entities.
-    query_text = " ".join(sorted(missing))
-    cosine_scores = tfidf_cosine_scores(query_text, docs) if use_cosine else [0.0] * len(rows)
+    return tfidf_cosine_scores(query_text, docs)
 
+# Build the internal ranking row for one scored course.
+def _internal_row(
+    row: Dict[str, Any],
+    matched: List[str],
+    missing_count: int,
+    final_score: float,
+    coverage: float,
+) -> Dict[str, Any]:
+    matched_count = len(matched)
+    provider_norm = _normalize_provider(row.get("provider"))
+    normalized_level = _normalize_level_label(row.get("level"))
+
+    return {
+        "course_id": row.get("id"),
+        "url": row.get("url"),
+        "course_name": row.get("course_name"),
+        "provider": provider_norm if provider_norm else row.get("provider"),
+        "organization": _clean_organization(row.get("organization") or row.get("organisation")),
+        "type": row.get("type"),
+        "level": normalized_level,
+        "subject": row.get("subject"),
+        "duration": row.get("duration"),
+        "rating": row.get("rating"),
+        "nu_reviews": row.get("nu_reviews"),
+        "enrollments": row.get("enrollments"),
+        "matched_skills": matched,
+        "matched_count": matched_count,
+        "covers": f"{matched_count}/{missing_count}",
+
+        # Internal-only ranking fields.
+        "_final": float(final_score),
+        "_coverage": float(coverage),
+        "_provider_norm": provider_norm,
+    }
+
+# Reference per-candidate scoring loop.
+# Returns every matching candidate sorted by relevance. The ranker uses the vectorised
+# _score_candidates below; this version is kept as the ground truth it is checked
+# and benchmarked against.
+def _score_candidates_loop(
+    skill_index: SkillIndex,
+    positions: np.ndarray,
+    missing: Set[str],
+    cosine_scores: np.ndarray,
+    w_jaccard: float,
+    w_cosine: float,
+) -> List[Dict[str, Any]]:
     internal_ranked: List[Dict[str, Any]] = []
     missing_count = len(missing)
 
     # Calculate the ranking features for each candidate course.
-    for row, cosine_score in zip(rows, cosine_scores):
+    for position, cosine_score in zip(positions, cosine_scores):
+        row = skill_index.rows[position]
         course_name = str(row.get("course_name") or "")
         description = str(row.get("description") or "")
 
-        # Normalise and canonicalise the stored course entities.
-        raw_skills = row.get("skills_norm") or []
-        skills_norm = [_norm(skill) for skill in raw_skills if _norm(skill)]
-        skills_norm = sorted(_apply_synonyms(set(skills_norm)))
+        # Course entities were normalised and canonicalised when the index was built.
+        skills_norm = skill_index.skills[position]
 
         # Work out which missing entities this course can cover.
         matched = sorted(set(skills_norm) & set(missing))
@@ -480,44 +536,196 @@ def rank_courses_for_missing(
         jaccard_score = jaccard(missing, skills_norm)
         final_score = weighted_final(
             jaccard_score=jaccard_score,
-            cosine_score=cosine_score,
+            cosine_score=float(cosine_score),
             w_j=w_jaccard,
             w_c=w_cosine,
         )
         coverage = matched_count / missing_count if missing_count > 0 else 0.0
-        provider_norm = _normalize_provider(row.get("provider"))
-        normalized_level = _normalize_level_label(row.get("level"))
-
-        internal_ranked.append(
-            {
-                "course_id": row.get("id"),
-                "url": row.get("url"),
-                "course_name": row.get("course_name"),
-                "provider": provider_norm if provider_norm else row.get("provider"),
-                "organization": _clean_organization(row.get("organization") or row.get("organisation")),
-                "type": row.get("type"),
-                "level": normalized_level,
-                "subject": row.get("subject"),
-                "duration": row.get("duration"),
-                "rating": row.get("rating"),
-                "nu_reviews": row.get("nu_reviews"),
-                "enrollments": row.get("enrollments"),
-                "matched_skills": matched,
-                "matched_count": matched_count,
-                "covers": f"{matched_count}/{missing_count}",
-
-                # Internal-only ranking fields.
-                "_final": float(final_score),
-                "_coverage": float(coverage),
-                "_provider_norm": provider_norm,
-            }
-        )
+        internal_ranked.append(_internal_row(row, matched, missing_count, final_score, coverage))
 
     # Rank internally by the weighted score, then by coverage, then by matched count.
     internal_ranked.sort(
         key=lambda item: (item["_final"], item["_coverage"], item["matched_count"]),
         reverse=True,
     )
+    return internal_ranked
+
+# Vectorised candidate scoring over the index's CSR course x skill matrix.
+# Intersection counts, union sizes, Jaccard, coverage and the weighted final score are
+# computed for all candidates in a few NumPy/SciPy operations, then argpartition picks the
+# pool_size best before a full sort of just those rows.
+# Returns exactly the first pool_size rows of _score_candidates_loop.
+def _score_candidates(
+    skill_index: SkillIndex,
+    positions: np.ndarray,
+    missing: Set[str],
+    cosine_scores: np.ndarray,
+    w_jaccard: float,
+    w_cosine: float,
+    pool_size: int,
+) -> List[Dict[str, Any]]:
+    missing_count = len(missing)
+    if len(positions) == 0 or missing_count == 0:
+        return []
+
+    # |skills & missing| per candidate from one sparse matrix-vector product.
+    intersections = skill_index.intersection_counts(positions, skill_index.missing_vector(missing))
+
+    # Matches on ambiguous skills (e.g. "go") only count for courses that pass their check.
+    matched_counts = intersections.copy()
+    for skill, ok in skill_index.ambiguous_ok.items():
+        if skill in missing and skill in skill_index.skill_columns:
+            col = skill_index.skill_columns[skill]
+            has_skill = skill_index.matrix[positions][:, col].toarray().ravel() > 0
+            matched_counts -= (has_skill & ~ok[positions]).astype(np.int64)
+
+    keep = np.nonzero(matched_counts > 0)[0]
+    if len(keep) == 0:
+        return []
+
+    jaccard_scores = jaccard_many(intersections[keep], skill_index.skill_counts[positions[keep]], missing_count)
+    final_scores = weighted_final_many(jaccard_scores, cosine_scores[keep], w_j=w_jaccard, w_c=w_cosine)
+    coverages = matched_counts[keep].astype(np.float64) / float(missing_count)
+    matched_keep = matched_counts[keep]
+
+    # Top-k by final score. Everything tied with the k-th best score is kept as well,
+    # so the tie-break order below matches the full stable sort exactly.
+    order = np.arange(len(keep))
+    if len(keep) > pool_size:
+        kth_best = -np.partition(-final_scores, pool_size - 1)[pool_size - 1]
+        order = np.nonzero(final_scores >= kth_best)[0]
+
+    # Descending by (final, coverage, matched_count); ties keep candidate order like list.sort().
+    ranked = order[np.lexsort((order, -matched_keep[order], -coverages[order], -final_scores[order]))]
+    ranked = ranked[:pool_size]
+
+    internal_ranked: List[Dict[str, Any]] = []
+    for i in ranked:
+        position = positions[keep[i]]
+        row = skill_index.rows[position]
+        skills_norm = skill_index.skills[position]
+        matched = _filter_ambiguous_matches(
+            matched=sorted(set(skills_norm) & missing),
+            course_name=str(row.get("course_name") or ""),
+            description=str(row.get("description") or ""),
+            skills_norm=skills_norm,
+        )
+        internal_ranked.append(
+            _internal_row(row, matched, missing_count, final_scores[i], coverages[i])
+        )
+
+    return internal_ranked
+
+# Rank courses for the user's missing entities using:
+# - overlap filtering through the in-memory skill index
+# - Jaccard similarity
+# - optional TF-IDF cosine similarity (precomputed catalogue index)
+# - guided-question filtering for level
+# - a soft provider-diversity pass after ranking
+# use_cache=False ranks without reading or filling the result cache (e.g. the warm-up),
+# so synthetic queries neither take a cache slot nor count as misses.
+def rank_courses_for_missing(
+    db: Session,
+    missing_entities: List[str],
+    top_n: int = 10,
+    use_cosine: bool = True,
+    experience_level: Optional[str] = None,
+    has_taken_course: Optional[bool] = None,
+    w_jaccard: float = 0.75,
+    w_cosine: float = 0.25,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    # Normalise and canonicalise the missing entities first.
+    missing = {_norm(entity) for entity in (missing_entities or []) if _norm(entity)}
+    missing = _apply_synonyms(missing)
+
+    if not missing:
+        return []
+
+    # Infer the level filter from the guided-question answers.
+    level_filter = _infer_level_filter(experience_level, has_taken_course)
+
+    if not use_cache:
+        return _rank_courses(
+            db=db,
+            missing=missing,
+            level_filter=level_filter,
+            top_n=top_n,
+            use_cosine=use_cosine,
+            w_jaccard=w_jaccard,
+            w_cosine=w_cosine,
+        )
+
+    # Identical gaps with identical options get the same ranking for the same catalogue version.
+    cache_key = (
+        get_catalog_version(db),
+        tuple(sorted(missing)),
+        level_filter,
+        top_n,
+        use_cosine,
+        w_jaccard,
+        w_cosine,
+    )
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    output = _rank_courses(
+        db=db,
+        missing=missing,
+        level_filter=level_filter,
+        top_n=top_n,
+        use_cosine=use_cosine,
+        w_jaccard=w_jaccard,
+        w_cosine=w_cosine,
+    )
+    _RESULT_CACHE.put(cache_key, output)
+    return output
+
+# Uncached ranking for an already canonicalised missing set.
+def _rank_courses(
+    db: Session,
+    missing: Set[str],
+    level_filter: Optional[str],
+    top_n: int,
+    use_cosine: bool,
+    w_jaccard: float,
+    w_cosine: float,
+) -> List[Dict[str, Any]]:
+    allowed_levels = LEVEL_MAP.get(level_filter, None) if level_filter else None
+
+    # Candidate retrieval: union of the in-memory posting lists for the missing skills.
+    skill_index = _get_skill_index(db)
+    if skill_index is None or len(skill_index) == 0:
+        return []
+
+    positions = skill_index.candidate_positions(
+        missing,
+        allowed_levels=allowed_levels,
+        # Extra fallback for gRPC if it appears in text but not in skills_norm.
+        include_grpc_text="grpc" in missing,
+    )
+    if len(positions) == 0:
+        return []
+
+    rows = [skill_index.rows[position] for position in positions]
+
+    # Create a single query document from the missing entities.
+    query_text = " ".join(sorted(missing))
+    cosine_scores = _cosine_scores_for_rows(db, query_text, rows) if use_cosine else [0.0] * len(rows)
+
+    # Score every candidate at once and keep only the relevance-sorted pool the diversity pass needs.
+    pool_size = max(20, top_n * 3)
+    internal_ranked = _score_candidates(
+        skill_index=skill_index,
+        positions=positions,
+        missing=missing,
+        cosine_scores=np.asarray(cosine_scores, dtype=np.float64),
+        w_jaccard=w_jaccard,
+        w_cosine=w_cosine,
+        pool_size=pool_size,
+    )
+    missing_count = len(missing)
 
     # Build a broader pool first, then apply a light provider-diversity pass.
     candidate_pool = _build_candidate_pool(
@@ -0,0 +1,89 @@
+# app/services/recommender/result_cache.py
+# Small in-process LRU + TTL cache for ranked recommendation lists.
+# Many users share near-identical gaps (e.g. everyone applying to the same posted JD),
+# so the same ranking is often requested again within a short time.
+# Keys always include the catalogue version, and the cache is cleared whenever a
+# catalogue import bumps that version, so stale recommendations are never served.
+
+from __future__ import annotations
+
+import copy
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Sizing can be tuned per deployment from the environment.
+DEFAULT_MAX_ENTRIES = int(os.getenv("RECOMMENDER_CACHE_SIZE", "512"))
+DEFAULT_TTL_SECONDS = float(os.getenv("RECOMMENDER_CACHE_TTL_SECONDS", "600"))
+
+
+class RecommendationCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # Return a copy of the cached ranking, or None on a miss / expired entry.
+    # Copies are handed out so callers can never modify the cached lists.
+    def get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if self.ttl_seconds > 0 and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            # Mark as most recently used.
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: List[Dict[str, Any]]) -> None:
+        if self.max_entries == 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+
+            # Evict least recently used entries once over capacity.
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    # Counters used to size the cache.
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
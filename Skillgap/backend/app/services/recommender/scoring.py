@@ -2,8 +2,7 @@
 from __future__ import annotations
 from typing import Iterable, List
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 
 # Jaccard similarity of two sets of strings (e.g. skills).
 def jaccard(a: Iterable[str], b: Iterable[str]) -> float:
@@ -28,6 +27,10 @@ def tfidf_cosine_scores(query: str, docs: List[str]) -> List[float]:
 # Returns cosine similarity of query vs each doc using TF-IDF.
     if not query.strip():
         return [0.0] * len(docs)
+    # sklearn is imported on first use; it is slow to import and only this fallback path needs it here.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
     # Stop words helps remove junk like "for", "and", "with"
     vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), max_features=50000)
 
@@ -43,4 +46,20 @@ def weighted_final(jaccard_score: float, cosine_score: float, w_j: float = 0.75,
     # Combines Jaccard and cosine scores into a single final score.
     j = max(0.0, min(1.0, jaccard_score))
     c = max(0.0, min(1.0, cosine_score))
+    return (w_j * j) + (w_c * c)
+
+
+# Vectorised versions of jaccard() and weighted_final() for many candidates at once.
+# intersections[i] = |missing & skills_i|, skill_counts[i] = |skills_i|.
+# Uses the same float operations as the scalar functions, so results are bit-for-bit equal.
+def jaccard_many(intersections: np.ndarray, skill_counts: np.ndarray, missing_count: int) -> np.ndarray:
+    if missing_count <= 0:
+        return np.zeros(len(intersections), dtype=np.float64)
+    unions = missing_count + skill_counts - intersections
+    return intersections.astype(np.float64) / unions.astype(np.float64)
+
+
+def weighted_final_many(jaccard_scores: np.ndarray, cosine_scores: np.ndarray, w_j: float = 0.75, w_c: float = 0.25) -> np.ndarray:
+    j = np.clip(jaccard_scores, 0.0, 1.0)
+    c = np.clip(cosine_scores, 0.0, 1.0)
     return (w_j * j) + (w_c * c)
\ No newline at end of file
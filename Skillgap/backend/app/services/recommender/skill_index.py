@@ -0,0 +1,158 @@
+# app/services/recommender/skill_index.py
+# In-process inverted index over the course catalogue.
+# Maps each canonical course skill to a compact, sorted array of catalogue positions
+# (position i is the i-th course in course-id order), so candidate retrieval for a
+# set of missing skills is a union of posting lists instead of a database query.
+# The index also keeps the course rows the ranker needs, so no DB round-trip is
+# needed once it is built. It is rebuilt whenever the catalogue version changes.
+# The same skills are held as a CSR course x skill binary matrix so overlap counts
+# for every candidate can be computed with one sparse matrix-vector product.
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from scipy import sparse
+
+
+class SkillIndex:
+    def __init__(
+        self,
+        version: str,
+        rows: List[Dict[str, Any]],
+        skills: List[List[str]],
+        postings: Dict[str, np.ndarray],
+        level_positions: Optional[Dict[str, np.ndarray]],
+        grpc_text_positions: np.ndarray,
+        ambiguous_ok: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.version = version
+        self.rows = rows
+        self.skills = skills
+        self.postings = postings
+        # For each ambiguous skill, whether a match on it is trusted for each course.
+        self.ambiguous_ok = ambiguous_ok or {}
+        # None when the courses table has no level column, so level filtering is skipped.
+        self.level_positions = level_positions
+        self.grpc_text_positions = grpc_text_positions
+        self.course_ids = np.asarray([row.get("id") for row in rows], dtype=np.int64)
+
+        # Binary course x skill matrix; columns follow the sorted skill vocabulary.
+        self.skill_columns = {skill: col for col, skill in enumerate(sorted({sk for sks in skills for sk in sks}))}
+        indptr = np.zeros(len(skills) + 1, dtype=np.int64)
+        indices: List[int] = []
+        for position, course_skills in enumerate(skills):
+            indices.extend(self.skill_columns[skill] for skill in course_skills)
+            indptr[position + 1] = len(indices)
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(skills), len(self.skill_columns)),
+        )
+        # Number of distinct canonical skills per course (row sums of the matrix).
+        self.skill_counts = np.diff(indptr)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # Return the sorted catalogue positions of every course that has at least one of
+    # the missing skills, optionally restricted to the allowed (lowercase) levels.
+    # include_grpc_text keeps the old text fallback for gRPC courses whose skills miss it.
+    def candidate_positions(
+        self,
+        missing: Set[str],
+        allowed_levels: Optional[Set[str]] = None,
+        include_grpc_text: bool = False,
+    ) -> np.ndarray:
+        lists = [self.postings[skill] for skill in missing if skill in self.postings]
+        if include_grpc_text and len(self.grpc_text_positions):
+            lists.append(self.grpc_text_positions)
+
+        if not lists:
+            return np.zeros(0, dtype=np.int32)
+
+        candidates = np.unique(np.concatenate(lists))
+
+        if allowed_levels and self.level_positions is not None:
+            level_lists = [self.level_positions[lvl] for lvl in allowed_levels if lvl in self.level_positions]
+            if not level_lists:
+                return np.zeros(0, dtype=np.int32)
+            allowed = np.unique(np.concatenate(level_lists))
+            candidates = np.intersect1d(candidates, allowed, assume_unique=True)
+
+        return candidates
+
+    # Sparse indicator column vector (skills x 1) for the missing skills the catalogue knows about.
+    def missing_vector(self, missing: Set[str]) -> sparse.csr_matrix:
+        cols = sorted(self.skill_columns[skill] for skill in missing if skill in self.skill_columns)
+        return sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.float64), (np.asarray(cols, dtype=np.int64), np.zeros(len(cols), dtype=np.int64))),
+            shape=(len(self.skill_columns), 1),
+        )
+
+    # |course skills & missing| for every candidate position in one matrix-vector product.
+    def intersection_counts(self, positions: np.ndarray, missing_vec: sparse.csr_matrix) -> np.ndarray:
+        if len(positions) == 0 or missing_vec.nnz == 0:
+            return np.zeros(len(positions), dtype=np.int64)
+        counts = (self.matrix[positions] @ missing_vec).toarray().ravel()
+        return np.rint(counts).astype(np.int64)
+
+
+def _to_positions(values: Iterable[int]) -> np.ndarray:
+    return np.asarray(sorted(values), dtype=np.int32)
+
+# Build the index from course rows (already ordered by id).
+# canonical_skills turns a row's raw skills_norm value into its sorted canonical skill list,
+# so the ranker's own normalisation and synonym rules are applied once here instead of per request.
+def build_skill_index(
+    version: str,
+    rows: List[Dict[str, Any]],
+    canonical_skills: Callable[[Any], List[str]],
+    has_level_column: bool = True,
+    ambiguous_checks: Optional[Dict[str, Callable[[str, str, List[str]], bool]]] = None,
+) -> SkillIndex:
+    # ambiguous_checks maps a short, ambiguous skill (e.g. "go") to a check
+    # (course_name, description, skills) -> bool deciding whether a match on it is genuine.
+    ambiguous_checks = ambiguous_checks or {}
+    ambiguous_ok: Dict[str, List[bool]] = {skill: [] for skill in ambiguous_checks}
+
+    skills: List[List[str]] = []
+    postings: Dict[str, List[int]] = {}
+    levels: Dict[str, List[int]] = {}
+    grpc_text: List[int] = []
+
+    for position, row in enumerate(rows):
+        course_skills = canonical_skills(row.get("skills_norm"))
+        skills.append(course_skills)
+
+        # Courses with NULL skills_norm were never candidates, so only skilled rows are posted.
+        if row.get("skills_norm") is not None:
+            for skill in course_skills:
+                postings.setdefault(skill, []).append(position)
+
+        # Same comparison as the old SQL filter: lower(level) = ANY(:levels)
+        level = row.get("level")
+        if level is not None:
+            levels.setdefault(str(level).lower(), []).append(position)
+
+        course_name = str(row.get("course_name") or "")
+        description = str(row.get("description") or "")
+        if "grpc" in course_name.lower() or "remote procedure" in description.lower():
+            grpc_text.append(position)
+
+        for skill, check in ambiguous_checks.items():
+            ambiguous_ok[skill].append(bool(check(course_name, description, course_skills)))
+
+    return SkillIndex(
+        version=version,
+        rows=rows,
+        skills=skills,
+        postings={skill: _to_positions(values) for skill, values in postings.items()},
+        level_positions=(
+            {level: _to_positions(values) for level, values in levels.items()}
+            if has_level_column
+            else None
+        ),
+        grpc_text_positions=_to_positions(grpc_text),
+        ambiguous_ok={skill: np.asarray(values, dtype=bool) for skill, values in ambiguous_ok.items()},
+    )
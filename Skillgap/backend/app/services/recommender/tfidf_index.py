@@ -0,0 +1,240 @@
+# app/services/recommender/tfidf_index.py
+# Catalogue-level TF-IDF index used for the optional cosine re-ranking step.
+# The vectorizer is fitted once over every course document ("course_name. description")
+# and the resulting sparse matrix + vocabulary are saved to disk, keyed by the catalogue version.
+# At request time only the query is transformed and scored against the candidate rows
+# with a sparse dot product (rows are L2-normalised, so the dot product is the cosine).
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.catalog.catalog_version import get_catalog_version
+
+# Saved index files live next to the other app data files.
+INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "tfidf_index"
+
+# Same settings the per-request vectorizer used, so the scores stay comparable.
+VECTORIZER_PARAMS = {
+    "stop_words": "english",
+    "ngram_range": (1, 2),
+    "max_features": 50000,
+}
+
+_LOCK = Lock()
+_STATE: Dict[str, Optional["TfidfIndex"]] = {"index": None}
+
+
+class TfidfIndex:
+    def __init__(
+        self,
+        version: str,
+        terms: List[str],
+        idf: np.ndarray,
+        matrix: sparse.csr_matrix,
+        course_ids: Iterable[int],
+    ):
+        self.version = version
+        self.terms = list(terms)
+        self.vocabulary = {term: col for col, term in enumerate(self.terms)}
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.matrix = sparse.csr_matrix(matrix)
+        self.course_ids = np.asarray(list(course_ids), dtype=np.int64)
+        self.row_of = {int(cid): row for row, cid in enumerate(self.course_ids)}
+
+        # The analyzer only depends on the tokenising settings, so an unfitted vectorizer is enough.
+        # sklearn is imported here rather than at module level to keep app start-up fast.
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        params = {k: v for k, v in VECTORIZER_PARAMS.items() if k != "max_features"}
+        self._analyzer = TfidfVectorizer(**params).build_analyzer()
+
+    # Transform a query string into an L2-normalised TF-IDF row vector (1 x vocabulary).
+    # Matches TfidfVectorizer.transform with the default settings (raw counts, smooth idf, l2 norm).
+    def transform_query(self, query: str) -> sparse.csr_matrix:
+        counts: Dict[int, int] = {}
+        for term in self._analyzer(query or ""):
+            col = self.vocabulary.get(term)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+
+        width = len(self.terms)
+        if not counts:
+            return sparse.csr_matrix((1, width), dtype=np.float64)
+
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        values = values * self.idf[cols]
+
+        norm = float(np.sqrt(np.dot(values, values)))
+        if norm > 0:
+            values = values / norm
+
+        return sparse.csr_matrix(
+            (values, (np.zeros(len(cols), dtype=np.int64), cols)),
+            shape=(1, width),
+        )
+
+    # Cosine score of the query against each requested course id.
+    # Courses that are not in the index (e.g. added after it was built) score 0.0.
+    def scores(self, query: str, course_ids: List[int]) -> List[float]:
+        if not course_ids:
+            return []
+
+        q_vec = self.transform_query(query)
+        if q_vec.nnz == 0:
+            return [0.0] * len(course_ids)
+
+        rows = [self.row_of.get(int(cid), -1) for cid in course_ids]
+        known = [row for row in rows if row >= 0]
+        if not known:
+            return [0.0] * len(course_ids)
+
+        sims = (self.matrix[known] @ q_vec.T).toarray().ravel()
+        sims_iter = iter(sims)
+
+        return [float(next(sims_iter)) if row >= 0 else 0.0 for row in rows]
+
+# Fit the vectorizer once over the whole catalogue.
+def build_tfidf_index(version: str, course_ids: List[int], docs: List[str]) -> TfidfIndex:
+    if not docs:
+        return TfidfIndex(version, [], np.zeros(0), sparse.csr_matrix((0, 0)), [])
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    try:
+        matrix = vectorizer.fit_transform(docs)
+    except ValueError:
+        # Every document was empty or only stop words, so there is no vocabulary to index.
+        return TfidfIndex(version, [], np.zeros(0), sparse.csr_matrix((0, 0)), [])
+
+    terms = [""] * len(vectorizer.vocabulary_)
+    for term, col in vectorizer.vocabulary_.items():
+        terms[col] = term
+
+    return TfidfIndex(version, terms, vectorizer.idf_, matrix, course_ids)
+
+
+def _index_paths(index_dir: Path, version: str):
+    return index_dir / f"tfidf_{version}.npz", index_dir / f"tfidf_{version}.json"
+
+# Save the sparse matrix and the vocabulary/idf/id metadata for this catalogue version.
+# Files are written to a temporary name first so a crash never leaves a half-written index.
+# The temporary names include the process id, so two workers saving at once never
+# write to the same file. Finished files of older versions are removed once the new
+# one is in place; another process's temporary files are left alone.
+def save_tfidf_index(index: TfidfIndex, index_dir: Path = INDEX_DIR) -> None:
+    index_dir.mkdir(parents=True, exist_ok=True)
+    matrix_path, meta_path = _index_paths(index_dir, index.version)
+
+    tmp_matrix = matrix_path.with_name(f"{matrix_path.stem}.{os.getpid()}.tmp.npz")
+    tmp_meta = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+
+    sparse.save_npz(tmp_matrix, index.matrix)
+    tmp_meta.write_text(
+        json.dumps(
+            {
+                "version": index.version,
+                "terms": index.terms,
+                "idf": [float(x) for x in index.idf],
+                "course_ids": [int(x) for x in index.course_ids],
+            }
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_meta, meta_path)
+
+    keep = {matrix_path.name, meta_path.name}
+    for old in index_dir.glob("tfidf_*"):
+        if old.name in keep or ".tmp" in old.name or old.suffix not in (".npz", ".json"):
+            continue
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+# Load a saved index for the given catalogue version, or None if there is no usable file.
+def load_tfidf_index(version: str, index_dir: Path = INDEX_DIR) -> Optional[TfidfIndex]:
+    matrix_path, meta_path = _index_paths(index_dir, version)
+    if not matrix_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        matrix = sparse.load_npz(matrix_path).tocsr()
+    except Exception as exc:
+        print(f"Saved TF-IDF index could not be read, rebuilding: {exc}")
+        return None
+
+    if meta.get("version") != version:
+        return None
+    if matrix.shape != (len(meta["course_ids"]), len(meta["terms"])):
+        return None
+
+    return TfidfIndex(version, meta["terms"], np.asarray(meta["idf"]), matrix, meta["course_ids"])
+
+# Read every course document in the same "name. description" form the ranker uses.
+def _load_course_documents(db: Session, table: str = "courses"):
+    rows = db.execute(
+        text(f"SELECT id, course_name, description FROM {table} ORDER BY id")
+    ).mappings().all()
+
+    course_ids = [int(row["id"]) for row in rows]
+    docs = [f"{row.get('course_name') or ''}. {row.get('description') or ''}" for row in rows]
+    return course_ids, docs
+
+# Build and save the index for a catalogue version that is not live yet (a shadow table).
+def prebuild_tfidf_index(db: Session, version: str, table: str) -> TfidfIndex:
+    index = load_tfidf_index(version)
+    if index is None:
+        course_ids, docs = _load_course_documents(db, table)
+        index = build_tfidf_index(version, course_ids, docs)
+        try:
+            save_tfidf_index(index)
+        except OSError as exc:
+            print(f"TF-IDF index could not be saved: {exc}")
+    return index
+
+# Make a prebuilt index the in-memory copy.
+def install_tfidf_index(index: TfidfIndex) -> None:
+    with _LOCK:
+        _STATE["index"] = index
+
+# Return the index for the current catalogue version.
+# Order of preference: in-memory copy, saved file on disk, fresh build (which is then saved).
+def get_tfidf_index(db: Session) -> TfidfIndex:
+    version = get_catalog_version(db)
+
+    index = _STATE["index"]
+    if index is not None and index.version == version:
+        return index
+
+    with _LOCK:
+        index = _STATE["index"]
+        if index is not None and index.version == version:
+            return index
+
+        index = load_tfidf_index(version)
+        if index is None:
+            course_ids, docs = _load_course_documents(db)
+            index = build_tfidf_index(version, course_ids, docs)
+            try:
+                save_tfidf_index(index)
+            except OSError as exc:
+                # A read-only data folder should not stop recommendations from working.
+                print(f"TF-IDF index could not be saved: {exc}")
+
+        _STATE["index"] = index
+
+    return index
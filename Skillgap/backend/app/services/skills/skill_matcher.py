@@ -0,0 +1,151 @@
+# skill_matcher.py
+# Dictionary skill matching without spaCy.
+# Skill extraction only needs exact, case-insensitive, word-boundary matches of the
+# taxonomy phrases, so the phrases are compiled once into an Aho-Corasick automaton
+# and each text is scanned in a single pass, whatever the taxonomy size.
+#
+# Match policies:
+#   all      every boundary-valid match, overlaps included (same as the PhraseMatcher)
+#   longest  leftmost-longest, non-overlapping matches ("machine learning", not "learning")
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+POLICIES = ("all", "longest")
+
+# Texts are split into word tokens and single punctuation tokens; whitespace only separates.
+# A word is a run of word characters, with '+' and '#' included so "c++" and "c#" stay
+# whole, and dots between word characters kept inside the word ("node.js", "asp.net",
+# ".net"). Matching whole tokens is what gives the word-boundary rule: "java" never
+# matches inside "javascript" and "net" never matches inside ".net".
+_TOKEN_RE = re.compile(r"\.?[\w+#]+(?:\.[\w+#]+)*|[^\w\s+#]")
+
+
+def normalise_phrase(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").lower()).strip()
+
+
+def tokenise(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+class SkillMatcher:
+    def __init__(self, phrases: Iterable[str], policy: str = "all"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown match policy {policy!r}; expected one of {', '.join(POLICIES)}")
+
+        self.policy = policy
+        self.phrases: List[str] = sorted({p for p in (normalise_phrase(str(x)) for x in phrases) if p})
+
+        # Automaton state i: outgoing edges (keyed by token), failure link and the
+        # (length in tokens, phrase) of every phrase that ends here.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[int, str], ...]] = [()]
+
+        for phrase in self.phrases:
+            self._add(phrase, tokenise(phrase))
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def _add(self, phrase: str, tokens: List[str]) -> None:
+        if not tokens:
+            return
+
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        # Phrases that differ only in spacing around punctuation ("tcp/ip", "tcp / ip")
+        # share a state; the first one (in sorted order) is reported.
+        if not self._out[state]:
+            self._out[state] = ((len(tokens), phrase),)
+
+    # Breadth-first pass that sets failure links and merges the outputs of each
+    # state's failure chain, so a scan never has to walk the chain to report matches.
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state == 0:
+                    continue
+
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(token, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    # Every match as (first token, end token, phrase), in order of end token.
+    def _scan(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+
+        matches: List[Tuple[int, int, str]] = []
+        state = 0
+        for i, token in enumerate(tokens):
+            edges = goto[state]
+            while token not in edges and state:
+                state = fail[state]
+                edges = goto[state]
+            state = edges.get(token, 0)
+
+            for length, phrase in out[state]:
+                matches.append((i - length + 1, i + 1, phrase))
+
+        return matches
+
+    # Apply the match policy; the result is ordered by first token.
+    def _select(self, matches: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+        if self.policy != "longest":
+            return sorted(matches)
+
+        selected: List[Tuple[int, int, str]] = []
+        covered_to = 0
+        for start, end, phrase in sorted(matches, key=lambda match: (match[0], -match[1])):
+            if start >= covered_to:
+                selected.append((start, end, phrase))
+                covered_to = end
+        return selected
+
+    # Sorted unique taxonomy phrases found in the text.
+    def find(self, text: str) -> List[str]:
+        matches = self._scan(tokenise(normalise_phrase(text)))
+        if self.policy != "all":
+            matches = self._select(matches)
+        return sorted({phrase for _, _, phrase in matches})
+
+    # Matched spans as (start, end, phrase), with character offsets into the normalised
+    # text, under this matcher's policy and ordered by start.
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        normalised = normalise_phrase(text)
+        tokens = list(_TOKEN_RE.finditer(normalised))
+        matches = self._select(self._scan([token.group() for token in tokens]))
+        return [(tokens[start].start(), tokens[end - 1].end(), phrase) for start, end, phrase in matches]
+
+    # True when the text contains at least `minimum` distinct phrases.
+    def contains(self, text: str, minimum: int = 1) -> bool:
+        return len(self.find(text)) >= minimum
+
+
+def build_skill_matcher(phrases: Iterable[str], policy: str = "all") -> SkillMatcher:
+    return SkillMatcher(phrases, policy=policy)
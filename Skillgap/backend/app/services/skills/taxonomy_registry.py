@@ -0,0 +1,212 @@
+# taxonomy_registry.py
+# Loaded skill taxonomies and their matchers, keyed by taxonomy name.
+# Each taxonomy gets a version id derived from its cleaned skill list, so the same
+# file always has the same version and any edit to it gives a new one.
+# A reload builds the new matcher while requests keep using the old one, then swaps
+# it in under the lock; callers that hold a LoadedTaxonomy keep a consistent
+# (skills, matcher, version) for the whole request.
+# The taxonomy files can be watched (mtime polling), so a rebuilt
+# skill_taxonomy_it_active.json is picked up without restarting the backend.
+#
+# Configuration (environment):
+#   SKILLGAP_TAXONOMY_WATCH_SECONDS=30   how often to check the files for changes (0 disables)
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+DEFAULT_TAXONOMY = "active"
+TAXONOMY_FILES: Dict[str, Path] = {
+    "active": DATA_DIR / "skill_taxonomy_it_active.json",
+    "unfiltered": DATA_DIR / "original_unfiltered_skill_taxonomy_it.json",
+}
+
+WATCH_INTERVAL_SECONDS = float(os.getenv("SKILLGAP_TAXONOMY_WATCH_SECONDS", "30"))
+
+_LOCK = Lock()
+# Serialises builds so two reloads of the same file never run side by side.
+_BUILD_LOCK = Lock()
+_STATE: Dict[str, "LoadedTaxonomy"] = {}
+# name -> (file mtime, version) for taxonomies this process has not built.
+_FILE_VERSIONS: Dict[str, Tuple[Optional[float], str]] = {}
+_WATCHER: Dict[str, Optional[threading.Thread]] = {"thread": None}
+
+
+class LoadedTaxonomy:
+    def __init__(self, name: str, path: Path, skills: List[str], matcher: Any, mtime: Optional[float]):
+        self.name = name
+        self.path = path
+        self.skills = skills
+        self.matcher = matcher
+        self.version = taxonomy_version(name, skills)
+        # File modification time the taxonomy was read at; the watcher compares against it.
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "file": str(self.path),
+            "version": self.version,
+            "skills": len(self.skills),
+            "loaded_at": self.loaded_at,
+        }
+
+# name + short sha256 of the cleaned skill list, e.g. "active-3f9a0c2b71de".
+def taxonomy_version(name: str, skills: List[str]) -> str:
+    digest = hashlib.sha256("\n".join(skills).encode("utf-8")).hexdigest()
+    return f"{name}-{digest[:12]}"
+
+# Read a taxonomy file: lowercase + unique + longest-first, which helps overlap
+# behaviour ('machine learning' before 'learning').
+def read_taxonomy_file(path: Path) -> List[str]:
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No taxonomy file found. Expected:\n"
+            f" - {path}\n"
+            f"Make sure you generated skill_taxonomy_it_active.json (and optionally the active version)."
+        )
+    skills = json.loads(path.read_text(encoding="utf-8"))
+    return sorted({str(s).strip().lower() for s in skills if s and str(s).strip()}, key=len, reverse=True)
+
+
+def _taxonomy_path(name: str) -> Path:
+    path = TAXONOMY_FILES.get(name)
+    if path is None:
+        raise KeyError(f"Unknown taxonomy {name!r}; expected one of {', '.join(sorted(TAXONOMY_FILES))}")
+    return path
+
+
+def _file_mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _build(name: str) -> LoadedTaxonomy:
+    # Imported here because entity_extraction imports this module.
+    from app.services.entity_extraction import build_taxonomy_matcher
+
+    path = _taxonomy_path(name)
+    mtime = _file_mtime(path)
+    skills = read_taxonomy_file(path)
+    return LoadedTaxonomy(name, path, skills, build_taxonomy_matcher(skills), mtime)
+
+# Return the loaded taxonomy, building it the first time it is asked for.
+def get_taxonomy(name: str = DEFAULT_TAXONOMY) -> LoadedTaxonomy:
+    loaded = _STATE.get(name)
+    if loaded is not None:
+        return loaded
+
+    with _BUILD_LOCK:
+        loaded = _STATE.get(name)
+        if loaded is None:
+            loaded = _build(name)
+            with _LOCK:
+                _STATE[name] = loaded
+    return loaded
+
+# Version of a taxonomy without building its matcher (so without loading spaCy): the
+# loaded one if this process has it, otherwise hashed from the file and cached until the
+# file changes. Lets the API process key the document cache and tell workers which
+# version to serve while only the analysis workers build matchers.
+def current_taxonomy_version(name: str = DEFAULT_TAXONOMY) -> str:
+    loaded = _STATE.get(name)
+    if loaded is not None:
+        return loaded.version
+
+    path = _taxonomy_path(name)
+    mtime = _file_mtime(path)
+    with _LOCK:
+        cached = _FILE_VERSIONS.get(name)
+    if cached is not None and mtime is not None and cached[0] == mtime:
+        return cached[1]
+
+    version = taxonomy_version(name, read_taxonomy_file(path))
+    with _LOCK:
+        _FILE_VERSIONS[name] = (mtime, version)
+    return version
+
+# Re-read one taxonomy (or every loaded one) and swap in a new matcher if its
+# content changed. The old matcher stays in use until the new one is ready, and
+# stays in place if the rebuild fails.
+def reload_taxonomy(name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        names = [name] if name is not None else (list(_STATE) or [DEFAULT_TAXONOMY])
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for taxonomy_name in names:
+        _taxonomy_path(taxonomy_name)
+        started = time.perf_counter()
+        with _BUILD_LOCK:
+            previous = _STATE.get(taxonomy_name)
+            try:
+                loaded = _build(taxonomy_name)
+            except Exception as exc:
+                print(f"Taxonomy reload failed for {taxonomy_name}: {exc}")
+                report[taxonomy_name] = {
+                    "changed": False,
+                    "version": previous.version if previous else None,
+                    "error": str(exc),
+                }
+                continue
+
+            changed = previous is None or previous.version != loaded.version
+            with _LOCK:
+                if changed:
+                    _STATE[taxonomy_name] = loaded
+                else:
+                    # Same content (e.g. the file was only touched): keep the old matcher.
+                    previous.mtime = loaded.mtime
+
+        report[taxonomy_name] = {
+            "changed": changed,
+            "version": loaded.version,
+            "previous_version": previous.version if previous else None,
+            "skills": len(loaded.skills),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        if changed:
+            print(f"Taxonomy {taxonomy_name} is now version {loaded.version} ({len(loaded.skills)} skills)")
+
+    return report
+
+# Name -> version details of every loaded taxonomy.
+def loaded_taxonomies() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        return {name: loaded.describe() for name, loaded in _STATE.items()}
+
+
+def _watch_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        with _LOCK:
+            loaded = list(_STATE.values())
+        for taxonomy in loaded:
+            mtime = _file_mtime(taxonomy.path)
+            if mtime is not None and mtime != taxonomy.mtime:
+                reload_taxonomy(taxonomy.name)
+
+# Start the background thread that reloads loaded taxonomies whose file changed.
+# Returns False when watching is disabled or the thread is already running.
+def start_taxonomy_watcher(interval: float = WATCH_INTERVAL_SECONDS) -> bool:
+    if interval <= 0:
+        return False
+
+    with _LOCK:
+        if _WATCHER["thread"] is not None:
+            return False
+        thread = threading.Thread(target=_watch_loop, args=(interval,), name="taxonomy-watcher", daemon=True)
+        _WATCHER["thread"] = thread
+    thread.start()
+    return True
@@ -9,10 +9,15 @@
 #   trim whitespace
 #   de-duplicate consecutive lines
 
+import os
 import re
+import zipfile
+from io import BytesIO
+from typing import Any, Dict, List, Tuple, Union
+
 from fastapi import HTTPException, UploadFile
 
-from app.utils.pdf_utils import extract_pdf_text
+from app.utils.pdf_utils import extract_pdf_pages
 from app.utils.docx_utils import extract_docx_text
 
 
@@ -78,23 +83,77 @@ def clean_extracted_text(raw_text: str) -> str:
 
     return text
 
+# Limits for zip archives sent to the batch endpoint (guards against zip bombs).
+ZIP_MAX_DOCUMENTS = 500
+ZIP_MAX_UNCOMPRESSED_BYTES = 200 * 1024 * 1024
+
 # High-level function used by FastAPI endpoint.
 def extract_text_from_upload(file: UploadFile, file_bytes: bytes) -> str:
+    return extract_text_from_bytes(file.filename, file.content_type, file_bytes)
+
+# Same as extract_text_from_upload, for documents that do not arrive as an UploadFile
+# (e.g. members of a zip archive, or a spooled upload given by path).
+def extract_text_from_bytes(filename: str, content_type: str, source: Union[bytes, str]) -> str:
+    cleaned_text, _ = extract_text_details(filename, content_type, source)
+    return cleaned_text
+
+# Same as extract_text_from_bytes, but also returns details of the extraction:
+# {"truncated": bool} plus, for PDFs, the page counts and why the text was cut short
+# (the page or time budget in pdf_utils).
+def extract_text_details(filename: str, content_type: str, source: Union[bytes, str]) -> Tuple[str, Dict[str, Any]]:
 # Determines file type from filename/content type
 # Routes to the correct extractor while cleaning the file
-    filename = file.filename.lower() if file.filename else ""
-    content_type = (file.content_type or "").lower()
+    filename = filename.lower() if filename else ""
+    content_type = (content_type or "").lower()
 
     # Decide based on extension first, 
     # if not a valid extension, display error message.
     if filename.endswith(".pdf") or "pdf" in content_type:
-        raw_text = extract_pdf_text(file_bytes)
+        pdf = extract_pdf_pages(source)
+        raw_text = pdf.text
+        details: Dict[str, Any] = {
+            "truncated": pdf.truncated,
+            "truncation_reason": pdf.reason,
+            "page_count": pdf.page_count,
+            "pages_extracted": pdf.pages_extracted,
+        }
     elif filename.endswith(".docx") or "officedocument" in content_type:
-        raw_text = extract_docx_text(file_bytes)
+        raw_text = extract_docx_text(source)
+        details = {"truncated": False}
     else:
         raise HTTPException(
             status_code=400,
             detail="Unsupported file type. Please upload a PDF or DOCX file."
         )
     cleaned_text = clean_extracted_text(raw_text)
-    return cleaned_text
\ No newline at end of file
+    return cleaned_text, details
+
+def is_zip_upload(filename: str, content_type: str) -> bool:
+    return (filename or "").lower().endswith(".zip") or "zip" in (content_type or "").lower()
+
+# Unpack the PDF/DOCX documents of a zip archive (bytes or a file path) as (member name, bytes).
+# Other members (folders, images, OS metadata files) are ignored.
+def read_zip_documents(source: Union[bytes, str]) -> List[Tuple[str, bytes]]:
+    try:
+        archive = zipfile.ZipFile(source if isinstance(source, (str, os.PathLike)) else BytesIO(source))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="The uploaded archive is not a valid zip file.")
+
+    with archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and info.filename.lower().endswith((".pdf", ".docx"))
+        ]
+
+        if len(members) > ZIP_MAX_DOCUMENTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many documents in the archive (limit {ZIP_MAX_DOCUMENTS}).",
+            )
+        if sum(info.file_size for info in members) > ZIP_MAX_UNCOMPRESSED_BYTES:
+            raise HTTPException(status_code=400, detail="The archive is too large once uncompressed.")
+
+        return [(info.filename, archive.read(info)) for info in members]
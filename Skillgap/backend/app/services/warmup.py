@@ -0,0 +1,130 @@
+# warmup.py
+# Warm-up stage run at boot, before /ready reports the app as ready.
+# Without it the first requests after a deploy pay for building the taxonomy
+# PhraseMatcher, the first spaCy pipeline call, the ranker indexes and sklearn's
+# first TF-IDF fit, which shows up as a p99 spike on every rollout.
+# Each step is timed and reported through the readiness endpoint.
+# With the analysis process pool (SKILLGAP_ANALYSIS_WORKERS > 0) documents are analysed
+# in the pool workers, so the taxonomy and extraction steps warm those workers; this
+# process only reads the taxonomy version. Without the pool they warm this process.
+#
+# Configuration (environment):
+#   SKILLGAP_WARMUP=0                      skip the warm-up entirely (everything builds lazily)
+#   SKILLGAP_WARMUP_STEPS=taxonomy,ranker  only run the listed steps
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.analysis_pool import ANALYSIS_WORKERS, warm_analysis_workers
+from app.services.entity_extraction import extract_entities, load_skill_matcher
+from app.services.readiness import mark_failed, mark_ready, mark_running, record_warmup_step
+from app.services.recommender.course_ranker import rank_courses_for_missing, warm_ranker_indexes
+from app.services.recommender.scoring import tfidf_cosine_scores
+from app.services.skills.taxonomy_registry import current_taxonomy_version
+
+ALL_STEPS = ["taxonomy", "extraction", "ranker", "scoring"]
+
+WARMUP_ENABLED = os.getenv("SKILLGAP_WARMUP", "1").strip().lower() not in {"0", "false", "no", "off"}
+WARMUP_STEPS = [
+    step.strip().lower()
+    for step in os.getenv("SKILLGAP_WARMUP_STEPS", ",".join(ALL_STEPS)).split(",")
+    if step.strip()
+]
+
+# Short synthetic CV that touches the taxonomy matcher and the other entity patterns.
+SYNTHETIC_CV = (
+    "Software developer with 3 years experience building REST APIs in Python and Java. "
+    "Experience with Docker, Kubernetes, PostgreSQL and CI/CD pipelines on AWS. "
+    "BSc degree in Computer Science. Strong communication and teamwork skills."
+)
+SYNTHETIC_GAP = ["python", "docker", "kubernetes", "sql"]
+
+
+def _warm_taxonomy(db: Session) -> Dict[str, Any]:
+    if ANALYSIS_WORKERS > 0:
+        # The workers build the matcher in _init_worker; the API process only needs the version.
+        return {"version": current_taxonomy_version()}
+    return {"skills": load_skill_matcher()}
+
+
+def _warm_extraction(db: Session) -> Dict[str, Any]:
+    # Waits for every pool worker to finish starting, then runs the synthetic CV in each.
+    warmed = warm_analysis_workers(SYNTHETIC_CV)
+    if warmed is not None:
+        return warmed
+    result = extract_entities(SYNTHETIC_CV)
+    return {"entities": len(result["unique_entities"])}
+
+
+def _warm_ranker(db: Session) -> Dict[str, Any]:
+    warm_ranker_indexes(db)
+    # One full ranking pass so the scoring code paths are exercised too.
+    # It bypasses the result cache so the synthetic gap does not show up in its stats.
+    recommendations = rank_courses_for_missing(db, SYNTHETIC_GAP, top_n=5, use_cache=False)
+    return {"recommendations": len(recommendations)}
+
+
+def _warm_scoring(db: Session) -> Dict[str, Any]:
+    # First TF-IDF fit (the fallback cosine path) pays for sklearn's lazy imports.
+    tfidf_cosine_scores("python docker", ["python course", "docker course"])
+    return {}
+
+
+# (step, readiness component it belongs to, step function)
+STEPS: List[Tuple[str, str, Callable[[Session], Dict[str, Any]]]] = [
+    ("taxonomy", "taxonomy", _warm_taxonomy),
+    ("extraction", "taxonomy", _warm_extraction),
+    ("ranker", "ranker", _warm_ranker),
+    ("scoring", "ranker", _warm_scoring),
+]
+
+# Run the enabled warm-up steps in order and record per-step timings.
+# A component is marked ready once all of its steps have run; if any of them fails
+# it is marked failed. Components whose steps are all disabled are marked ready
+# straight away, since their data is then simply built on first use.
+def run_warmup(db: Session) -> Dict[str, Dict[str, Any]]:
+    enabled = set(WARMUP_STEPS) if WARMUP_ENABLED else set()
+    report: Dict[str, Dict[str, Any]] = {}
+
+    components: Dict[str, List[Tuple[str, Callable[[Session], Dict[str, Any]]]]] = {}
+    for step, component, fn in STEPS:
+        components.setdefault(component, []).append((step, fn))
+
+    for component, steps in components.items():
+        to_run = [(step, fn) for step, fn in steps if step in enabled]
+        if not to_run:
+            mark_ready(component, warmed=False)
+            continue
+
+        mark_running(component)
+        errors: List[str] = []
+        for step, fn in to_run:
+            started = time.perf_counter()
+            try:
+                details = fn(db)
+                entry = {"status": "ok", **details}
+            except Exception as exc:
+                db.rollback()
+                entry = {"status": "failed", "error": str(exc)}
+                errors.append(f"{step}: {exc}")
+                print(f"Warm-up step '{step}' failed: {exc}")
+
+            entry["seconds"] = round(time.perf_counter() - started, 3)
+            report[step] = entry
+            record_warmup_step(step, **entry)
+
+        if errors:
+            mark_failed(component, "; ".join(errors))
+        else:
+            mark_ready(component, warmed=True)
+
+    for step in ALL_STEPS:
+        if step not in report:
+            record_warmup_step(step, status="skipped")
+
+    return report
@@ -2,14 +2,19 @@
 # A Utility functions file used to extract text from DOCX files (Word documents).
 # Reads all paragraphs and Joins with newlines
 
+import os
 from io import BytesIO
-from docx import Document
+from typing import Union
 
-def extract_docx_text(file_bytes: bytes) -> str:
-# Extracts text from a DOCX file given as raw bytes.
-# file_bytes will read the file content from UploadFile.read()
+def extract_docx_text(source: Union[bytes, str]) -> str:
+# Extracts text from a DOCX file given as raw bytes or a file path.
+# source will be the spooled upload (see upload_utils.py)
 # return will output the extracted raw text as a string
-    docx_file = BytesIO(file_bytes)
+    # python-docx is only needed for .docx uploads, so it is imported here.
+    from docx import Document
+
+    # A path is opened directly; bytes are wrapped in BytesIO
+    docx_file = source if isinstance(source, (str, os.PathLike)) else BytesIO(source)
     document = Document(docx_file)
 
     paragraphs = [p.text for p in document.paragraphs if p.text.strip()]
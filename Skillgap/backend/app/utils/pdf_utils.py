@@ -1,19 +1,204 @@
 # pdf_utils.py
 # A Utility functions file used to extract and clean text from PDF files only, using pdfplumber.
+# Pages are read in a process pool (long PDFs split across its workers), and every
+# extraction runs under a page-count and wall-clock budget so a pathological PDF cannot
+# tie up a worker indefinitely: page ranges still running at the deadline have their
+# worker processes terminated. When a budget is hit the text of the pages read so far
+# is returned with truncated=True.
+# With PDF_EXTRACTION_WORKERS=0 pages are read in the calling process instead; the
+# budget is then only checked between pages, so one slow page can overrun it.
+# Terminating a pool also fails any other document using it at that moment (with
+# BrokenProcessPool, a retryable 503); inside an analysis worker the pool only ever
+# serves one document.
+# A page worker that dies (out of memory, a crash in the parser) breaks the pool; it is
+# dropped so the next document starts a fresh one, and BrokenProcessPool is raised.
+# Page workers are started with "spawn": the pool is created inside processes that
+# are already running threads, where a forked child could inherit a held lock.
+#
+# Configuration (environment):
+#   PDF_EXTRACTION_WORKERS=2          page worker processes (0 reads pages in this process)
+#   PDF_PARALLEL_MIN_PAGES=8          documents shorter than this are read as one range by one worker
+#   PDF_MAX_PAGES=50                  pages read per document (0 for no limit)
+#   PDF_TIME_BUDGET_SECONDS=20        wall-clock budget per document (0 for no limit)
 
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-import pdfplumber
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Union
 
-def extract_pdf_text(file_bytes: bytes) -> str:
-# Extracts text from a PDF file given as raw bytes.
-# file_bytes will read the file content from UploadFile.read()
-# return will output the extracted raw text as a string
-    text_chunks = []
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "2"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "20"))
+
+# Page ranges handed to the pool per worker; smaller ranges mean more of the text
+# survives when the time budget runs out.
+CHUNKS_PER_WORKER = 2
+
+_LOCK = Lock()
+_POOL: Dict[str, Optional[ProcessPoolExecutor]] = {"executor": None}
+
+
+class PdfExtraction(NamedTuple):
+    text: str
+    page_count: int
+    pages_extracted: int
+    truncated: bool
+    # "max_pages" or "time_budget" when truncated, otherwise None.
+    reason: Optional[str]
+
+
+# source is the PDF bytes or the path of a file holding them (a spooled upload).
+def _open_pdf(source: Union[bytes, str]):
+    # pdfplumber is slow to import, so it is only loaded once a PDF actually needs parsing.
+    import pdfplumber
+
+    # A path is opened directly, so the file is read page by page rather than loaded whole.
+    if isinstance(source, (str, os.PathLike)):
+        return pdfplumber.open(source)
     # pdfplumber works with file-like objects, so wrap bytes in BytesIO
-    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text() or ""
-            text_chunks.append(page_text)
+    return pdfplumber.open(BytesIO(source))
+
+# Extract the text of pages [start, end). Module-level so it can run in a worker process;
+# each worker opens its own copy of the document since pdfplumber pages cannot be pickled.
+# Passing a path rather than bytes means the document is not copied to every worker.
+def _extract_page_range(source: Union[bytes, str], start: int, end: int) -> List[str]:
+    with _open_pdf(source) as pdf:
+        return [(pdf.pages[number].extract_text() or "") for number in range(start, end)]
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    with _LOCK:
+        if _POOL["executor"] is None:
+            _POOL["executor"] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL["executor"]
+
+# Forget a broken pool so the next document gets a new one.
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    with _LOCK:
+        if _POOL["executor"] is not executor:
+            return
+        _POOL["executor"] = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+# Stop a pool whose workers are still busy past the deadline. A running page range
+# cannot be cancelled, so its process is terminated; the next document gets a new pool.
+def _kill_executor(executor: ProcessPoolExecutor) -> None:
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    _discard_executor(executor)
+    for process in processes:
+        process.terminate()
+
 
-    full_text = "\n\n".join(text_chunks)
-    return full_text
\ No newline at end of file
+def _extract_serial(source: Union[bytes, str], page_limit: int, deadline: Optional[float]) -> List[str]:
+    text_chunks: List[str] = []
+    with _open_pdf(source) as pdf:
+        for page in pdf.pages[:page_limit]:
+            # A single slow page cannot be interrupted here; the budget is checked between pages
+            # (the pool path is the one that enforces it).
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            text_chunks.append(page.extract_text() or "")
+    return text_chunks
+
+# Read the page ranges in the pool and reassemble them in page order.
+# split=False reads the document as one range (short documents), which still puts it
+# in a worker that can be stopped at the deadline.
+# Stops at the deadline: ranges not started by then are cancelled, the workers of
+# ranges still running are terminated, and only the contiguous run of pages from
+# page 1 is kept.
+def _extract_pooled(
+    source: Union[bytes, str],
+    page_limit: int,
+    deadline: Optional[float],
+    workers: int,
+    split: bool = True,
+) -> List[str]:
+    if split:
+        chunk_size = max(1, -(-page_limit // (workers * CHUNKS_PER_WORKER)))
+    else:
+        chunk_size = max(1, page_limit)
+    executor = _get_executor(workers)
+
+    results: Dict[int, List[str]] = {}
+    try:
+        futures: Dict[Future, int] = {}
+        for start in range(0, page_limit, chunk_size):
+            end = min(page_limit, start + chunk_size)
+            futures[executor.submit(_extract_page_range, source, start, end)] = start
+
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if not done:
+                # Deadline reached.
+                running = [future for future in pending if not future.cancel()]
+                if running:
+                    _kill_executor(executor)
+                break
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+
+    text_chunks: List[str] = []
+    for start in range(0, page_limit, chunk_size):
+        if start not in results:
+            break
+        text_chunks.extend(results[start])
+    return text_chunks
+
+
+def extract_pdf_pages(
+    source: Union[bytes, str],
+    max_pages: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    workers: Optional[int] = None,
+) -> PdfExtraction:
+# Extracts text from a PDF file given as raw bytes or a file path, page by page, within the page and time budgets.
+# max_pages / time_budget / workers default to the PDF_* settings; 0 means no limit (or in-process for workers).
+# return is a PdfExtraction with the page texts joined in page order
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    time_budget = PDF_TIME_BUDGET_SECONDS if time_budget is None else time_budget
+    workers = PDF_EXTRACTION_WORKERS if workers is None else workers
+
+    deadline = time.monotonic() + time_budget if time_budget > 0 else None
+
+    with _open_pdf(source) as pdf:
+        page_count = len(pdf.pages)
+    page_limit = min(page_count, max_pages) if max_pages > 0 else page_count
+
+    if workers > 0:
+        text_chunks = _extract_pooled(source, page_limit, deadline, workers, split=page_limit >= PDF_PARALLEL_MIN_PAGES)
+    else:
+        text_chunks = _extract_serial(source, page_limit, deadline)
+
+    reason = None
+    if len(text_chunks) < page_limit:
+        reason = "time_budget"
+    elif page_limit < page_count:
+        reason = "max_pages"
+
+    return PdfExtraction(
+        text="\n\n".join(text_chunks),
+        page_count=page_count,
+        pages_extracted=len(text_chunks),
+        truncated=reason is not None,
+        reason=reason,
+    )
+
+
+def extract_pdf_text(source: Union[bytes, str]) -> str:
+# Extracts text from a PDF file given as raw bytes or a file path.
+# source will be the spooled upload (see upload_utils.py)
+# return will output the extracted raw text as a string
+    return extract_pdf_pages(source).text
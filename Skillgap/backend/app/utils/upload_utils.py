@@ -0,0 +1,166 @@
+# upload_utils.py
+# Upload handling for CV/JD files without holding whole files in memory.
+# Starlette has already spooled the multipart body by the time an endpoint runs, so
+# oversized requests are refused earlier, from the Content-Length header, by
+# reject_oversized_request (used as HTTP middleware in main.py).
+# Endpoints then read Starlette's spooled file directly (spool_upload), hashing it in
+# the same pass: small files are kept as bytes, and nothing else is copied.
+# Large files are the one exception. Starlette rolls them over to an unnamed temporary
+# file, but the process pools need a path they can open, so those files are streamed
+# once into a named temporary file, and that path is handed to pdfplumber / python-docx
+# instead of the bytes.
+# Uploads past the size cap are rejected before anything is read (from the spooled
+# size), and while reading if the file turns out longer.
+#
+# Configuration (environment):
+#   SKILLGAP_MAX_UPLOAD_MB=20                 largest single CV/JD file
+#   SKILLGAP_MAX_BATCH_UPLOAD_MB=200          largest request to the batch extraction endpoint
+#   SKILLGAP_UPLOAD_SPOOL_MEMORY_KB=1024      uploads up to this size are kept in memory
+#   SKILLGAP_UPLOAD_SPOOL_DIR=...             where larger uploads are spooled (default: system temp dir)
+
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+MAX_UPLOAD_BYTES = int(float(os.getenv("SKILLGAP_MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+MAX_BATCH_UPLOAD_BYTES = int(float(os.getenv("SKILLGAP_MAX_BATCH_UPLOAD_MB", "200")) * 1024 * 1024)
+SPOOL_MEMORY_BYTES = int(float(os.getenv("SKILLGAP_UPLOAD_SPOOL_MEMORY_KB", "1024")) * 1024)
+SPOOL_DIR = os.getenv("SKILLGAP_UPLOAD_SPOOL_DIR") or None
+
+# Size of each read from the upload.
+CHUNK_BYTES = 1024 * 1024
+# Allowance for multipart boundaries and part headers on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Request paths that accept many documents (and zip archives) in one request.
+BATCH_UPLOAD_PATHS = {"/extract-entities/batch"}
+
+# What the extractors accept: the document bytes or the path of a file holding them.
+DocumentSource = Union[bytes, str]
+
+
+def _too_large(limit: int) -> str:
+    return f"Upload is too large (limit {limit // (1024 * 1024)} MB)."
+
+# Middleware: answer 413 for a multipart request whose declared Content-Length is
+# over the limit, before any of the body is read. Requests without the header
+# (chunked uploads) are still capped while spooling.
+async def reject_oversized_request(request: Request, call_next):
+    declared = request.headers.get("content-length")
+    if request.method == "POST" and declared and declared.isdigit():
+        limit = MAX_BATCH_UPLOAD_BYTES if request.url.path in BATCH_UPLOAD_PATHS else MAX_UPLOAD_BYTES
+        if int(declared) > limit + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": _too_large(limit)})
+    return await call_next(request)
+
+
+class SpooledUpload:
+    def __init__(self, filename: str, content_type: str):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        # Set for uploads over SPOOL_MEMORY_BYTES, which are read into a named file.
+        self.path: Optional[str] = None
+        self._data = b""
+        self._sha256 = ""
+
+    # Read the whole of file (from its start) into memory, or into a new named file when
+    # to_disk is set, hashing it on the way. Blocking; spool_upload runs it in a thread.
+    def _read_from(self, file: BinaryIO, max_bytes: int, to_disk: bool) -> None:
+        digest = hashlib.sha256()
+        chunks: List[bytes] = []
+        handle: Optional[BinaryIO] = None
+        if to_disk:
+            suffix = Path(self.filename or "").suffix
+            handle = tempfile.NamedTemporaryFile(prefix="skillgap-upload-", suffix=suffix, dir=SPOOL_DIR, delete=False)
+            self.path = handle.name
+
+        file.seek(0)
+        try:
+            while True:
+                chunk = file.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                self.size += len(chunk)
+                if self.size > max_bytes:
+                    raise HTTPException(status_code=413, detail=_too_large(max_bytes))
+                digest.update(chunk)
+                if handle is not None:
+                    handle.write(chunk)
+                else:
+                    chunks.append(chunk)
+        finally:
+            if handle is not None:
+                handle.close()
+
+        self._data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        self._sha256 = digest.hexdigest()
+
+    # SHA-256 of the upload, computed while it was read.
+    def sha256(self) -> str:
+        return self._sha256
+
+    # The bytes (small uploads) or the spool file path (large ones), for the extractors.
+    def source(self) -> DocumentSource:
+        if self.path is not None:
+            return self.path
+        return self._data
+
+    def open(self) -> BinaryIO:
+        if self.path is not None:
+            return open(self.path, "rb")
+        return BytesIO(self.source())
+
+    def close(self) -> None:
+        self._data = b""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+# Read an UploadFile's spooled file into a SpooledUpload in CHUNK_BYTES reads.
+# Raises a 413 HTTPException without reading anything when the spooled size is over
+# max_bytes, and otherwise as soon as more than max_bytes have been read.
+# The caller closes the result (or uses it as a context manager) to remove the spool file.
+async def spool_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledUpload:
+    size = upload_size(upload)
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail=_too_large(max_bytes))
+
+    spooled = SpooledUpload(upload.filename, upload.content_type)
+    try:
+        if size > SPOOL_MEMORY_BYTES:
+            # Starlette's copy is on disk too, so the reads and writes go to a worker
+            # thread rather than blocking the event loop.
+            await run_in_threadpool(spooled._read_from, upload.file, max_bytes, True)
+        else:
+            spooled._read_from(upload.file, max_bytes, False)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
+
+# Size of an upload without reading it: seek to the end of Starlette's spool file.
+def upload_size(upload: UploadFile) -> int:
+    if getattr(upload, "size", None) is not None:
+        return upload.size
+    position = upload.file.tell()
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(position)
+    return size
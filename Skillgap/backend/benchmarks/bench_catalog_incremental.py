@@ -0,0 +1,99 @@
+# bench_catalog_incremental.py
+# Compares a full catalogue reload (truncate + bulk upsert, the old /catalog/import-local
+# behaviour) with an incremental import that only writes changed rows.
+# A synthetic export is loaded once, then a nightly-style refresh changes, adds and
+# removes a small share of the courses. Both strategies apply that refresh to an
+# identical starting table; time and WAL bytes written are reported for each.
+# Run from the backend folder with the Postgres container up:
+#   python -m benchmarks.bench_catalog_incremental
+
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.services.catalog.catalog_ingest import ingest_catalog
+from benchmarks.scratch_db import scratch_engine
+
+# Tuning
+COURSE_COUNT = 50000
+CHANGED_SHARE = 0.01
+ADDED = 200
+REMOVED = 200
+SEED = 42
+
+
+def synthetic_course(i: int, rng: random.Random):
+    return {
+        "url": f"https://example.com/course/{i}",
+        "course_name": f"Course {i}",
+        "provider": "coursera",
+        "level": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+        "rating": f"{rng.uniform(3, 5):.1f}",
+        "description": f"Synthetic course {i}",
+        "skills": json.dumps([f"Skill {rng.randint(0, 1500)}" for _ in range(5)]),
+    }
+
+
+def write_export(path: Path, courses):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"courses": courses}, f)
+
+
+def _wal_lsn(db):
+    return db.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+
+
+def run(label: str, schema: str, folder: Path, mode: str):
+    with scratch_engine(schema) as engine:
+        db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        try:
+            ingest_catalog(db, folder, "initial.json", truncate_first=True, mode="bulk")
+
+            start_lsn = _wal_lsn(db)
+            started = time.perf_counter()
+            stats = ingest_catalog(db, folder, "refresh.json", truncate_first=True, mode=mode)
+            elapsed = time.perf_counter() - started
+            wal_bytes = db.execute(
+                text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :lsn)"), {"lsn": start_lsn}
+            ).scalar()
+            count = db.execute(text("SELECT count(*) FROM courses")).scalar()
+        finally:
+            db.close()
+
+    summary = {k: stats.get(k) for k in ("inserted", "updated", "deleted", "unchanged")}
+    print(f"{label:<12} {elapsed:7.2f}s  WAL {float(wal_bytes) / (1024 * 1024):8.1f} MB  rows={count}  {summary}")
+    return elapsed, float(wal_bytes), count
+
+
+def main():
+    rng = random.Random(SEED)
+    initial = [synthetic_course(i, rng) for i in range(COURSE_COUNT)]
+
+    refresh = [dict(course) for course in initial[REMOVED:]]
+    for course in rng.sample(refresh, int(len(refresh) * CHANGED_SHARE)):
+        course["rating"] = "5.0" if course["rating"] != "5.0" else "4.9"
+    refresh.extend(synthetic_course(COURSE_COUNT + i, rng) for i in range(ADDED))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        write_export(folder / "initial.json", initial)
+        write_export(folder / "refresh.json", refresh)
+
+        full = run("full reload", "skillgap_full_reload", folder, "bulk")
+        incremental = run("incremental", "skillgap_incremental", folder, "incremental")
+
+    if full[2] != incremental[2]:
+        raise SystemExit(f"Row counts differ: full={full[2]} incremental={incremental[2]}")
+
+    print(f"incremental import is {full[0] / incremental[0]:.1f}x faster and writes {full[1] / max(incremental[1], 1):.0f}x less WAL")
+
+
+if __name__ == "__main__":
+    main()
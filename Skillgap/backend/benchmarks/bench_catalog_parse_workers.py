@@ -0,0 +1,79 @@
+# bench_catalog_parse_workers.py
+# Measures the parse/normalise stage of a catalogue import with different process pool sizes.
+# Rows mimic the edX export, where skills are lists of dict-as-string items that go
+# through ast.literal_eval, plus braced-set organisation/subject text and messy numbers.
+# Checks that every pool size returns exactly the same rows in the same order as the
+# serial path, then reports rows/sec. No database is needed.
+# Run from the backend folder:
+#   python -m benchmarks.bench_catalog_parse_workers
+
+from __future__ import annotations
+
+import os
+import random
+import time
+
+from app.services.catalog.catalog_ingest import _iter_normalised_batches
+
+# Tuning
+COURSE_COUNT = 60000
+BATCH_SIZE = 1000
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+SEED = 42
+
+
+def build_synthetic_rows(rng: random.Random):
+    rows = []
+    for i in range(COURSE_COUNT):
+        skills = [
+            str({"skill": f"Skill {rng.randint(0, 1500)}", "type": "hard", "confidence": rng.random()})
+            for _ in range(rng.randint(2, 12))
+        ]
+        rows.append(
+            {
+                "url": f"https://example.com/course/{i}",
+                "course_name": f"Course {i}",
+                "provider": "edx",
+                "organization": "{'Example University', 'Example Institute'}",
+                "subject": "{'Computer Science'}",
+                "duration": f" {rng.randint(1, 60)} ",
+                "rating": f"{rng.uniform(3, 5):.1f}",
+                "nu_reviews": f"{rng.randint(0, 9999):,}",
+                "enrollments": f"{rng.randint(0, 999999):,}",
+                "description": "Synthetic course description",
+                "skills": str(skills),
+            }
+        )
+    return rows
+
+
+def run(rows, workers):
+    started = time.perf_counter()
+    out = []
+    for _, normalised in _iter_normalised_batches(rows, BATCH_SIZE, workers):
+        out.extend(normalised)
+    return out, time.perf_counter() - started
+
+
+def main():
+    rows = build_synthetic_rows(random.Random(SEED))
+    cores = os.cpu_count() or 1
+    print(f"{len(rows)} synthetic courses, batch size {BATCH_SIZE}, {cores} cores")
+
+    baseline, serial_seconds = run(rows, 0)
+    print(f"serial     {serial_seconds:6.2f}s  {len(rows) / serial_seconds:9.0f} rows/s")
+
+    for workers in WORKER_COUNTS:
+        if workers > cores:
+            break
+        result, seconds = run(rows, workers)
+        if result != baseline:
+            raise SystemExit(f"{workers} workers returned different rows")
+        print(
+            f"{workers:>2} workers {seconds:6.2f}s  {len(rows) / seconds:9.0f} rows/s  "
+            f"speed-up {serial_seconds / seconds:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench_catalog_streaming.py
+# Compares peak Python memory of the old whole-file catalogue load (json.load) with the
+# streaming export reader used by ingest_catalog, for JSON and NDJSON exports of growing size.
+# No database is needed: rows are read, normalised and dropped one batch at a time,
+# the same way bulk_upsert_courses consumes them.
+# Run from the backend folder:
+#   python -m benchmarks.bench_catalog_streaming
+
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.services.catalog.catalog_ingest import _normalise_row, iter_batches, iter_courses_export
+
+# Tuning
+COURSE_COUNTS = [5000, 20000, 80000]
+BATCH_SIZE = 1000
+
+
+def synthetic_course(i: int):
+    return {
+        "url": f"https://example.com/course/{i}",
+        "course_name": f"Course {i}",
+        "provider": "coursera",
+        "level": "Beginner",
+        "rating": "4.6",
+        "description": "Synthetic course description " * 20,
+        "skills": str([{"skill": f"Skill {i % 1500}"}, {"skill": "Python"}]),
+    }
+
+
+def write_exports(folder: Path, count: int):
+    json_path = folder / f"catalogue_{count}.json"
+    ndjson_path = folder / f"catalogue_{count}.ndjson"
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write('{"courses": [')
+        for i in range(count):
+            if i:
+                f.write(",")
+            f.write(json.dumps(synthetic_course(i)))
+        f.write("]}")
+
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps(synthetic_course(i)) + "\n")
+
+    return json_path, ndjson_path
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak / (1024 * 1024)
+
+
+def load_whole_file(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        rows = json.load(f)["courses"]
+    return sum(1 for r in rows if _normalise_row(r)[0] is not None)
+
+
+def stream_batches(path: Path):
+    count = 0
+    for batch in iter_batches(iter_courses_export(path), BATCH_SIZE):
+        count += sum(1 for r in batch if _normalise_row(r)[0] is not None)
+    return count
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        print(f"{'courses':>8} {'file MB':>8} {'json.load MB':>13} {'stream json MB':>15} {'stream ndjson MB':>17}")
+        for count in COURSE_COUNTS:
+            json_path, ndjson_path = write_exports(folder, count)
+            size_mb = json_path.stat().st_size / (1024 * 1024)
+
+            rows_full, _, peak_full = measure(lambda: load_whole_file(json_path))
+            rows_json, _, peak_json = measure(lambda: stream_batches(json_path))
+            rows_nd, _, peak_nd = measure(lambda: stream_batches(ndjson_path))
+
+            if not rows_full == rows_json == rows_nd == count:
+                raise SystemExit(f"Row counts differ: {rows_full} / {rows_json} / {rows_nd}")
+
+            print(f"{count:>8} {size_mb:>8.1f} {peak_full:>13.1f} {peak_json:>15.1f} {peak_nd:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_db_throughput.py
+# Compares request throughput of the two database paths against the same PostgreSQL:
+#   sync   - N concurrent "requests" on a thread pool, each opening a SessionLocal
+#            session (psycopg2), the way plain `def` endpoints run
+#   async  - N concurrent coroutines on one event loop, each opening an async session
+#            (asyncpg) from get_async_db, the way the migrated endpoints run
+# Each request runs the same small mix of reads the gap endpoints do (the latest
+# snapshot and confirmed skills of a user) plus a trivial SELECT.
+# Both engines use the SKILLGAP_DB_* pool settings, so raise SKILLGAP_DB_POOL_SIZE
+# to compare at higher concurrency.
+#   python -m benchmarks.bench_db_throughput [--requests 2000] [--concurrency 50] [--threads 40]
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, text
+
+from app.models.confirmed_skill import ConfirmedSkill
+from app.models.db import SessionLocal, dispose_async_engine, get_async_db
+from app.models.gap_snapshot import GapSnapshot
+
+# Requests use user ids 1..USER_IDS in turn; missing users simply return no rows.
+USER_IDS = 50
+
+
+def _sync_request(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1")).scalar()
+        db.execute(
+            select(GapSnapshot).where(GapSnapshot.user_id == user_id).order_by(GapSnapshot.created_at.desc()).limit(1)
+        ).scalars().first()
+        db.execute(select(ConfirmedSkill.skill_name).where(ConfirmedSkill.user_id == user_id)).all()
+    finally:
+        db.close()
+
+
+async def _async_request(user_id: int) -> None:
+    sessions = get_async_db()
+    db = await sessions.__anext__()
+    try:
+        (await db.execute(text("SELECT 1"))).scalar()
+        (
+            await db.execute(
+                select(GapSnapshot)
+                .where(GapSnapshot.user_id == user_id)
+                .order_by(GapSnapshot.created_at.desc())
+                .limit(1)
+            )
+        ).scalars().first()
+        (await db.execute(select(ConfirmedSkill.skill_name).where(ConfirmedSkill.user_id == user_id))).all()
+    finally:
+        await sessions.aclose()
+
+
+def bench_sync(requests: int, threads: int) -> float:
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # Warm the pool so connection set-up is not timed.
+        list(pool.map(_sync_request, range(1, threads + 1)))
+        started = time.perf_counter()
+        list(pool.map(_sync_request, (1 + n % USER_IDS for n in range(requests))))
+        return time.perf_counter() - started
+
+
+async def bench_async(requests: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(n: int) -> None:
+        async with limit:
+            await _async_request(1 + n % USER_IDS)
+
+    await asyncio.gather(*(one(n) for n in range(concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    elapsed = time.perf_counter() - started
+    await dispose_async_engine()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async database throughput")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50, help="in-flight async requests")
+    parser.add_argument("--threads", type=int, default=40, help="threads for the sync path (SKILLGAP_THREADPOOL_SIZE)")
+    args = parser.parse_args()
+
+    sync_seconds = bench_sync(args.requests, args.threads)
+    async_seconds = asyncio.run(bench_async(args.requests, args.concurrency))
+
+    print(f"{'path':<8}{'requests':>10}{'seconds':>10}{'req/s':>10}")
+    for label, seconds in (("sync", sync_seconds), ("async", async_seconds)):
+        print(f"{label:<8}{args.requests:>10}{seconds:>10.2f}{args.requests / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# bench_entity_batch.py
+# Compares per-document extract_entities calls with the batched nlp.pipe path
+# (extract_entities_batch) on synthetic CVs built from the active taxonomy.
+# Checks that both return identical entities, then reports documents/sec for a few
+# batch_size / n_process settings.
+# Run from the backend folder (needs spaCy and en_core_web_sm):
+#   python -m benchmarks.bench_entity_batch
+
+from __future__ import annotations
+
+import random
+import time
+
+from app.services.entity_extraction import _load_taxonomy_file, extract_entities, extract_entities_batch
+
+# Tuning
+DOCUMENT_COUNT = 300
+WORDS_PER_DOCUMENT = 600
+SETTINGS = [(16, 1), (64, 1), (256, 1), (64, 2), (64, 4)]
+SEED = 42
+
+FILLER = ["worked", "on", "a", "team", "delivering", "projects", "with", "3 years experience", "bsc", "degree"]
+
+
+def build_documents(rng: random.Random):
+    _, skills = _load_taxonomy_file()
+    vocab = skills + FILLER * 20
+    return [" ".join(rng.choice(vocab) for _ in range(WORDS_PER_DOCUMENT)) for _ in range(DOCUMENT_COUNT)]
+
+
+def main():
+    texts = build_documents(random.Random(SEED))
+
+    started = time.perf_counter()
+    single = [extract_entities(text) for text in texts]
+    single_seconds = time.perf_counter() - started
+    print(f"per-document calls          {single_seconds:6.2f}s  {len(texts) / single_seconds:8.1f} docs/s")
+
+    for batch_size, n_process in SETTINGS:
+        batch = extract_entities_batch(texts, batch_size=batch_size, n_process=n_process)
+        if batch["results"] != single:
+            raise SystemExit(f"batch_size={batch_size} n_process={n_process} returned different entities")
+        seconds = batch["stats"]["seconds"]
+        print(
+            f"batch_size={batch_size:<4} n_process={n_process}  {seconds:6.2f}s  "
+            f"{batch['stats']['documents_per_second']:8.1f} docs/s  speed-up {single_seconds / seconds:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_event_loop_latency.py
+# Checks that heavy requests do not stall light ones on the same worker.
+# Measures the latency of light endpoints (/ and /ready) on an idle server, then
+# again while heavy requests run concurrently: /extract-text uploads of a PDF and
+# /login attempts (bcrypt). If blocking work ran on the event loop, the light
+# endpoints' p99 would grow to the length of a PDF parse or a bcrypt hash.
+# Needs httpx and a running backend (single worker makes the effect easiest to see):
+#   uvicorn app.main:app --workers 1
+#   python -m benchmarks.bench_event_loop_latency path/to/cv.pdf [--url http://127.0.0.1:8000]
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+LIGHT_PATHS = ["/", "/ready"]
+LIGHT_REQUESTS = 400
+# Concurrent heavy clients and requests each of them sends.
+HEAVY_CLIENTS = 8
+HEAVY_REQUESTS_PER_CLIENT = 10
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(label: str, latencies: List[float]) -> None:
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{label:<28} n={len(ms):<5} p50 {statistics.median(ms):7.1f} ms  "
+        f"p99 {_percentile(ms, 99):7.1f} ms  max {max(ms):7.1f} ms"
+    )
+
+
+# Send light requests until `limit` have been sent or `stop` is set.
+async def _light_load(client: httpx.AsyncClient, stop: asyncio.Event, limit: Optional[int]) -> List[float]:
+    latencies = []
+    sent = 0
+    while (limit is None or sent < limit) and not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(LIGHT_PATHS[sent % len(LIGHT_PATHS)])
+        latencies.append(time.perf_counter() - started)
+        # /ready answers 503 while the warm-up runs, which is still a fast response.
+        if response.status_code not in (200, 503):
+            raise SystemExit(f"light request failed: {response.status_code} {response.text[:200]}")
+        sent += 1
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def _heavy_client(client: httpx.AsyncClient, pdf: Path, number: int) -> None:
+    data = pdf.read_bytes()
+    for request in range(HEAVY_REQUESTS_PER_CLIENT):
+        if (number + request) % 2:
+            await client.post("/extract-text", files={"file": (pdf.name, data, "application/pdf")})
+        else:
+            await client.post("/login", json={"identifier": "bench-nobody", "password": "NotARealPassword1"})
+
+
+async def main_async(url: str, pdf: Path) -> None:
+    timeout = httpx.Timeout(120.0)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as light, httpx.AsyncClient(
+        base_url=url, timeout=timeout
+    ) as heavy:
+        idle = await _light_load(light, asyncio.Event(), LIGHT_REQUESTS)
+        _report("light, idle server", idle)
+
+        stop = asyncio.Event()
+
+        async def heavy_load() -> float:
+            started = time.perf_counter()
+            await asyncio.gather(*(_heavy_client(heavy, pdf, n) for n in range(HEAVY_CLIENTS)))
+            stop.set()
+            return time.perf_counter() - started
+
+        # Light requests keep going for as long as the heavy clients run.
+        heavy_seconds, loaded = await asyncio.gather(heavy_load(), _light_load(light, stop, None))
+        _report("light, during heavy load", loaded)
+
+        print(f"heavy requests: {HEAVY_CLIENTS * HEAVY_REQUESTS_PER_CLIENT} in {heavy_seconds:.1f}s")
+        ratio = _percentile(loaded, 99) / max(_percentile(idle, 99), 1e-6)
+        print(f"p99 under load / idle p99: {ratio:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf", type=Path, help="PDF uploaded by the heavy clients")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.url, args.pdf))
+
+
+if __name__ == "__main__":
+    main()
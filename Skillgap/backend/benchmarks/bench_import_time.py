@@ -0,0 +1,103 @@
+# bench_import_time.py
+# Tracks cold-start import time per backend entry point with python -X importtime.
+# Each entry point is imported in a fresh interpreter. The script reports its
+# cumulative import time, its heaviest direct imports, and whether any of the
+# heavy optional dependencies (spaCy, sklearn, pdfplumber, python-docx, requests)
+# were imported eagerly. Those should only load when a request actually needs them.
+# Run from the backend folder:
+#   python -m benchmarks.bench_import_time
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# entry point -> import budget in milliseconds
+ENTRY_POINTS: Dict[str, float] = {
+    "app.main": 2500.0,
+    "app.services.catalog.catalog_ingest": 800.0,
+    "app.services.recommender.course_ranker": 800.0,
+    "app.services.entity_extraction": 150.0,
+    "app.services.text_extraction": 800.0,
+    "app.services.ESCO.esco_normaliser": 150.0,
+}
+
+# Modules that must not be imported just by importing an entry point.
+LAZY_MODULES = ["spacy", "sklearn", "pdfplumber", "docx", "requests"]
+
+TOP_IMPORTS = 5
+# Fresh interpreters per entry point; the fastest run is reported.
+REPEATS = 3
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    # Lines look like "import time:       self [us] |  cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # name keeps its leading spaces, which show the nesting depth.
+        rows.append((name[1:], int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str):
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        last_line = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return None, [], [], last_line
+
+    rows = _parse_importtime(proc.stderr)
+    # The entry point itself is a top-level line (no indentation); its direct imports are indented by two.
+    total_ms = sum(cumulative for name, _, cumulative in rows if name == module) / 1000.0
+    direct = [(name.strip(), cumulative) for name, _, cumulative in rows if name.startswith("  ") and not name.startswith("   ")]
+    heaviest = sorted(direct, key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+    eager = [m for m in proc.stdout.strip().split(",") if m]
+    return total_ms, heaviest, eager, None
+
+
+def main():
+    failures = []
+    for module, budget_ms in ENTRY_POINTS.items():
+        runs = [measure(module) for _ in range(REPEATS)]
+        total_ms, heaviest, eager, error = min(runs, key=lambda run: run[0] if run[0] is not None else float("inf"))
+
+        if error:
+            print(f"{module:<42} could not be imported here: {error}")
+            continue
+
+        status = "OK  " if total_ms <= budget_ms else "OVER"
+        print(f"[{status}] {module:<42} {total_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+        for name, cumulative in heaviest:
+            print(f"         {name:<40} {cumulative / 1000.0:8.1f} ms")
+
+        if total_ms > budget_ms:
+            failures.append(f"{module} took {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        if eager:
+            print(f"         eagerly imported: {', '.join(eager)}")
+            failures.append(f"{module} imports {', '.join(eager)} eagerly")
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+    print("All entry points are within their import budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# bench_skill_matcher.py
+# Compares the spaCy PhraseMatcher with the Aho-Corasick SkillMatcher on synthetic
+# CVs built from the active taxonomy (plain and punctuation-heavy text).
+# Reports how many documents get exactly the same skills from both engines (listing
+# the phrases that differ), per-document latency, build time and the memory each
+# matcher allocates, plus the match counts of the "longest" policy.
+# Run from the backend folder:
+#   python -m benchmarks.bench_skill_matcher
+# Uses en_core_web_sm when it is installed; otherwise spaCy's blank English tokenizer,
+# which has the same tokenisation rules but none of the pipeline components.
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, List, Tuple
+
+import spacy
+from spacy.matcher import PhraseMatcher
+
+from app.services.entity_extraction import _load_taxonomy_file, _preprocess_text, _skills_from_doc
+from app.services.skills.skill_matcher import build_skill_matcher
+
+# Tuning
+DOCUMENT_COUNT = 300
+WORDS_PER_DOCUMENT = 600
+SEED = 42
+SHOW_DIFFERENCES = 15
+
+FILLER = ["worked", "on", "a", "team", "delivering", "projects", "with", "3 years experience", "bsc", "degree"]
+SEPARATORS = [" "] * 12 + [", ", ". ", "; ", ": ", " / ", " (", ") ", " - "]
+
+
+def load_nlp():
+    try:
+        return spacy.load("en_core_web_sm", disable=["ner", "parser", "tagger", "lemmatizer"]), "en_core_web_sm"
+    except OSError:
+        return spacy.blank("en"), "blank en tokenizer"
+
+
+def build_documents(rng: random.Random, skills: List[str], punctuated: bool) -> List[str]:
+    vocab = skills + FILLER * 20
+    documents = []
+    for _ in range(DOCUMENT_COUNT):
+        parts = []
+        for _ in range(WORDS_PER_DOCUMENT):
+            parts.append(rng.choice(vocab))
+            parts.append(rng.choice(SEPARATORS) if punctuated else " ")
+        documents.append(_preprocess_text("".join(parts)))
+    return documents
+
+
+def measure_build(build: Callable[[], object]) -> Tuple[object, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    matcher = build()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return matcher, seconds, peak
+
+
+def time_per_document(find: Callable[[str], List[str]], documents: List[str]) -> Tuple[List[List[str]], List[float]]:
+    results, latencies = [], []
+    for text in documents:
+        started = time.perf_counter()
+        results.append(find(text))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+
+def report(label: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"  {label:<14} mean {statistics.mean(latencies) * 1000:7.3f} ms  "
+        f"p50 {statistics.median(latencies) * 1000:7.3f} ms  p95 {p95 * 1000:7.3f} ms"
+    )
+
+
+def main():
+    _, skills = _load_taxonomy_file()
+    nlp, model = load_nlp()
+    # Load the tokenizer's lazy data before measuring the matchers themselves.
+    nlp("warm up")
+
+    def build_phrase_matcher():
+        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        matcher.add("ICT_SKILL", [nlp.make_doc(s) for s in skills])
+        return matcher
+
+    phrase_matcher, phrase_build, phrase_memory = measure_build(build_phrase_matcher)
+    aho, aho_build, aho_memory = measure_build(lambda: build_skill_matcher(skills))
+    longest = build_skill_matcher(skills, policy="longest")
+
+    print(f"taxonomy: {len(skills)} skills, spaCy: {model}")
+    print(f"  phrasematcher  build {phrase_build * 1000:7.1f} ms  peak memory {phrase_memory / 1024:8.0f} KiB")
+    print(
+        f"  aho-corasick   build {aho_build * 1000:7.1f} ms  peak memory {aho_memory / 1024:8.0f} KiB  "
+        f"({aho.state_count} states)"
+    )
+
+    rng = random.Random(SEED)
+    for punctuated in (False, True):
+        documents = build_documents(rng, skills, punctuated)
+        print(f"\n{'punctuated' if punctuated else 'plain'} text: {len(documents)} documents x {WORDS_PER_DOCUMENT} words")
+
+        phrase_results, phrase_latencies = time_per_document(lambda t: _skills_from_doc(nlp(t), phrase_matcher), documents)
+        aho_results, aho_latencies = time_per_document(aho.find, documents)
+        longest_results, _ = time_per_document(longest.find, documents)
+
+        report("phrasematcher", phrase_latencies)
+        report("aho-corasick", aho_latencies)
+        print(f"  speed-up {sum(phrase_latencies) / sum(aho_latencies):5.1f}x")
+
+        same = sum(1 for a, b in zip(phrase_results, aho_results) if a == b)
+        differences: Counter = Counter()
+        for a, b in zip(phrase_results, aho_results):
+            differences.update(f"phrasematcher only: {s}" for s in set(a) - set(b))
+            differences.update(f"aho-corasick only:  {s}" for s in set(b) - set(a))
+
+        matches_all = sum(len(r) for r in aho_results)
+        matches_longest = sum(len(r) for r in longest_results)
+        print(f"  identical skill sets: {same}/{len(documents)} documents")
+        print(f"  distinct matches: all {matches_all}, longest {matches_longest}")
+        for phrase, count in differences.most_common(SHOW_DIFFERENCES):
+            print(f"    {count:4d}  {phrase}")
+
+
+if __name__ == "__main__":
+    main()
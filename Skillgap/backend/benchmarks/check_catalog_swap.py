@@ -0,0 +1,144 @@
+# check_catalog_swap.py
+# Checks the shadow table swap used by full catalogue re-imports.
+# Loads a catalogue into a scratch schema, then re-imports a different export while
+# reader threads keep counting the live courses table. Every count a reader sees must be
+# either the whole old catalogue or the whole new one. Also checks that index names,
+# the id sequence and carried-over skills_norm survive the swap, and that the ranker's
+# prebuilt index matches the published catalogue version.
+# Run from the backend folder with the Postgres container up:
+#   python -m benchmarks.check_catalog_swap
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.services.catalog.catalog_ingest import ingest_catalog
+from app.services.catalog.catalog_version import compute_catalog_fingerprint, get_catalog_version
+from app.services.recommender import course_ranker
+from benchmarks.scratch_db import scratch_engine
+
+# Tuning
+OLD_COUNT = 30000
+NEW_COUNT = 31000
+READERS = 4
+
+
+def synthetic_course(i: int, rating: str):
+    return {
+        "url": f"https://example.com/course/{i}",
+        "course_name": f"Course {i}",
+        "provider": "coursera",
+        "level": "Beginner",
+        "rating": rating,
+        "description": f"Synthetic course {i} about python and docker",
+        "skills": json.dumps(["Python", "Docker"]),
+    }
+
+
+def write_export(path: Path, count: int, rating: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"courses": [synthetic_course(i, rating) for i in range(count)]}, f)
+
+
+def index_names(db):
+    rows = db.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'courses'")
+    ).fetchall()
+    return sorted(str(row[0]) for row in rows)
+
+
+def main():
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp, scratch_engine("skillgap_swap") as engine:
+        folder = Path(tmp)
+        # Half of the courses change in the new export, the rest keep their content.
+        write_export(folder / "old.json", OLD_COUNT, "4.5")
+        write_export(folder / "new.json", NEW_COUNT, "4.5")
+        with open(folder / "new.json", "r+", encoding="utf-8") as f:
+            courses = json.load(f)["courses"]
+            for course in courses[: NEW_COUNT // 2]:
+                course["rating"] = "4.9"
+            f.seek(0)
+            f.truncate()
+            json.dump({"courses": courses}, f)
+
+        Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        db = Session()
+        ingest_catalog(db, folder, "old.json", truncate_first=False)
+        db.execute(text("UPDATE courses SET skills_norm = '[\"python\", \"docker\"]'::jsonb"))
+        db.commit()
+        names_before = index_names(db)
+
+        counts = set()
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            with engine.connect() as conn:
+                while not stop.is_set():
+                    try:
+                        counts.add(conn.execute(text("SELECT count(*) FROM courses")).scalar())
+                        conn.commit()
+                    except Exception as exc:
+                        errors.append(repr(exc))
+                        conn.rollback()
+
+        threads = [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in threads:
+            thread.start()
+
+        started = time.perf_counter()
+        stats = ingest_catalog(db, folder, "new.json", truncate_first=True)
+        elapsed = time.perf_counter() - started
+        time.sleep(0.2)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        print(f"Swap import of {stats['total']} rows took {elapsed:.1f}s; readers saw counts {sorted(counts)}")
+        if not counts <= {OLD_COUNT, NEW_COUNT}:
+            failures.append(f"readers saw a partial catalogue: {sorted(counts)}")
+        if errors:
+            failures.append(f"reader errors: {errors[:3]}")
+
+        if index_names(db) != names_before:
+            failures.append(f"index names changed: {names_before} -> {index_names(db)}")
+
+        carried = db.execute(text("SELECT count(*) FROM courses WHERE skills_norm IS NOT NULL")).scalar()
+        expected_carried = OLD_COUNT - NEW_COUNT // 2
+        print(f"skills_norm carried over for {carried} unchanged courses (expected {expected_carried})")
+        if carried != expected_carried:
+            failures.append("skills_norm carry-over mismatch")
+
+        ids = db.execute(text("SELECT min(id), max(id) FROM courses")).fetchone()
+        next_id = db.execute(text("SELECT nextval(pg_get_serial_sequence('courses', 'id'))")).scalar()
+        if next_id <= ids[1]:
+            failures.append(f"id sequence is behind the table: next {next_id}, max {ids[1]}")
+
+        version = get_catalog_version(db)
+        index = course_ranker._INDEX_STATE["index"]
+        print(f"catalogue version {version}, ranker index version {index.version if index else None}")
+        if compute_catalog_fingerprint(db) != version:
+            failures.append("published version does not match the live table fingerprint")
+        if index is None or index.version != version or len(index) != NEW_COUNT:
+            failures.append("ranker index was not installed for the new catalogue version")
+
+        db.execute(text("DROP TABLE IF EXISTS courses_next"))
+        db.commit()
+        db.close()
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+    print("Catalogue swap OK.")
+
+
+if __name__ == "__main__":
+    main()
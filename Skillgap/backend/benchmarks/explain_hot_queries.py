@@ -0,0 +1,113 @@
+# explain_hot_queries.py
+# Checks that each hot query uses the index created for it by the migrations.
+# Loads a large synthetic dataset into a scratch schema, refreshes statistics,
+# then runs EXPLAIN (FORMAT JSON) on every hot query and looks for the expected index
+# anywhere in the plan tree.
+# Run from the backend folder with the Postgres container up:
+#   python -m benchmarks.explain_hot_queries
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import text
+
+from app.models.migrations import analyze_tables
+from benchmarks.scratch_db import scratch_engine
+
+# Dataset size
+USER_COUNT = 20000
+SNAPSHOTS_PER_USER = 25
+CV_ENTITIES_PER_USER = 30
+SKILL_VOCAB_SIZE = 2000
+
+SEED_SQL = [
+    (
+        "users",
+        """
+        INSERT INTO users (username, email, hashed_password)
+        SELECT 'user' || g, 'user' || g || '@example.com', 'x'
+        FROM generate_series(1, :users) g
+        """,
+    ),
+    (
+        "gap_snapshots",
+        """
+        INSERT INTO gap_snapshots (user_id, missing_entities, created_at)
+        SELECT 1 + (g % :users), '["python", "docker"]'::json, now() - (g || ' minutes')::interval
+        FROM generate_series(1, :users * :snapshots) g
+        """,
+    ),
+    (
+        "cv_entities",
+        """
+        INSERT INTO cv_entities (user_id, entity_name, entity_type)
+        SELECT 1 + (g % :users), 'skill ' || (g % :vocab), 'technical'
+        FROM generate_series(1, :users * :cv_entities) g
+        """,
+    ),
+]
+
+# (description, query, params, index that must appear in the plan)
+HOT_QUERIES = [
+    (
+        "latest gap snapshot for a user",
+        "SELECT * FROM gap_snapshots WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1",
+        {"user_id": 123},
+        "ix_gap_snapshots_user_created",
+    ),
+    (
+        "CV entities for a user",
+        "SELECT entity_name FROM cv_entities WHERE user_id = :user_id",
+        {"user_id": 123},
+        "ix_cv_entities_user_id",
+    ),
+]
+
+
+def _index_names(plan: Dict[str, Any]) -> Set[str]:
+    names: Set[str] = set()
+    if plan.get("Index Name"):
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []) or []:
+        names |= _index_names(child)
+    return names
+
+
+def main():
+    params = {
+        "users": USER_COUNT,
+        "snapshots": SNAPSHOTS_PER_USER,
+        "cv_entities": CV_ENTITIES_PER_USER,
+        "vocab": SKILL_VOCAB_SIZE,
+    }
+
+    with scratch_engine("skillgap_explain") as engine:
+        with engine.begin() as conn:
+            for table, sql in SEED_SQL:
+                started = time.perf_counter()
+                conn.execute(text(sql), params)
+                print(f"Seeded {table} in {time.perf_counter() - started:.1f}s")
+            analyze_tables(conn, [table for table, _ in SEED_SQL])
+
+        failures: List[str] = []
+        with engine.connect() as conn:
+            for description, sql, query_params, expected_index in HOT_QUERIES:
+                raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), query_params).scalar()
+                plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+                used = _index_names(plan)
+
+                status = "OK  " if expected_index in used else "FAIL"
+                print(f"[{status}] {description}: expected {expected_index}, plan uses {sorted(used) or 'no index'}")
+                if expected_index not in used:
+                    failures.append(description)
+
+    if failures:
+        raise SystemExit(f"{len(failures)} hot queries are not using their index")
+    print("All hot queries use their indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# scratch_db.py
+# Shared helper for benchmarks that need a real PostgreSQL database.
+# Creates a throwaway schema in the configured Skillgap database, creates every
+# table inside it and applies the migrations, then drops the schema afterwards.
+# The real tables in the public schema are never touched.
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.models.db import DATABASE_URL, Base
+from app.models.migrations import run_migrations
+
+
+@contextmanager
+def scratch_engine(schema: str = "skillgap_bench") -> Iterator[Engine]:
+    admin = create_engine(DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    # Every connection from this engine resolves unqualified table names to the scratch schema.
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"options": f"-csearch_path={schema}"},
+    )
+    try:
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        admin.dispose()
@@ -3,26 +3,29 @@
 # Extracts skills by phrase matching against your active taxonomy:
 #   app/data/skill_taxonomy_it_active.json
 # This avoids ESCO calls and improves coverage for terms like docker/kubernetes/grpc/rest api/go/rust
+# Matching engine (SKILLGAP_SKILL_MATCHER):
+#   phrasematcher  spaCy PhraseMatcher, needs en_core_web_sm (default)
+#   aho-corasick   app/services/skills/skill_matcher.py, no spaCy model needed
 
 from __future__ import annotations
 
 import json
+import os
 import re
 from pathlib import Path
-from typing import List, Set
+from typing import Any, List, Set
 
-import spacy
-from spacy.matcher import PhraseMatcher
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.models.db import SessionLocal
+from app.services.skills.skill_matcher import SkillMatcher, build_skill_matcher
 
 ACTIVE_TAX_PATH = Path("app/data/skill_taxonomy_it_active.json")
 BATCH_COMMIT = 100
+MATCHER_ENGINE = os.getenv("SKILLGAP_SKILL_MATCHER", "phrasematcher").strip().lower()
 
-# Phrase matching doesn't need heavy NLP components
-nlp = spacy.load("en_core_web_sm", disable=["ner", "parser", "tagger", "lemmatizer"])
+nlp = None
 
 def norm(s: str) -> str:
     t = (s or "").strip().lower()
@@ -43,17 +46,30 @@ def load_taxonomy() -> List[str]:
     skills = sorted({norm(str(x)) for x in raw if norm(str(x))}, key=len, reverse=True)
     return skills
 
-def build_matcher(skills: List[str]) -> PhraseMatcher:
+def build_matcher(skills: List[str]) -> Any:
+    global nlp
+
+    if MATCHER_ENGINE == "aho-corasick":
+        return build_skill_matcher(skills)
+
+    import spacy
+    from spacy.matcher import PhraseMatcher
+
+    # Phrase matching doesn't need heavy NLP components
+    nlp = spacy.load("en_core_web_sm", disable=["ner", "parser", "tagger", "lemmatizer"])
     matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
     patterns = [nlp.make_doc(s) for s in skills]
     matcher.add("ICT_SKILL", patterns)
     return matcher
 
-def extract_skills(text_in: str, matcher: PhraseMatcher) -> List[str]:
+def extract_skills(text_in: str, matcher: Any) -> List[str]:
     t = preprocess(text_in)
     if not t:
         return []
 
+    if isinstance(matcher, SkillMatcher):
+        return matcher.find(t)
+
     doc = nlp(t)
     matches = matcher(doc)
 
@@ -68,6 +84,7 @@ def extract_skills(text_in: str, matcher: PhraseMatcher) -> List[str]:
 def main():
     skills = load_taxonomy()
     matcher = build_matcher(skills)
+    print(f"Matcher: {MATCHER_ENGINE} ({len(skills)} skills)")
 
     db: Session = SessionLocal()
     try:
@@ -3,20 +3,27 @@
 # First creates a sanitized temporary copy because the source file contains invalid JSON tokens:
 #   NaN, Infinity, -Infinity
 # Keeps only ICT-relevant courses using:
-#   1) active taxonomy phrase matching
+#   1) active taxonomy phrase matching (one regex per skill, or one Aho-Corasick pass)
 #   2) optional ICT keyword fallback
 # Writes output as NDJSON for easy batch ingestion
+# Matching engine (SKILLGAP_SKILL_MATCHER, the setting the backfill script reads):
+#   aho-corasick   one pass for all skills; unlike the regex it does not match a skill
+#                  inside a dotted name ("net" in ".net", "react" in "react.js")
+#   anything else  one regex per skill (default, the original output)
 # Requires: pip install ijson
 
 from __future__ import annotations
 
 import json
+import os
 import re
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 
 import ijson
 
+from app.services.skills.skill_matcher import SkillMatcher, build_skill_matcher
+
 # Paths kept simple because you moved the script into backend root
 IN_PATH = Path("processed_coursera_data.json")
 SANITIZED_PATH = Path("processed_coursera_data_sanitized.json")
@@ -28,6 +35,7 @@ TAXONOMY_PATH = Path("skill_taxonomy_it_active.json")
 BATCH_LOG_EVERY = 500
 MIN_MATCHES_FROM_TAXONOMY = 1
 ALLOW_KEYWORD_FALLBACK = True
+MATCHER_ENGINE = os.getenv("SKILLGAP_SKILL_MATCHER", "regex").strip().lower()
 
 # Strong ICT fallback keywords
 ICT_KEYWORDS = [
@@ -60,11 +68,20 @@ def build_patterns(skills: List[str]) -> List[re.Pattern]:
         patterns.append(re.compile(pat, flags=re.IGNORECASE))
     return patterns
 
-def count_taxonomy_matches(text: str, patterns: List[re.Pattern]) -> int:
+def build_matcher(skills: List[str]) -> Union[SkillMatcher, List[re.Pattern]]:
+    if MATCHER_ENGINE == "aho-corasick":
+        return build_skill_matcher(skills)
+    # phrasematcher (the backend default) has no equivalent here, so it keeps the regex.
+    return build_patterns(skills)
+
+def count_taxonomy_matches(text: str, patterns: Union[SkillMatcher, List[re.Pattern]]) -> int:
     t = norm(text)
     if not t:
         return 0
 
+    if isinstance(patterns, SkillMatcher):
+        return len(patterns.find(t))
+
     count = 0
     for rx in patterns:
         if rx.search(t):
@@ -119,9 +136,9 @@ def main():
     # Step 1: sanitize invalid JSON tokens
     sanitize_json_file(IN_PATH, SANITIZED_PATH)
 
-    # Step 2: load taxonomy and precompile patterns
+    # Step 2: load taxonomy and precompile the matcher
     skills = load_taxonomy()
-    patterns = build_patterns(skills)
+    patterns = build_matcher(skills)
 
     total = 0
     kept = 0
@@ -158,7 +175,8 @@ def main():
                 "kept": kept,
                 "dropped": dropped,
                 "min_taxonomy_matches": MIN_MATCHES_FROM_TAXONOMY,
-                "keyword_fallback": ALLOW_KEYWORD_FALLBACK
+                "keyword_fallback": ALLOW_KEYWORD_FALLBACK,
+                "matcher": "aho-corasick" if MATCHER_ENGINE == "aho-corasick" else "regex"
             },
             indent=2,
             ensure_ascii=False
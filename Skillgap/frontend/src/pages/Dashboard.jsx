@@ -37,13 +37,20 @@ function Dashboard() {
     const formData = new FormData();
     formData.append("file", jdFile);
 
-    await api.post("/analysis/save-jd-entities", formData, {
+    const response = await api.post("/analysis/save-jd-entities", formData, {
       headers: { "Content-Type": "multipart/form-data" },
     });
+
+    // The JD was only partly read and no complete copy is stored yet, so there is no gap to compute.
+    if (response.data.saved.entities_pending) {
+      throw new Error(response.data.warning);
+    }
+
+    return response.data.saved.job_id;
   };
 
-  const computeGap = async () => {
-    await api.post("/analysis/compute-gap");
+  const computeGap = async (jobId) => {
+    await api.post("/analysis/compute-gap", null, { params: { job_id: jobId } });
   };
 
   const handleRunAnalysis = async () => {
@@ -65,10 +72,10 @@ function Dashboard() {
       await uploadCvEntities();
 
       setStatus("Uploading job description and extracting skills...");
-      await uploadJdEntities();
+      const jobId = await uploadJdEntities();
 
       setStatus("Comparing skills and building your latest gap snapshot...");
-      await computeGap();
+      await computeGap(jobId);
 
       setStatus("Analysis complete. Redirecting to review...");
 